@@ -0,0 +1,33 @@
+import asyncio
+import os
+import pytest
+from fastapi import BackgroundTasks, HTTPException
+from backend import api_endpoints
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(api_endpoints, "crawl_data_dir", str(tmp_path / "data"))
+    return tmp_path / "data"
+
+def test_crawl_data_path(data_dir):
+    assert api_endpoints.get_crawl_data_path("crawl.sqlite") == str(data_dir / "crawl.sqlite")
+
+@pytest.mark.parametrize("name", ["", "..", "../crawl.sqlite", "/tmp/crawl.sqlite", "sub/crawl.sqlite", "sub\\crawl.sqlite"])
+def test_crawl_data_path_rejects_paths(data_dir, name):
+    with pytest.raises(HTTPException) as error:
+        api_endpoints.get_crawl_data_path(name)
+    assert error.value.status_code == 400
+
+def test_crawler_rejects_checkpoint_outside_data_dir(data_dir, tmp_path):
+    config = api_endpoints.CrawlerConfig(TargetURL="http://site.test/", CrawlDepth=1, PageNumberLimit=1, UserAgent="",
+                                         RequestDelay=0, CheckpointPath=str(tmp_path / "other.sqlite"))
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(api_endpoints.set_up_crawler(config, BackgroundTasks()))
+    assert error.value.status_code == 400
+
+def test_resume_needs_an_existing_checkpoint(data_dir):
+    config = api_endpoints.CrawlerResumeConfig(CheckpointPath="missing.sqlite")
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(api_endpoints.resume_crawler(config, BackgroundTasks()))
+    assert error.value.status_code == 404
+    assert not os.path.exists(data_dir / "missing.sqlite")
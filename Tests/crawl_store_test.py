@@ -0,0 +1,34 @@
+from backend.CrawlStore import CrawlStore
+
+def test_pages_round_trip(tmp_path):
+    path = str(tmp_path / "crawl.db")
+    with CrawlStore(path) as store:
+        store.pages["http://site.test/"] = "<p>root</p>" * 100
+        store.pages["http://site.test/a"] = None
+        store.texts["http://site.test/"] = "root"
+    store = CrawlStore(path)
+    assert list(store.pages) == ["http://site.test/", "http://site.test/a"]
+    assert store.pages["http://site.test/"] == "<p>root</p>" * 100
+    assert store.pages["http://site.test/a"] is None
+    assert "http://site.test/b" not in store.pages
+    assert dict(store.texts) == {"http://site.test/": "root"}
+    store.close()
+
+def test_rewrite_keeps_order(tmp_path):
+    store = CrawlStore(str(tmp_path / "crawl.db"))
+    store.pages["a"] = "1"
+    store.pages["b"] = "2"
+    store.pages["a"] = "3"
+    assert list(store.pages.items()) == [("a", "3"), ("b", "2")]
+    del store.pages["a"]
+    assert len(store.pages) == 1
+    store.close()
+
+def test_load_tree(tmp_path):
+    store = CrawlStore(str(tmp_path / "crawl.db"))
+    store.record_edge(("http://site.test/", "10.0.0.1"), ("http://site.test/a", "10.0.0.1"))
+    store.record_edge(("http://site.test/a", "10.0.0.1"), ("http://site.test/a/1", "10.0.0.1"))
+    tree_creator = store.load_tree()
+    assert tree_creator.tree.root == ("http://site.test/", "10.0.0.1")
+    assert tree_creator.tree.has_edge(("http://site.test/a", "10.0.0.1"), ("http://site.test/a/1", "10.0.0.1"))
+    store.close()
@@ -1,5 +1,9 @@
+import socket
+from concurrent.futures import Future
 import pytest
 from backend import Crawler
+from backend.ParserPool import extract_text
+from backend.utils import canonicalize_url
 
 @pytest.fixture
 def setUpCrawler():
@@ -72,4 +76,397 @@ def test_getConfig1(setUpCrawler):
 def test_getConfig2(setUpCrawler):
     setUpCrawler.config = None
     with pytest.raises(ValueError):
-        setUpCrawler.getConfig()
\ No newline at end of file
+        setUpCrawler.getConfig()
+
+SITE = {
+    "http://site.test/": '<a href="/a">a</a><a href="/b">b</a>',
+    "http://site.test/a": '<a href="/a/1">1</a><a href="/a/2">2</a>',
+    "http://site.test/b": '<a href="/b/1">1</a>',
+    "http://site.test/a/1": '<p>a1</p>',
+    "http://site.test/a/2": '<p>a2</p>',
+    "http://site.test/b/1": '<p>b1</p>',
+}
+
+def make_site_crawler(monkeypatch, **options):
+    config = {"TargetURL": "http://site.test/",
+              "CrawlDepth": 10,
+              "PageNumberLimit": 20,
+              "UserAgent": "",
+              "RequestDelay": 0}
+    config.update(options)
+    crawler = Crawler.Crawler(config)
+    monkeypatch.setattr(crawler, "fetch", lambda url: SITE.get(url))
+    monkeypatch.setattr(crawler, "update_crawler_data", lambda links, data: None)
+    monkeypatch.setattr(socket, "gethostbyname", lambda host: "10.0.0.1")
+    return crawler
+
+def test_concurrent_crawl_matches_serial(monkeypatch):
+    serial = make_site_crawler(monkeypatch)
+    serial.start_crawl()
+    concurrent = make_site_crawler(monkeypatch, Concurrency=4)
+    concurrent.start_crawl()
+    root = serial.tree_creator.tree.root
+    assert set(concurrent.getCrawlResults()) == set(SITE)
+    assert concurrent.tree_creator.get_tree_map(root) == serial.tree_creator.get_tree_map(root)
+
+# / links a and b, a links b again, b links c and d, d links back to a
+SHARED_SITE = {
+    "http://site.test/": '<a href="/a">a</a><a href="/b">b</a>',
+    "http://site.test/a": '<a href="/b">b</a>',
+    "http://site.test/b": '<a href="/c">c</a><a href="/d">d</a>',
+    "http://site.test/c": '<p>c</p>',
+    "http://site.test/d": '<a href="/a">a</a>',
+}
+
+@pytest.mark.parametrize("strategy", ["dfs", "bfs", "shallow"])
+@pytest.mark.parametrize("limit", [3, 20])
+def test_concurrent_crawl_matches_serial_with_shared_children(monkeypatch, strategy, limit):
+    crawlers = []
+    for concurrency in (1, 4):
+        crawler = make_site_crawler(monkeypatch, Concurrency=concurrency, PageNumberLimit=limit, CrawlStrategy=strategy)
+        monkeypatch.setattr(crawler, "fetch", lambda url: SHARED_SITE.get(url))
+        crawler.start_crawl()
+        crawlers.append(crawler)
+    serial, concurrent = crawlers
+    root = serial.tree_creator.tree.root
+    assert concurrent.getCrawlResults() == serial.getCrawlResults()
+    assert concurrent.tree_creator.get_tree_map(root, mode="dag") == serial.tree_creator.get_tree_map(root, mode="dag")
+    assert concurrent.tree_creator.get_edges_since(0) == serial.tree_creator.get_edges_since(0)
+
+def test_concurrent_crawl_page_limit(monkeypatch):
+    crawler = make_site_crawler(monkeypatch, Concurrency=4, PageNumberLimit=3)
+    crawler.start_crawl()
+    assert crawler.page_count == 3
+    assert len(crawler.visited_urls) == 3
+
+def test_invalid_concurrency():
+    with pytest.raises(ValueError):
+        Crawler.Crawler({"TargetURL": "http://site.test/",
+                "CrawlDepth": 1,
+                "PageNumberLimit": 1,
+                "UserAgent": "",
+                "RequestDelay": 0,
+                "Concurrency": 0})
+
+def test_crawl_dns_cache(monkeypatch):
+    crawler = make_site_crawler(monkeypatch)
+    crawler.start_crawl()
+    assert crawler.get_dns_stats()["misses"] == 1
+    assert crawler.get_dns_stats()["hits"] == len(SITE) - 1
+
+def test_concurrent_crawl_dns_cache(monkeypatch):
+    crawler = make_site_crawler(monkeypatch, Concurrency=4)
+    crawler.start_crawl()
+    assert crawler.get_dns_stats()["misses"] == 1
+    assert crawler.get_dns_stats()["hits"] == len(SITE) - 1
+
+def test_deep_crawl_has_no_recursion_limit(monkeypatch):
+    pages = 3000
+    crawler = make_site_crawler(monkeypatch, CrawlDepth=pages, PageNumberLimit=pages)
+    monkeypatch.setattr(crawler, "fetch", lambda url: f'<a href="/{int(url.rsplit("/", 1)[1] or 0) + 1}">next</a>')
+    crawler.start_crawl()
+    assert crawler.page_count == pages
+
+def test_bfs_crawl_strategy(monkeypatch):
+    crawler = make_site_crawler(monkeypatch, CrawlStrategy="bfs", PageNumberLimit=3)
+    crawler.start_crawl()
+    assert crawler.getCrawlResults() == ["http://site.test/", "http://site.test/a", "http://site.test/b"]
+
+class CrawlInterrupted(BaseException):
+    pass
+
+def test_resume_crawl_from_checkpoint(monkeypatch, tmp_path):
+    path = str(tmp_path / "crawl.sqlite")
+    crawler = make_site_crawler(monkeypatch, CheckpointPath=path, CheckpointInterval=1)
+    fetched = []
+    def failing_fetch(url):
+        if len(fetched) == 3:
+            raise CrawlInterrupted()
+        fetched.append(url)
+        return SITE.get(url)
+    monkeypatch.setattr(crawler, "fetch", failing_fetch)
+    with pytest.raises(CrawlInterrupted):
+        crawler.start_crawl()
+
+    resumed = Crawler.Crawler.from_checkpoint(path)
+    refetched = []
+    monkeypatch.setattr(resumed, "fetch", lambda url: refetched.append(url) or SITE.get(url))
+    monkeypatch.setattr(resumed, "update_crawler_data", lambda links, data: None)
+    resumed.resume_crawl()
+
+    assert not set(fetched) & set(refetched)
+    assert set(resumed.getCrawlResults()) == set(SITE)
+    complete = make_site_crawler(monkeypatch)
+    complete.start_crawl()
+    root = complete.tree_creator.tree.root
+    assert resumed.tree_creator.get_tree_map(root) == complete.tree_creator.get_tree_map(root)
+
+@pytest.mark.parametrize("interval", [1, 2, 50])
+def test_interrupted_crawl_stores_every_checkpointed_page(monkeypatch, tmp_path, interval):
+    from backend.CrawlCheckpoint import CrawlCheckpoint
+    from backend.CrawlStore import CrawlStore
+    checkpoint_path, store_path = str(tmp_path / "crawl.sqlite"), str(tmp_path / "crawl.db")
+    crawler = make_site_crawler(monkeypatch, CheckpointPath=checkpoint_path, CheckpointInterval=interval,
+                                CrawlStorePath=store_path)
+    fetched = []
+    def failing_fetch(url):
+        if len(fetched) == 3:
+            raise CrawlInterrupted()
+        fetched.append(url)
+        return SITE.get(url)
+    monkeypatch.setattr(crawler, "fetch", failing_fetch)
+    with pytest.raises(CrawlInterrupted):
+        crawler.start_crawl()
+
+    # read through other connections, only what was committed counts
+    checkpoint = CrawlCheckpoint(checkpoint_path)
+    visited = checkpoint.load_visited()
+    checkpoint.close()
+    with CrawlStore(store_path) as store:
+        assert sorted(visited) == sorted(store.pages) == sorted(fetched)
+
+def test_interrupted_page_is_not_checkpointed(monkeypatch, tmp_path):
+    path = str(tmp_path / "crawl.sqlite")
+    crawler = make_site_crawler(monkeypatch, CheckpointPath=path, CheckpointInterval=50)
+    get_valid_links = crawler.get_valid_links
+    def failing_links(response, curr_dir, links=None):
+        if curr_dir == "http://site.test/b":
+            raise CrawlInterrupted()
+        return get_valid_links(response, curr_dir, links)
+    monkeypatch.setattr(crawler, "get_valid_links", failing_links)
+    with pytest.raises(CrawlInterrupted):
+        crawler.start_crawl()
+
+    # b was fetched but its links were never queued, the resumed crawl has to fetch it again
+    resumed = Crawler.Crawler.from_checkpoint(path)
+    refetched = []
+    monkeypatch.setattr(resumed, "fetch", lambda url: refetched.append(url) or SITE.get(url))
+    monkeypatch.setattr(resumed, "update_crawler_data", lambda links, data: None)
+    resumed.resume_crawl()
+    assert sorted(refetched) == ["http://site.test/b", "http://site.test/b/1"]
+    assert set(resumed.getCrawlResults()) == set(SITE)
+
+def test_checkpoint_drops_links_visited_in_earlier_batches(monkeypatch, tmp_path):
+    from backend.CrawlCheckpoint import CrawlCheckpoint
+    path = str(tmp_path / "crawl.sqlite")
+    # d links back to a, which an earlier checkpoint already recorded as visited
+    crawler = make_site_crawler(monkeypatch, CheckpointPath=path, CheckpointInterval=1)
+    monkeypatch.setattr(crawler, "fetch", lambda url: SHARED_SITE.get(url))
+    crawler.start_crawl()
+    crawler.checkpoint.close()
+    checkpoint = CrawlCheckpoint(path)
+    assert checkpoint.load_frontier() == []
+    assert checkpoint.connection.execute("SELECT COUNT(*) FROM frontier").fetchone()[0] == 0
+    checkpoint.close()
+
+    resumed = Crawler.Crawler.from_checkpoint(path)
+    refetched = []
+    monkeypatch.setattr(resumed, "fetch", lambda url: refetched.append(url) or SHARED_SITE.get(url))
+    monkeypatch.setattr(resumed, "update_crawler_data", lambda links, data: None)
+    resumed.resume_crawl()
+    assert refetched == []
+    assert set(resumed.getCrawlResults()) == set(SHARED_SITE)
+
+def test_checkpoint_frontier_matches_non_canonical_links(monkeypatch, tmp_path):
+    from backend.CrawlCheckpoint import CrawlCheckpoint
+    path = str(tmp_path / "crawl.sqlite")
+    pages = {canonicalize_url(url): page for url, page in SITE.items()}
+    crawler = make_site_crawler(monkeypatch, CheckpointPath=path, CheckpointInterval=1)
+    # every link is written with a trailing slash or an explicit port, none of them is canonical
+    monkeypatch.setattr(crawler, "fetch", lambda url: (pages.get(canonicalize_url(url)) or "").replace('">', '/">')
+                        .replace("http://site.test/", "http://site.test:80/"))
+    crawler.start_crawl()
+    assert len(crawler.getCrawlResults()) == len(SITE)
+    crawler.checkpoint.close()
+    checkpoint = CrawlCheckpoint(path)
+    assert checkpoint.load_frontier() == []
+    assert checkpoint.connection.execute("SELECT COUNT(*) FROM frontier").fetchone()[0] == 0
+    checkpoint.close()
+
+def test_crawl_skips_equivalent_urls(monkeypatch):
+    crawler = make_site_crawler(monkeypatch)
+    pages = dict(SITE)
+    pages["http://site.test/"] = '<a href="/a">a</a><a href="/a/">a</a><a href="/a#top">a</a><a href="HTTP://SITE.test:80/b">b</a>'
+    fetched = []
+    # the server answers every spelling of a page, the crawler must only ask for one of them
+    monkeypatch.setattr(crawler, "fetch", lambda url: fetched.append(url) or pages.get(canonicalize_url(url)))
+    crawler.start_crawl()
+    assert sorted(crawler.getCrawlResults()) == sorted(SITE)
+    assert len(fetched) == len(SITE)
+
+class FakeResponse:
+    def __init__(self, url, text, status_code=200, content_type="text/html; charset=utf-8"):
+        self.url = url
+        self.text = text
+        self.status_code = status_code
+        self.headers = {"Content-Type": content_type}
+
+class RedirectingClient:
+    # serves directory pages under their slash terminated URL, like a web server redirecting /docs to /docs/
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def get(self, url, headers=None):
+        self.requested.append(url)
+        if url + "/" in self.pages:
+            url += "/"
+        if url not in self.pages:
+            return FakeResponse(url, "", 404)
+        return FakeResponse(url, self.pages[url])
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_relative_links_resolve_against_the_fetched_url(monkeypatch, concurrency):
+    pages = {
+        "http://site.test/": '<a href="docs">docs</a><a href="/guide/">guide</a>',
+        "http://site.test/docs/": '<a href="intro.html">intro</a>',
+        "http://site.test/docs/intro.html": '<p>intro</p>',
+        "http://site.test/guide/": '<a href="start.html">start</a>',
+        "http://site.test/guide/start.html": '<p>start</p>',
+    }
+    crawler = Crawler.Crawler({"TargetURL": "http://site.test/", "CrawlDepth": 10, "PageNumberLimit": 20,
+                               "UserAgent": "", "RequestDelay": 0, "Concurrency": concurrency})
+    monkeypatch.setattr(crawler, "update_crawler_data", lambda links, data: None)
+    monkeypatch.setattr(socket, "gethostbyname", lambda host: "10.0.0.1")
+    client = RedirectingClient(pages)
+    monkeypatch.setattr(crawler, "get_http_client", lambda: client)
+    crawler.start_crawl()
+    assert sorted(crawler.getCrawlResults()) == ["http://site.test/", "http://site.test/docs", "http://site.test/docs/intro.html",
+                                                 "http://site.test/guide", "http://site.test/guide/start.html"]
+    assert "http://site.test/intro.html" not in client.requested and "http://site.test/start.html" not in client.requested
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_crawl_with_parser_pool(monkeypatch, concurrency):
+    serial = make_site_crawler(monkeypatch)
+    serial.start_crawl()
+    crawler = make_site_crawler(monkeypatch, Concurrency=concurrency, ParserWorkers=2)
+    crawler.start_crawl()
+    root = serial.tree_creator.tree.root
+    assert crawler.tree_creator.get_tree_map(root) == serial.tree_creator.get_tree_map(root)
+    assert crawler.page_text["http://site.test/a/1"] == "a1"
+    # every page but the start page, which is fetched before the crawl loop
+    assert sorted(crawler.page_text) == sorted(SITE)[1:]
+
+def test_fetch_page_does_not_wait_for_the_parser(monkeypatch):
+    crawler = make_site_crawler(monkeypatch, ParserWorkers=1)
+    parser_pool = crawler.create_parser_pool()
+    try:
+        response, ip, parsed = crawler.fetch_page("http://site.test/a", parser_pool)
+        assert isinstance(parsed, Future)
+        assert parsed.result() == (["/a/1", "/a/2"], extract_text(SITE["http://site.test/a"]))
+    finally:
+        parser_pool.close()
+
+def test_crawl_publishes_live_tree_map(monkeypatch):
+    crawler = make_site_crawler(monkeypatch)
+    published = []
+    monkeypatch.setattr(crawler, "update_crawler_data", lambda links, data: published.append(data))
+    crawler.start_crawl()
+    root = crawler.tree_creator.tree.root
+    assert published[-1] is crawler.tree_creator.get_live_tree_map()
+    assert published[-1] == crawler.tree_creator.get_tree_map(root, mode="spanning")
+
+def test_crawl_store(monkeypatch, tmp_path):
+    from backend.CrawlStore import CrawlStore
+    path = str(tmp_path / "crawl.db")
+    crawler = make_site_crawler(monkeypatch, CrawlStorePath=path, Concurrency=3, ParserWorkers=2)
+    crawler.start_crawl()
+    root = crawler.tree_creator.tree.root
+    tree_map = crawler.tree_creator.get_tree_map(root)
+    crawler.store.close()
+
+    with CrawlStore(path) as store:
+        assert set(store.pages) == set(SITE)
+        assert store.pages["http://site.test/b"] == SITE["http://site.test/b"]
+        assert store.texts["http://site.test/a/1"] == "a1"
+        assert store.load_tree().get_tree_map(root) == tree_map
+
+def race(function, threads=8):
+    import threading
+    start = threading.Barrier(threads)
+    results = []
+    def run():
+        start.wait()
+        results.append(function())
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results
+
+def test_http_client_is_created_once(monkeypatch):
+    import time
+    crawler = make_site_crawler(monkeypatch, Concurrency=8)
+    created = []
+    def slow_client(config):
+        time.sleep(0.01)
+        created.append(config)
+        return object()
+    monkeypatch.setattr(Crawler, "HttpClient", slow_client)
+    clients = race(crawler.get_http_client)
+    assert len(created) == 1 and all(client is clients[0] for client in clients)
+
+def test_rate_limiter_is_created_once(monkeypatch):
+    import time
+    from backend.RateLimiter import RateLimiter
+    crawler = make_site_crawler(monkeypatch, Concurrency=8, RequestsPerSecond=5)
+    created = []
+    def slow_from_settings(*args):
+        time.sleep(0.01)
+        created.append(args)
+        return RateLimiter(5)
+    monkeypatch.setattr(RateLimiter, "from_settings", slow_from_settings)
+    limiters = race(crawler.get_rate_limiter)
+    assert len(created) == 1 and all(limiter is limiters[0] for limiter in limiters)
+
+class TypedClient(RedirectingClient):
+    def get(self, url, headers=None):
+        response = super().get(url, headers)
+        if url.endswith((".css", ".js")):
+            response.headers["Content-Type"] = "text/css" if url.endswith(".css") else "application/javascript"
+        return response
+
+@pytest.mark.parametrize("follow_all", [False, True])
+def test_crawl_only_records_pages(monkeypatch, follow_all):
+    pages = {
+        "http://site.test/": '<link href="/site.css"><script src="/app.js"></script><a href="/a">a</a><form action="/b"></form>',
+        "http://site.test/site.css": "body {}",
+        "http://site.test/app.js": "run()",
+        "http://site.test/a": "<p>a</p>",
+        "http://site.test/b": "<p>b</p>",
+    }
+    crawler = Crawler.Crawler({"TargetURL": "http://site.test/", "CrawlDepth": 10, "PageNumberLimit": 4,
+                               "UserAgent": "", "RequestDelay": 0, "FollowAllLinks": follow_all})
+    monkeypatch.setattr(crawler, "update_crawler_data", lambda links, data: None)
+    monkeypatch.setattr(socket, "gethostbyname", lambda host: "10.0.0.1")
+    client = TypedClient(pages)
+    monkeypatch.setattr(crawler, "get_http_client", lambda: client)
+    crawler.start_crawl()
+    if follow_all:
+        # the stylesheet and script are requested but are not pages, they do not use up the page limit
+        assert "http://site.test/site.css" in client.requested
+        assert crawler.getCrawlResults() == ["http://site.test/", "http://site.test/a", "http://site.test/b"]
+        assert crawler.page_count == 3
+    else:
+        assert client.requested == ["http://site.test/", "http://site.test/a"]
+        assert crawler.getCrawlResults() == ["http://site.test/", "http://site.test/a"]
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_crawl_requests_non_pages_once(monkeypatch, concurrency):
+    pages = {
+        "http://site.test/": '<a href="/a">a</a><a href="/b">b</a><a href="/doc.css">doc</a>',
+        "http://site.test/a": '<a href="/doc.css">doc</a><a href="/b">b</a>',
+        "http://site.test/b": '<a href="/doc.css/">doc</a>',
+        "http://site.test/doc.css": "body {}",
+    }
+    crawler = Crawler.Crawler({"TargetURL": "http://site.test/", "CrawlDepth": 10, "PageNumberLimit": 20,
+                               "UserAgent": "", "RequestDelay": 0, "Concurrency": concurrency})
+    monkeypatch.setattr(crawler, "update_crawler_data", lambda links, data: None)
+    monkeypatch.setattr(socket, "gethostbyname", lambda host: "10.0.0.1")
+    client = TypedClient(pages)
+    monkeypatch.setattr(crawler, "get_http_client", lambda: client)
+    crawler.start_crawl()
+    assert client.requested.count("http://site.test/doc.css") == 1
+    assert "http://site.test/doc.css/" not in client.requested
+    assert crawler.page_count == 3
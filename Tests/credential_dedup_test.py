@@ -0,0 +1,27 @@
+import pytest
+from backend.BloomFilter import ScalableBloomFilter
+from backend.CredentialDedup import CredentialDedup
+
+def test_scalable_bloom_filter_grows():
+    bloom = ScalableBloomFilter(initial_capacity=100, error_rate=0.01)
+    added = sum(bloom.add(f"user{i}") for i in range(3000))
+    assert added > 2950 and len(bloom) == added
+    assert len(bloom.filters) == 5
+    assert all(f"user{i}" in bloom for i in range(3000))
+    assert not bloom.add("user7")
+    false_positives = sum(f"other{i}" in bloom for i in range(3000))
+    assert false_positives < 60
+
+@pytest.mark.parametrize("mode", CredentialDedup.modes)
+def test_credential_dedup(mode):
+    dedup = CredentialDedup(mode, initial_capacity=10)
+    credentials = [("admin1", "Password!1"), ("admin1", "Password!2"), ("admin1", "Password!1"), ("root7", "Password!1")]
+    assert list(dedup.filter(credentials)) == [credentials[0], credentials[1], credentials[3]]
+    assert ("admin1", "Password!2") in dedup and ("admin2", "Password!2") not in dedup
+    assert len(dedup) == 3
+    assert dedup.duplicate_rate == pytest.approx(0.25)
+    assert dedup.report() == "1 of 4 generated credentials were duplicates (25.0%)"
+
+def test_invalid_dedup_mode():
+    with pytest.raises(ValueError):
+        CredentialDedup("fuzzy")
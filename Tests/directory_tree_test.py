@@ -0,0 +1,163 @@
+import json
+import tracemalloc
+import pytest
+from backend.DirectoryTreeCreator import DirectoryTreeCreator
+
+NETWORK_MAP = [{
+    'url': "www.google.com",
+    'path': "/",
+    'children': [
+        {'url': "www.google.com/search", 'path': "/search", 'children': []},
+        {'url': "www.google.com/earth", 'path': "/earth", 'children': [
+            {'url': "www.google.com/earth/search", 'path': "/earth/search", 'children': []}
+        ]}
+    ]
+}]
+
+def build_tree():
+    tree_creator = DirectoryTreeCreator()
+    tree_creator.populate(NETWORK_MAP)
+    tree_creator.add_edge(('www.google.com', '/'), ('linked-in.com', '/l'))
+    tree_creator.add_edge(('linked-in.com', '/l'), ('random.com', '/rnd'))
+    tree_creator.add_edge(('www.google.com', '/'), ('random.com', '/rnd'))
+    return tree_creator
+
+def test_tree_creators_do_not_share_a_tree():
+    assert DirectoryTreeCreator().tree is not DirectoryTreeCreator().tree
+
+def test_live_tree_map_matches_rebuilt_map():
+    tree_creator = build_tree()
+    assert tree_creator.get_live_tree_map() == tree_creator.get_tree_map(tree_creator.tree.root, mode="spanning")
+
+def test_edges_since():
+    tree_creator = build_tree()
+    assert len(tree_creator.get_edges_since(0)) == 6
+    assert tree_creator.get_edges_since(5) == [(('www.google.com', '/'), ('random.com', '/rnd'))]
+
+def test_reset_clears_live_map():
+    tree_creator = build_tree()
+    tree_creator.reset()
+    assert tree_creator.get_live_tree_map() == []
+    assert tree_creator.get_edges_since(0) == []
+
+def test_tree_map_json_matches_tree_map():
+    tree_creator = build_tree()
+    root = tree_creator.tree.root
+    assert json.loads("".join(tree_creator.iter_tree_json(root))) == tree_creator.get_tree_map(root)
+
+def test_tree_map_json_small_chunks():
+    tree_creator = build_tree()
+    root = tree_creator.tree.root
+    chunks = list(tree_creator.iter_tree_json(root, chunk_size=1))
+    assert len(chunks) > 1
+    assert json.loads("".join(chunks)) == tree_creator.get_tree_map(root)
+
+def test_tree_map_depth_cutoff():
+    tree_creator = build_tree()
+    root = tree_creator.tree.root
+    data = json.loads("".join(tree_creator.iter_tree_json(root, max_depth=1)))
+    assert [child["path"] for child in data[0]["children"]] == ["www.google.com/search", "www.google.com/earth", "linked-in.com", "random.com"]
+    assert data[0]["children"][1] == {"id": 2, "ip": "/earth", "path": "www.google.com/earth", "children": [], "truncated": True}
+    assert "truncated" not in data[0]["children"][0]
+    assert tree_creator.get_tree_map(root, max_depth=1) == data
+    for mode in tree_creator.traversal_modes:
+        for depth in range(4):
+            assert json.loads("".join(tree_creator.iter_tree_json(root, depth, mode=mode))) == tree_creator.get_tree_map(root, depth, mode)
+    assert tree_creator.get_tree_map(root, max_depth=0)[0] == {"id": 0, "ip": "/", "path": "www.google.com", "children": [], "truncated": True}
+
+def test_deep_tree_export_has_no_recursion_limit(tmp_path):
+    tree_creator = DirectoryTreeCreator()
+    depth = 5000
+    for i in range(depth):
+        tree_creator.add_edge((f"/{i}", "ip"), (f"/{i + 1}", "ip"))
+    root = tree_creator.tree.root
+    path = tmp_path / "tree.json"
+    tree_creator.write_tree_json(root, str(path))
+    text = path.read_text()
+    assert text.count('"children": [') == depth + 1
+    assert text.endswith("]}" * (depth + 1) + "]")
+    node = tree_creator.get_tree_map(root)[0]
+    for _ in range(depth):
+        node = node["children"][0]
+    assert node["path"] == f"/{depth}"
+
+def test_display_pretty(capsys):
+    tree_creator = build_tree()
+    tree_creator.display_pretty(tree_creator.tree.root)
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "www.google.com --> "
+    assert lines[3] == "\t\twww.google.com/earth/search"
+    assert lines[-2:] == ["\t\trandom.com", "\trandom.com (see above)"]
+    tree_creator.display_pretty(tree_creator.tree.root, mode="spanning")
+    assert capsys.readouterr().out.splitlines() == lines[:-1]
+
+def test_default_mode_lists_shared_children_under_every_parent():
+    tree_creator = build_tree()
+    root = tree_creator.tree.root
+    data = tree_creator.get_tree_map(root)
+    assert data == tree_creator.get_tree_map(root, mode="dag")
+    linked_in, shared = data[0]["children"][2:]
+    assert linked_in["children"][0]["path"] == "random.com"
+    assert shared == {"ref": linked_in["children"][0]["id"]}
+
+def build_cyclic_tree():
+    tree_creator = build_tree()
+    tree_creator.add_edge(('random.com', '/rnd'), ('www.google.com', '/'))
+    tree_creator.add_edge(('www.google.com/earth/search', '/earth/search'), ('www.google.com/earth', '/earth'))
+    return tree_creator
+
+def test_spanning_tree_visits_each_vertex_once():
+    tree_creator = build_cyclic_tree()
+    root = tree_creator.tree.root
+    events = list(tree_creator.walk(root))
+    entered = [vertex for event, vertex, _ in events if event == "enter"]
+    assert len(entered) == len(set(entered)) == 6
+    assert json.loads("".join(tree_creator.iter_tree_json(root))) == tree_creator.get_tree_map(root)
+
+def test_dag_mode_uses_back_references():
+    tree_creator = build_cyclic_tree()
+    root = tree_creator.tree.root
+    data = tree_creator.get_tree_map(root, mode="dag")
+    ids = {}
+    refs = []
+    stack = list(data)
+    while stack:
+        node = stack.pop()
+        if "ref" in node:
+            refs.append(node["ref"])
+            continue
+        ids[node["id"]] = node["path"]
+        stack.extend(node["children"])
+    assert len(ids) == 6
+    assert sorted(ids[ref] for ref in refs) == ["random.com", "www.google.com", "www.google.com/earth"]
+    assert json.loads("".join(tree_creator.iter_tree_json(root, mode="dag", chunk_size=1))) == data
+
+def test_live_tree_map_survives_cycles():
+    tree_creator = build_cyclic_tree()
+    live = tree_creator.get_live_tree_map()
+    assert json.loads(json.dumps(live)) == tree_creator.get_tree_map(tree_creator.tree.root, mode="spanning")
+
+@pytest.mark.parametrize("mode", DirectoryTreeCreator.traversal_modes)
+def test_tree_map_of_a_vertex_outside_the_tree(mode):
+    tree_creator = build_tree()
+    outside = ("www.example.com", "/x")
+    data = tree_creator.get_tree_map(outside, mode=mode)
+    assert data == [{"ip": "/x", "path": "www.example.com", "children": []}]
+    assert json.loads("".join(tree_creator.iter_tree_json(outside, mode=mode))) == data
+
+def test_invalid_traversal_mode():
+    tree_creator = build_tree()
+    with pytest.raises(ValueError):
+        list(tree_creator.walk(tree_creator.tree.root, mode="tree"))
+
+def test_live_map_memory_per_node():
+    urls = [f"http://site.test/section/{i % 100}/page-{i}" for i in range(20000)]
+    tracemalloc.start()
+    tree_creator = DirectoryTreeCreator()
+    for i in range(1, len(urls)):
+        tree_creator.add_edge((urls[(i - 1) // 4], "10.0.0.1"), (urls[i], "10.0.0.1"))
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # tree plus the live map dicts, the bookkeeping next to them is a pointer and an int per node
+    assert used / len(urls) < 450
+    assert len(tree_creator.get_edges_since(0)) == len(urls) - 1
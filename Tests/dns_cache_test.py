@@ -0,0 +1,63 @@
+from backend.DnsCache import DnsCache
+
+def counting_resolver(calls):
+    def resolve(hostname):
+        calls.append(hostname)
+        return "10.0.0." + str(len(calls))
+    return resolve
+
+def test_dns_cache_hits_and_misses():
+    calls = []
+    cache = DnsCache(ttl=60, resolver=counting_resolver(calls))
+    assert cache.resolve("a.test") == cache.resolve("a.test")
+    cache.resolve("b.test")
+    assert calls == ["a.test", "b.test"]
+    assert cache.get_stats() == {"hits": 1, "misses": 2, "size": 2}
+
+def test_dns_cache_ttl_zero_disables_caching():
+    calls = []
+    cache = DnsCache(ttl=0, resolver=counting_resolver(calls))
+    cache.resolve("a.test")
+    cache.resolve("a.test")
+    assert len(calls) == 2
+
+def test_dns_cache_resolve_many():
+    calls = []
+    cache = DnsCache(ttl=60, resolver=counting_resolver(calls))
+    cache.resolve("a.test")
+    results = cache.resolve_many(["a.test", "b.test", "b.test", "c.test"])
+    assert set(results) == {"a.test", "b.test", "c.test"}
+    assert sorted(calls) == ["a.test", "b.test", "c.test"]
+
+def test_dns_cache_resolve_many_skips_failures():
+    def resolver(hostname):
+        raise OSError("no such host")
+    cache = DnsCache(ttl=60, resolver=resolver)
+    assert cache.resolve_many(["bad.test"]) == {}
+
+def test_dns_cache_counts_prefetched_lookups_once():
+    calls = []
+    cache = DnsCache(ttl=60, resolver=counting_resolver(calls))
+    cache.resolve("a.test")
+    cache.resolve_many(["a.test", "b.test"])
+    cache.resolve("a.test")
+    cache.resolve("b.test")
+    cache.resolve("b.test")
+    assert calls == ["a.test", "b.test"]
+    assert cache.get_stats() == {"hits": 2, "misses": 2, "size": 2}
+
+def test_dns_cache_evicts_expired_and_oldest_entries(monkeypatch):
+    import time
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    calls = []
+    cache = DnsCache(ttl=60, resolver=counting_resolver(calls), max_entries=2)
+    cache.resolve("a.test")
+    cache.resolve("b.test")
+    cache.resolve("c.test")
+    assert cache.get_stats()["size"] == 2
+    cache.resolve("a.test")  # evicted as the oldest, looked up again
+    assert calls == ["a.test", "b.test", "c.test", "a.test"]
+    now[0] += 61
+    cache.resolve("c.test")  # expired entries are dropped when read
+    assert cache.get_stats()["size"] == 2 and len(calls) == 5
@@ -0,0 +1,57 @@
+import pytest
+from backend.Frontier import Frontier
+
+def drain(frontier):
+    urls = []
+    entry = frontier.pop()
+    while entry is not None:
+        urls.append(entry[0])
+        entry = frontier.pop()
+    return urls
+
+def test_frontier_dfs_keeps_page_order():
+    frontier = Frontier("dfs")
+    frontier.push_many(["a", "b"], None, 1)
+    assert frontier.pop()[0] == "a"
+    frontier.push_many(["a1", "a2"], None, 2)
+    assert drain(frontier) == ["a1", "a2", "b"]
+
+def test_frontier_bfs():
+    frontier = Frontier("bfs")
+    frontier.push_many(["a", "b"], None, 1)
+    assert frontier.pop()[0] == "a"
+    frontier.push_many(["a1", "a2"], None, 2)
+    assert drain(frontier) == ["b", "a1", "a2"]
+
+def test_frontier_shallow_first_uses_depth_then_score():
+    frontier = Frontier("shallow")
+    frontier.push("http://x.test/a/b/c", None, 1)
+    frontier.push("http://x.test/deep", None, 2)
+    frontier.push("http://x.test/a", None, 1)
+    assert drain(frontier) == ["http://x.test/a", "http://x.test/a/b/c", "http://x.test/deep"]
+
+def test_frontier_custom_score():
+    frontier = Frontier("shallow", score=lambda url, depth: len(url))
+    frontier.push_many(["short", "much longer"], None, 1)
+    assert drain(frontier) == ["much longer", "short"]
+
+@pytest.mark.parametrize("strategy", Frontier.strategies)
+def test_frontier_peek_matches_pop_order(strategy):
+    frontier = Frontier(strategy)
+    frontier.push_many(["http://x.test/a/b", "http://x.test/a", "http://x.test/c"], None, 1)
+    frontier.push("http://x.test/d", None, 2)
+    peeked = [entry[0] for entry in frontier.peek(3)]
+    assert len(frontier) == 4
+    assert peeked == drain(frontier)[:3]
+
+def test_frontier_len():
+    frontier = Frontier("bfs")
+    assert not frontier
+    frontier.push("a", None, 1)
+    assert len(frontier) == 1
+    assert frontier.pop() == ("a", None, 1)
+    assert frontier.pop() is None
+
+def test_frontier_invalid_strategy():
+    with pytest.raises(ValueError):
+        Frontier("random")
@@ -0,0 +1,19 @@
+import pytest
+from backend.HttpClient import HttpClient, get_shared_client
+
+def test_http_client_pool_config():
+    client = HttpClient({"PoolSize": 4, "Timeout": 2})
+    adapter = client.session.get_adapter("https://example.com")
+    assert adapter._pool_maxsize == 4
+    assert client.config["Timeout"] == 2.0
+
+def test_http_client_keep_alive_off():
+    client = HttpClient({"KeepAlive": False})
+    assert client.session.headers["Connection"] == "close"
+
+def test_http_client_invalid_pool_size():
+    with pytest.raises(ValueError):
+        HttpClient({"PoolSize": 0})
+
+def test_shared_client_is_reused():
+    assert get_shared_client() is get_shared_client()
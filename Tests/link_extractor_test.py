@@ -0,0 +1,35 @@
+import pytest
+from backend.LinkExtractor import extractors, get_link_extractor
+
+PAGE = """<html><head><link rel="stylesheet" href="/site.css"><script src="/app.js"></script></head>
+<body><a href="/a?x=1&amp;y=2">a</a><a name="anchor">no link</a><area href="/map">
+<form action="/login"><input name="user"></form><iframe src="/embed"></iframe><img src="/logo.png"></body></html>"""
+EXPECTED = ["/a?x=1&y=2"]
+EXPECTED_ALL = ["/site.css", "/app.js", "/a?x=1&y=2", "/map", "/login", "/embed"]
+
+@pytest.mark.parametrize("name", ["fast", "bs4"])
+def test_link_extractors(name):
+    assert get_link_extractor(name)(PAGE) == EXPECTED
+    assert get_link_extractor(name, all_links=True)(PAGE) == EXPECTED_ALL
+
+def test_lxml_link_extractor():
+    pytest.importorskip("lxml")
+    assert get_link_extractor("lxml")(PAGE) == EXPECTED
+    assert get_link_extractor("lxml", all_links=True)(PAGE) == EXPECTED_ALL
+
+@pytest.mark.parametrize("all_links", [False, True])
+def test_lxml_matches_html_parser(all_links):
+    pytest.importorskip("lxml")
+    page = ("<html><head><base href='/x/'><link href='/s.css'></head><body>"
+            + "".join(f"<div><a href='/p/{i}?q={i}&amp;r=1'>{i}</a><A HREF=\"rel/{i}\">up</A><a>none</a>"
+                      f"<iframe src='/f/{i}'></iframe></div>" for i in range(50))
+            + "<form action='/go'></form><a href='  /spaced '>s</a><a href='/caf&eacute;'>c</a></body></html>")
+    assert get_link_extractor("lxml", all_links)(page) == get_link_extractor("fast", all_links)(page)
+
+def test_unknown_link_extractor():
+    with pytest.raises(ValueError):
+        get_link_extractor("regex")
+
+def test_extractors_agree_on_broken_markup():
+    page = "<a href='/one'>one<a href=/two><div><a href=\"/three\"</div>"
+    assert extractors["fast"](page)[:2] == extractors["bs4"](page)[:2] == ["/one", "/two"]
@@ -0,0 +1,364 @@
+import csv
+import threading
+import time
+import os
+import pytest
+from mdp3 import WebScraper, clean_text, nlp_subroutine
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+class FakeClient:
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def get(self, url, timeout=None):
+        self.requested.append(url)
+        if url not in self.pages:
+            raise ConnectionError(url)
+        return FakeResponse(self.pages[url])
+
+class SlowClient(FakeClient):
+    def __init__(self, pages, delay):
+        super().__init__(pages)
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, timeout=None):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return super().get(url, timeout)
+
+def test_scraper_reuses_crawled_pages():
+    client = FakeClient({"http://site.test/c": "<p>fetched</p>"})
+    scraper = WebScraper(["http://site.test/a", "http://site.test/b", "http://site.test/c"], client=client,
+                         bodies={"http://site.test/a": "<h1>body</h1>", "http://site.test/b": "<p>ignored</p>"},
+                         texts={"http://site.test/b": "parsed"})
+    rows = scraper.scrape_pages()
+    assert [row[:3] for row in rows] == [(1, "body", "http://site.test/a"),
+                                         (2, "parsed", "http://site.test/b"),
+                                         (3, "fetched", "http://site.test/c")]
+    assert rows[0][3] == rows[1][3] == ""
+    assert rows[2][3] >= 0
+    assert client.requested == ["http://site.test/c"]
+
+def test_scraper_from_store(tmp_path):
+    from backend.CrawlStore import CrawlStore
+    with CrawlStore(str(tmp_path / "crawl.db")) as store:
+        store.pages["http://site.test/"] = "<p>root</p>"
+        store.pages["http://site.test/a"] = "<span>a</span>"
+        scraper = WebScraper.from_store(store, client=FakeClient({}))
+        assert scraper.scrape_pages() == [(1, "root", "http://site.test/", ""), (2, "a", "http://site.test/a", "")]
+
+def test_concurrent_scraper_caps_workers():
+    pages = {f"http://host{i}.test/": f"<p>{i}</p>" for i in range(8)}
+    client = SlowClient(pages, 0.05)
+    scraper = WebScraper(list(pages), client=client, concurrency=4, host_delay=0)
+    rows = scraper.scrape_pages()
+    assert [row[1] for row in rows] == [str(i) for i in range(8)]
+    assert 1 < client.peak <= 4
+
+def test_scraper_spaces_requests_to_the_same_host():
+    pages = {"http://site.test/a": "<p>a</p>", "http://site.test/b": "<p>b</p>", "http://other.test/": "<p>c</p>"}
+    scraper = WebScraper(list(pages), client=FakeClient(pages), concurrency=3, host_delay=0.2)
+    start = time.monotonic()
+    scraper.scrape_pages()
+    assert 0.2 <= time.monotonic() - start < 1
+
+def test_generate_csv_streams_rows(tmp_path):
+    pages = {"http://site.test/a": "<p>a</p>", "http://site.test/b": "<p>b</p>"}
+    scraper = WebScraper(list(pages) + ["http://site.test/missing"], client=FakeClient(pages), concurrency=2, host_delay=0)
+    path = tmp_path / "web_text.csv"
+    scraper.generate_csv(str(path))
+    with open(path, newline="", encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    assert sorted(row["content"] for row in rows) == ["a", "b"]
+    assert all(float(row["latency_ms"]) >= 0 for row in rows)
+
+def write_corpus(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["id", "content", "url", "latency_ms"])
+        writer.writerows(rows)
+
+def test_clean_text():
+    assert clean_text("The e-mail of NASA and this well-known Ｗｉｋｉ page") == "mail NASA well known Wiki page"
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_nlp_subroutine_streams_chunks(tmp_path, workers):
+    path = tmp_path / "web_text.csv"
+    rows = [(i, f"Those pages mention item-{i} and TRACE", f"http://site.test/{i}", "1.5") for i in range(25)]
+    rows.append((25, "", "http://site.test/empty", ""))
+    write_corpus(path, rows)
+    nlp_subroutine(str(path), workers=workers, chunk_size=4)
+    with open(path, newline="", encoding="utf-8") as file:
+        cleaned = list(csv.DictReader(file))
+    assert [row["id"] for row in cleaned] == [str(i) for i in range(26)]
+    assert cleaned[3]["content"] == "pages mention item TRACE"
+    assert cleaned[3]["latency_ms"] == "1.5"
+    assert cleaned[25]["content"] == ""
+    assert [name for name in os.listdir(tmp_path)] == ["web_text.csv"]
+
+def test_nlp_subroutine_keeps_original_on_error(tmp_path):
+    path = tmp_path / "web_text.csv"
+    path.write_text("id,text\n1,hello\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        nlp_subroutine(str(path))
+    assert path.read_text(encoding="utf-8") == "id,text\n1,hello\n"
+    assert os.listdir(tmp_path) == ["web_text.csv"]
+
+def test_generator_saves_vocabulary_next_to_csv(tmp_path, monkeypatch):
+    from mdp3 import CredentialGeneratorMDP
+    csv_path = tmp_path / "web_text.csv"
+    write_corpus(csv_path, [(1, "security portal password administrator", "http://site.test/", "")])
+    wordlist_path = tmp_path / "wordlist.txt"
+    wordlist_path.write_text("admin\nletmein\n", encoding="utf-8")
+
+    generator = CredentialGeneratorMDP(str(csv_path), str(wordlist_path))
+    generator.build_state_transitions()
+    assert (tmp_path / "web_text.vocab.npz").exists()
+    assert "username_ad" in generator.username_mdp.initial_states
+    assert set(generator.password_mdp.state_transitions["password_adm"]) == {"i"}
+
+    def no_rebuild(*args, **kwargs):
+        raise AssertionError("vocabulary was rebuilt")
+    monkeypatch.setattr("mdp3.VocabularyIndex.build", no_rebuild)
+    cached = CredentialGeneratorMDP(str(csv_path), str(wordlist_path))
+    cached.build_state_transitions()
+    assert cached.vocabulary.digest == generator.vocabulary.digest
+    assert dict(cached.username_mdp.state_transitions) == dict(generator.username_mdp.state_transitions)
+
+def test_generator_cache_dir(tmp_path):
+    from mdp3 import CredentialGeneratorMDP
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    csv_path = corpus / "web_text.csv"
+    write_corpus(csv_path, [(1, "security portal password administrator", "http://site.test/", "")])
+    wordlist_path = corpus / "wordlist.txt"
+    wordlist_path.write_text("admin\nletmein\n", encoding="utf-8")
+
+    generator = CredentialGeneratorMDP(str(csv_path), str(wordlist_path), cache_dir=str(tmp_path / "cache"))
+    generator.build_state_transitions()
+    assert os.listdir(tmp_path / "cache") == ["web_text.vocab.npz"]
+    generator.generate_credentials(20, batch_size=10, seed=1)
+    assert sorted(os.listdir(tmp_path / "cache")) == ["web_text.model.npz", "web_text.vocab.npz"]
+    assert sorted(os.listdir(corpus)) == ["web_text.csv", "wordlist.txt"]
+    reloaded = CredentialGeneratorMDP(str(csv_path), str(wordlist_path), cache_dir=str(tmp_path / "cache"))
+    reloaded.build_state_transitions()
+    assert generator.username_mdp.q_table.q.any()
+    assert (reloaded.username_mdp.q_table.q == generator.username_mdp.q_table.q).all()
+
+def make_mdp():
+    from mdp3 import CredentialMDP
+    mdp = CredentialMDP(order=2)
+    for word in ("admin", "adopt"):
+        for i in range(len(word) - 2):
+            mdp.state_transitions[f"username_{word[i:i + 2]}"][word[i + 2]].add(word[i + 2])
+    mdp.compile()
+    return mdp
+
+def test_q_table_update_and_greedy_choice():
+    mdp = make_mdp()
+    mdp.epsilon = 0
+    assert sorted(mdp.get_possible_actions("username_ad")) == ["m", "o"]
+    assert mdp.get_possible_actions("username_zz") == []
+    assert mdp.choose_action("username_zz") == ("", "")
+
+    mdp.update_q_value("username_dm", "i", "i", "username_mi", 1.0)
+    assert mdp.get_q_value("username_dm", "i", "i") == pytest.approx(0.1)
+    mdp.update_q_value("username_ad", "m", "m", "username_dm", 0.5)
+    assert mdp.get_q_value("username_ad", "m", "m") == pytest.approx(0.1 * (0.5 + 0.9 * 0.1))
+    assert mdp.choose_action("username_ad") == ("m", "m")
+    assert mdp.q_values["username_ad"] == {("m", "m"): pytest.approx(0.059), ("o", "o"): 0.0}
+
+def test_q_values_write_through():
+    mdp = make_mdp()
+    mdp.epsilon = 0
+    mdp.q_values["username_ad"][("o", "o")] = 2.0
+    assert mdp.get_q_value("username_ad", "o", "o") == 2.0
+    assert mdp.choose_action("username_ad") == ("o", "o")
+    with pytest.raises(TypeError):
+        del mdp.q_values["username_ad"][("o", "o")]
+    # pairs that are not transitions are kept aside and not chosen, until state_transitions gets them
+    mdp.update_q_value("username_ad", "x", "x", "username_dx", 1.0)
+    mdp.q_values["username_zz"][("y", "y")] = 5.0
+    assert mdp.q_values["username_ad"][("x", "x")] == pytest.approx(0.1)
+    assert mdp.q_values["username_ad"] == {("m", "m"): 0.0, ("o", "o"): 2.0, ("x", "x"): pytest.approx(0.1)}
+    assert "username_zz" in mdp.q_values and mdp.q_values["username_qq"][("a", "a")] == 0.0
+    assert mdp.choose_action("username_ad") == ("o", "o")
+    mdp.state_transitions["username_ad"]["x"].add("x")
+    mdp.state_transitions["username_ad"]["o"].discard("o")
+    assert mdp.get_possible_actions("username_ad") == ["m", "x"]
+    assert mdp.choose_action("username_ad") == ("x", "x")
+    assert mdp.unlisted_q_values == {("username_ad", "o", "o"): 2.0, ("username_zz", "y", "y"): 5.0}
+
+def test_state_transitions_changes_recompile_the_q_table():
+    mdp = make_mdp()
+    q_table = mdp.get_q_table()
+    assert mdp.get_q_table() is q_table
+    mdp.state_transitions["username_ad"]["d"].add("d")
+    assert mdp.get_q_table() is not q_table and len(mdp.q_table) == 7
+    q_table = mdp.q_table
+    mdp.state_transitions["username_new"]
+    assert mdp.get_q_table() is not q_table and "username_new" in mdp.q_table.state_ids
+    mdp.state_transitions = {"username_ab": {"c": {"c"}}}
+    assert mdp.get_possible_actions("username_ab") == ["c"] and mdp.get_possible_actions("username_ad") == []
+
+def test_q_table_recompile_keeps_q_values():
+    mdp = make_mdp()
+    mdp.update_q_value("username_ad", "o", "o", "username_do", 1.0)
+    mdp.state_transitions["username_ad"]["d"].add("d")
+    mdp.compile()
+    assert mdp.get_q_value("username_ad", "o", "o") == pytest.approx(0.1)
+    assert mdp.get_q_value("username_ad", "d", "d") == 0.0
+    assert len(mdp.q_table) == 7
+
+def test_q_table_max_cache_matches_scan():
+    import random
+    from mdp3 import CredentialMDP
+    rng = random.Random(3)
+    mdp = CredentialMDP(order=1)
+    for state in "abcdef":
+        mdp.state_transitions[f"username_{state}"]  # states without transitions are part of the table too
+        for action in rng.sample("abcdefgh", rng.randint(0, 4)):
+            mdp.state_transitions[f"username_{state}"][action].update(rng.sample("xyz", rng.randint(1, 3)))
+    q_table = mdp.compile()
+    for _ in range(2000):
+        pair = rng.randrange(len(q_table))
+        q_table.set_q(pair, rng.choice([-1.0, 0.0, 0.5, 1.0, rng.random()]))
+        for state_id in range(len(q_table.state_names)):
+            start, end = q_table.pair_range(state_id)
+            if end == start:
+                assert q_table.best_pair[state_id] == -1 and q_table.max_q(state_id) == 0.0
+                continue
+            values = q_table.q[start:end]
+            assert q_table.max_q(state_id) == values.max()
+            assert q_table.best_pair[state_id] == start + values.argmax()
+
+def make_generator(tmp_path):
+    from mdp3 import CredentialGeneratorMDP
+    tmp_path.mkdir(exist_ok=True)
+    csv_path = tmp_path / "web_text.csv"
+    write_corpus(csv_path, [(1, "security portal password administrator network services", "http://site.test/", "")])
+    wordlist_path = tmp_path / "wordlist.txt"
+    wordlist_path.write_text("admin\nletmein\nrootroot\n", encoding="utf-8")
+    return CredentialGeneratorMDP(str(csv_path), str(wordlist_path))
+
+def test_batched_generation(tmp_path):
+    generator = make_generator(tmp_path)
+    credentials = generator.generate_credentials(300, batch_size=64, seed=7)
+    assert len(credentials) == 300
+    for username, password in credentials:
+        assert username[-1].isdigit()
+        assert password[0].isupper() and password[-2] in "!@#$%^&*" and password[-1].isdigit()
+    assert all(username in generator.username_mdp.used_usernames for username, _ in credentials)
+    assert generator.username_mdp.q_table.q.any()
+    # a fresh corpus directory, the first generator left its trained model next to its CSV
+    assert make_generator(tmp_path / "fresh").generate_credentials(300, batch_size=64, seed=7) == credentials
+
+def test_batched_learning_matches_set_q(tmp_path):
+    generator = make_generator(tmp_path)
+    generator.generate_credentials(200, batch_size=50, seed=1)
+    q_table = generator.password_mdp.q_table
+    best, maxima = q_table.best_pair.copy(), q_table.max_q_of.copy()
+    q_table.refresh_max()
+    assert (q_table.best_pair == best).all() and (q_table.max_q_of == maxima).all()
+
+def test_iter_credentials_streams(tmp_path):
+    import itertools
+    generator = make_generator(tmp_path)
+    stream = generator.iter_credentials(10 ** 9, batch_size=16, seed=3)
+    assert len(list(itertools.islice(stream, 40))) == 40
+    with pytest.raises(ValueError):
+        list(generator.iter_credentials(10, batch_size=0))
+
+def test_sharded_generation(tmp_path):
+    generator = make_generator(tmp_path)
+    credentials = generator.generate_credentials(100, batch_size=25, workers=2, seed=5)
+    assert len(credentials) == 100
+    # the first batch comes from a fresh worker, so it matches a fresh generator given the same seed
+    assert credentials[:25] == make_generator(tmp_path).generate_credentials(25, batch_size=25, seed=5)
+
+def test_build_state_transitions_is_idempotent(tmp_path):
+    generator = make_generator(tmp_path)
+    generator.build_state_transitions()
+    initial_states = list(generator.password_mdp.initial_states)
+    q_table = generator.password_mdp.q_table
+    generator.build_state_transitions()
+    generator.generate_credentials(5)
+    assert generator.password_mdp.initial_states == initial_states
+    assert generator.password_mdp.q_table is q_table
+
+def test_trained_model_is_saved_and_reloaded(tmp_path):
+    generator = make_generator(tmp_path)
+    generator.generate_credentials(200, batch_size=50, seed=2)
+    assert (tmp_path / "web_text.model.npz").exists()
+
+    reloaded = make_generator(tmp_path)
+    reloaded.build_state_transitions()
+    for name in ("username_mdp", "password_mdp"):
+        trained, loaded = getattr(generator, name), getattr(reloaded, name)
+        assert (loaded.q_table.q == trained.q_table.q).all()
+        assert (loaded.q_table.best_pair == trained.q_table.best_pair).all()
+    assert reloaded.username_mdp.used_usernames.digests == generator.username_mdp.used_usernames.digests
+
+    # another wordlist is another corpus, its generator starts from scratch
+    from mdp3 import CredentialGeneratorMDP
+    (tmp_path / "wordlist.txt").write_text("admin\nqwerty\n", encoding="utf-8")
+    other = CredentialGeneratorMDP(str(tmp_path / "web_text.csv"), str(tmp_path / "wordlist.txt"))
+    other.build_state_transitions()
+    assert not other.load_model()
+    assert not other.password_mdp.q_table.q.any() and not other.username_mdp.used_usernames
+
+def test_alias_table_follows_weights():
+    import numpy as np
+    from mdp3 import AliasTable
+    weights = [5, 0, 1, 2, 0.5]
+    table = AliasTable(weights)
+    draws = table.sample(np.random.default_rng(0), 200000)
+    frequencies = np.bincount(draws, minlength=len(weights)) / len(draws)
+    assert frequencies == pytest.approx(np.array(weights) / sum(weights), abs=0.005)
+    assert all(table.sample_one() != 1 for _ in range(1000))
+    for invalid in ([], [0, 0], [1, -1]):
+        with pytest.raises(ValueError):
+            AliasTable(invalid)
+
+def test_initial_states_are_unique_and_weighted():
+    import numpy as np
+    from mdp3 import CredentialMDP
+    mdp = CredentialMDP(order=2)
+    assert mdp.sample_initial_state() is None
+    mdp.set_initial_states(["username_ad", "username_ro", "username_ad", "username_pa"], [1, 2, 3, 0])
+    assert mdp.initial_states == ["username_ad", "username_ro"]
+    assert mdp.initial_weights.tolist() == [4, 2]
+    draws = mdp.sample_initial_states(np.random.default_rng(1), 60000)
+    assert (draws == 0).mean() == pytest.approx(2 / 3, abs=0.01)
+    assert mdp.sample_initial_state() in mdp.initial_states
+
+@pytest.mark.parametrize("mode", ["exact", "bloom"])
+def test_deduplicated_generation(tmp_path, mode):
+    from backend.CredentialDedup import CredentialDedup
+    generator = make_generator(tmp_path)
+    dedup = CredentialDedup(mode, initial_capacity=100)
+    credentials = generator.generate_credentials(200, seed=4, dedup=dedup)
+    assert len(credentials) == len(set(credentials)) == 200
+    assert dedup.seen - dedup.duplicates == 200
+    # a later run skips everything the first one handed out
+    more = generator.generate_credentials(100, seed=5, dedup=dedup)
+    assert not set(more) & set(credentials)
+    # the attempts run out long before 10 ** 6 unique credentials, the repeats among them are counted
+    seen, duplicates = dedup.seen, dedup.duplicates
+    few = generator.generate_credentials(10 ** 6, batch_size=256, dedup=dedup, max_attempts=500)
+    assert dedup.seen - seen == 500
+    assert len(few) == 500 - (dedup.duplicates - duplicates)
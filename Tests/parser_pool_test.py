@@ -0,0 +1,14 @@
+from backend.ParserPool import ParserPool, extract_text, parse_page
+
+PAGE = "<html><body><h1>Admin</h1><p>Portal <a href='/login'>login</a></p><div>skipped</div></body></html>"
+
+def test_parse_page():
+    links, text = parse_page(PAGE)
+    assert links == ["/login"]
+    assert text == extract_text(PAGE) == "Admin Portal login"
+
+def test_parser_pool_parses_in_order():
+    with ParserPool(workers=2, max_pending=2) as pool:
+        futures = [pool.submit(f"<p>page {i}</p><a href='/{i}'>x</a>") for i in range(6)]
+        results = [future.result() for future in futures]
+    assert results == [([f"/{i}"], f"page {i}") for i in range(6)]
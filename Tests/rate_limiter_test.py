@@ -0,0 +1,33 @@
+import time
+import pytest
+from backend.RateLimiter import RateLimiter
+
+def test_rate_limiter_from_delay():
+    limiter = RateLimiter.from_settings(0, 500)
+    assert limiter.rate == 2.0
+
+def test_rate_limiter_rps_wins_over_delay():
+    limiter = RateLimiter.from_settings(10, 500)
+    assert limiter.rate == 10.0
+
+def test_rate_limiter_disabled():
+    limiter = RateLimiter.from_settings(0, 0)
+    assert limiter.acquire("http://a.test/") == 0.0
+    assert limiter.acquire("http://a.test/") == 0.0
+
+def test_rate_limiter_is_per_host():
+    limiter = RateLimiter(rate=20)
+    start = time.monotonic()
+    limiter.acquire("http://a.test/1")
+    limiter.acquire("http://b.test/1")
+    assert time.monotonic() - start < 0.04
+    assert limiter.acquire("http://a.test/2") > 0
+
+def test_rate_limiter_burst():
+    limiter = RateLimiter(rate=1, burst=3)
+    waits = [limiter.acquire("http://a.test/") for _ in range(3)]
+    assert waits == [0.0, 0.0, 0.0]
+
+def test_rate_limiter_invalid():
+    with pytest.raises(ValueError):
+        RateLimiter(rate=-1)
@@ -0,0 +1,113 @@
+import tracemalloc
+import pytest
+from backend.Tree import Tree
+
+def v(name):
+    return (f"http://site.test/{name}", "10.0.0.1")
+
+def test_tree_root_is_first_vertex():
+    tree = Tree()
+    tree.add_edge(v("a"), v("b"))
+    assert tree.root == v("a")
+
+def test_tree_ignores_duplicate_edges_and_keeps_order():
+    tree = Tree()
+    for child in ["c", "b", "d", "b"]:
+        tree.add_edge(v("a"), v(child))
+    assert tree.get_children(v("a")) == [v("c"), v("b"), v("d")]
+    assert tree.dir_tree[v("a")] == [v("c"), v("b"), v("d")]
+
+def test_tree_remove_edge():
+    tree = Tree()
+    tree.add_edge(v("a"), v("b"))
+    tree.add_edge(v("a"), v("c"))
+    tree.remove_edge(v("a"), v("b"))
+    tree.remove_edge(v("a"), v("missing"))
+    assert not tree.has_edge(v("a"), v("b"))
+    assert tree.get_children(v("a")) == [v("c")]
+    assert tree.get_parents(v("b")) == []
+    tree.add_edge(v("a"), v("b"))
+    assert tree.get_children(v("a")) == [v("c"), v("b")]
+
+def test_tree_remove_vertex_updates_both_directions():
+    tree = Tree()
+    tree.add_edge(v("a"), v("b"))
+    tree.add_edge(v("c"), v("b"))
+    tree.add_edge(v("b"), v("d"))
+    tree.add_edge(v("b"), v("b"))
+    tree.remove_vertex(v("b"))
+    assert not tree.has_vertex(v("b"))
+    assert v("b") not in tree.dir_tree
+    assert tree.get_children(v("a")) == [] and tree.get_children(v("c")) == []
+    assert tree.get_parents(v("d")) == []
+    assert len(tree.dir_tree) == 3
+
+def test_tree_hub_edges():
+    tree = Tree()
+    children = [v(i) for i in range(Tree.HUB_DEGREE * 4)]
+    for child in children:
+        tree.add_edge(v("hub"), child)
+        tree.add_edge(v("other"), child)
+    assert tree.has_edge(v("hub"), children[-1]) and not tree.has_edge(children[-1], v("hub"))
+    tree.remove_edge(v("hub"), children[5])
+    tree.add_edge(v("hub"), children[0])
+    assert not tree.has_edge(v("hub"), children[5])
+    assert tree.get_children(v("hub")) == children[:5] + children[6:]
+    tree.add_edge(v("hub"), children[5])
+    assert tree.get_children(v("hub"))[-1] == children[5]
+    tree.remove_vertex(v("hub"))
+    assert tree.get_parents(children[5]) == [v("other")]
+    tree.add_edge(v("hub"), children[1])
+    assert tree.get_children(v("hub")) == [children[1]]
+
+def test_tree_views_are_read_only():
+    tree = Tree()
+    tree.add_edge(v("a"), v("b"))
+    assert tree.dir_tree is tree.dir_tree
+    with pytest.raises(TypeError):
+        tree.dir_tree[v("a")].append(v("c"))
+    with pytest.raises(TypeError):
+        tree.parents[v("b")].remove(v("a"))
+    with pytest.raises(TypeError):
+        tree.dir_tree[v("c")] = [v("a")]
+    assert tree.get_children(v("a")) == [v("b")]
+
+def test_tree_parents():
+    tree = Tree()
+    tree.add_edge(v("a"), v("c"))
+    tree.add_edge(v("b"), v("c"))
+    assert tree.get_parents(v("c")) == [v("a"), v("b")]
+
+def test_tree_same_url_different_ip():
+    tree = Tree()
+    other = ("http://site.test/a", "10.0.0.2")
+    tree.add_edge(v("a"), other)
+    assert tree.has_vertex(other) and tree.has_vertex(v("a"))
+    assert tree.get_children(v("a")) == [other]
+
+def test_tree_interns_strings():
+    tree = Tree()
+    for i in range(100):
+        tree.add_edge(v("root"), (f"http://site.test/{i}", "10.0.0." + "1"))
+    assert len(tree.ips) == 1
+    assert len(tree.urls) == 101
+
+def test_tree_memory_per_node():
+    urls = [f"http://site.test/section/{i % 100}/page-{i}" for i in range(20000)]
+    tracemalloc.start()
+    tree = Tree()
+    for i, url in enumerate(urls[1:], 1):
+        tree.add_edge((urls[(i - 1) // 4], "10.0.0.1"), (url, "10.0.0.1"))
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # excluding the url strings themselves
+    assert used / len(urls) < 150
+
+def test_tree_lookups_of_non_vertices():
+    tree = Tree()
+    tree.add_edge(v("a"), v("b"))
+    for value in (None, "abc", ("a", "b", "c"), ("http://site.test/a",)):
+        assert value not in tree.dir_tree and value not in tree.parents
+        assert tree.dir_tree.get(value, []) == []
+        assert not tree.has_vertex(value) and not tree.has_edge(v("a"), value)
+        assert tree.get_children(value) == []
@@ -0,0 +1,46 @@
+import pytest
+from backend.BloomFilter import BloomFilter
+from backend.VisitedIndex import DigestSet, VisitedIndex
+from backend.utils import canonicalize_url
+
+@pytest.mark.parametrize("url", [
+    "http://site.test/a",
+    "http://site.test/a/",
+    "http://site.test/a#x",
+    "HTTP://Site.Test:80/a",
+    "http://site.test/b/../a",
+    "http://site.test/./a",
+])
+def test_canonicalize_equivalent_urls(url):
+    assert canonicalize_url(url) == "http://site.test/a"
+
+def test_canonicalize_sorts_query():
+    assert canonicalize_url("http://site.test/a?c=2&b=1") == canonicalize_url("http://site.test/a?b=1&c=2")
+
+def test_canonicalize_keeps_non_default_port_and_root():
+    assert canonicalize_url("https://site.test:8443") == "https://site.test:8443/"
+
+def test_canonicalize_leaves_other_schemes():
+    assert canonicalize_url("mailto:admin@site.test") == "mailto:admin@site.test"
+
+@pytest.mark.parametrize("mode", VisitedIndex.modes)
+def test_visited_index(mode):
+    index = VisitedIndex(mode, capacity=1000)
+    index.add("http://site.test/a")
+    assert "http://site.test/a" in index
+    assert "http://site.test/b" not in index
+    assert len(index) == 1
+
+def test_bloom_filter_error_rate():
+    bloom = BloomFilter(capacity=2000, error_rate=0.01)
+    for i in range(2000):
+        bloom.add(f"http://site.test/{i}")
+    assert all(f"http://site.test/{i}" in bloom for i in range(2000))
+    false_positives = sum(f"http://other.test/{i}" in bloom for i in range(2000))
+    assert false_positives < 100
+
+def test_digest_set():
+    digests = DigestSet(["admin1"])
+    assert "admin1" in digests and "admin2" not in digests
+    assert digests.add("admin2") and not digests.add("admin1")
+    assert len(digests) == 2
@@ -0,0 +1,51 @@
+import os
+from backend.VocabularyIndex import VocabularyIndex, corpus_digest, vocabulary_path
+
+WORDS = ["admin", "admin", "password", "pass", "root"]
+
+def slow_ngrams(words, order, min_length=0):
+    pairs = {}
+    initial = []
+    for word in set(words):
+        if len(word) < min_length:
+            continue
+        for i in range(len(word) - order):
+            key = (word[i:i + order], word[i + order])
+            pairs[key] = pairs.get(key, 0) + words.count(word)
+            if i == 0:
+                initial.append(word[:order])
+    return pairs, sorted(initial)
+
+def test_counts():
+    index = VocabularyIndex.build(WORDS)
+    assert list(index.words) == ["admin", "pass", "password", "root"]
+    assert index.count("admin") == 2
+    assert index.count("missing") == 0
+
+def test_ngrams_match_python_loops():
+    index = VocabularyIndex.build(WORDS)
+    for order, min_length in ((2, 0), (3, 8)):
+        states, next_chars, counts, initial = index.ngrams(order, min_length)
+        pairs, expected_initial = slow_ngrams(WORDS, order, min_length)
+        assert dict(zip(zip(states.tolist(), next_chars.tolist()), counts.tolist())) == pairs
+        assert sorted(initial.tolist()) == expected_initial
+
+def test_empty_vocabulary():
+    index = VocabularyIndex.build([])
+    assert len(index) == 0
+    assert len(index.ngrams(2)[0]) == 0
+
+def test_save_and_load(tmp_path):
+    path = vocabulary_path(str(tmp_path / "web_text.csv"))
+    assert path == str(tmp_path / "web_text.vocab.npz")
+    digest = corpus_digest("admin admin password", ["root"])
+    index = VocabularyIndex.build(WORDS, digest)
+    index.ngrams(2)
+    index.save(path)
+    assert os.listdir(tmp_path) == ["web_text.vocab.npz"]
+
+    loaded = VocabularyIndex.load(path, digest)
+    assert loaded.count("admin") == 2
+    assert [table.tolist() for table in loaded.ngrams(2)] == [table.tolist() for table in index.ngrams(2)]
+    assert VocabularyIndex.load(path, corpus_digest("other corpus", ["root"])) is None
+    assert VocabularyIndex.load(str(tmp_path / "missing.npz")) is None
@@ -0,0 +1,100 @@
+import hashlib
+import math
+
+
+# The two 64 bit hashes an item is placed with, computed once per item however many filters look at it
+def bloom_hashes(item: str) -> tuple[int, int]:
+    digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+# Fixed size Bloom filter over strings: no false negatives, false positives at about error_rate
+# once `capacity` items were added. Uses a bytearray bit set and double hashing of one blake2b digest.
+class BloomFilter:
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        if capacity < 1:
+            raise ValueError("Invalid Bloom filter: capacity must be at least 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("Invalid Bloom filter: error_rate must be between 0 and 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))  # bits
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, hashes: tuple[int, int]):
+        h1, h2 = hashes
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    # Adds item, returns False when it was (probably) already present
+    def add(self, item: str) -> bool:
+        return self.add_hashes(bloom_hashes(item))
+
+    def add_hashes(self, hashes: tuple[int, int]) -> bool:
+        new = False
+        for position in self._positions(hashes):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, item: str) -> bool:
+        return self.contains_hashes(bloom_hashes(item))
+
+    def contains_hashes(self, hashes: tuple[int, int]) -> bool:
+        for position in self._positions(hashes):
+            byte, bit = divmod(position, 8)
+            if not self.bits[byte] & (1 << bit):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self.count
+
+
+# Bloom filter that grows instead of filling up: once the newest BloomFilter holds its capacity, one `growth`
+# times larger with a tighter error rate (error_rate * (1 - ratio) * ratio ** i for the i-th) is added, so the
+# overall false positive rate stays under error_rate however many items come (Almeida et al., 2007).
+class ScalableBloomFilter:
+    def __init__(self, initial_capacity: int = 100_000, error_rate: float = 0.001, growth: int = 2, ratio: float = 0.5):
+        if growth < 1:
+            raise ValueError("Invalid Bloom filter: growth must be at least 1")
+        if not 0 < ratio < 1:
+            raise ValueError("Invalid Bloom filter: ratio must be between 0 and 1")
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.ratio = ratio
+        self.filters: list[BloomFilter] = []
+        self.count = 0
+        self._grow()
+
+    def _grow(self) -> None:
+        i = len(self.filters)
+        self.filters.append(BloomFilter(self.initial_capacity * self.growth ** i,
+                                        self.error_rate * (1 - self.ratio) * self.ratio ** i))
+
+    # Adds item, returns False when it was (probably) already present
+    def add(self, item: str) -> bool:
+        hashes = bloom_hashes(item)
+        if self.contains_hashes(hashes):
+            return False
+        if self.filters[-1].count >= self.filters[-1].capacity:
+            self._grow()
+        self.filters[-1].add_hashes(hashes)
+        self.count += 1
+        return True
+
+    def __contains__(self, item: str) -> bool:
+        return self.contains_hashes(bloom_hashes(item))
+
+    def contains_hashes(self, hashes: tuple[int, int]) -> bool:
+        # newest first, it holds most of the items
+        return any(bloom.contains_hashes(hashes) for bloom in reversed(self.filters))
+
+    def __len__(self) -> int:
+        return self.count
@@ -0,0 +1,109 @@
+import json
+import sqlite3
+import threading
+
+from backend.utils import canonicalize_url
+
+
+# SQLite backed checkpoint of a running crawl: config, visited URLs, tree edges and the frontier.
+# Changes are buffered and written in one transaction by flush(), so a checkpoint only costs
+# as much as the work done since the previous one.
+class CrawlCheckpoint:
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._visited = []
+        self._edges = []
+        self._pushed = []
+        self._complete = (0, 0, 0)  # how much of _visited/_edges/_pushed belongs to fully handled pages
+        with self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS visited (url TEXT PRIMARY KEY);
+                CREATE TABLE IF NOT EXISTS edges (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    src_url TEXT, src_ip TEXT, dst_url TEXT, dst_ip TEXT);
+                CREATE TABLE IF NOT EXISTS frontier (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT, key TEXT, parent_url TEXT, parent_ip TEXT, depth INTEGER);
+                CREATE INDEX IF NOT EXISTS frontier_key ON frontier (key);
+            """)
+
+    # Starts a new crawl in this file, dropping whatever an earlier crawl left behind
+    def reset(self, config: dict) -> None:
+        with self._lock, self.connection:
+            self._visited, self._edges, self._pushed = [], [], []
+            self._complete = (0, 0, 0)
+            for table in ("meta", "visited", "edges", "frontier"):
+                self.connection.execute(f"DELETE FROM {table}")
+            self.connection.execute("INSERT INTO meta (key, value) VALUES ('config', ?)", (json.dumps(config),))
+
+    def load_config(self):
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'config'").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def record_visit(self, url: str) -> None:
+        with self._lock:
+            self._visited.append(url)
+
+    def record_edge(self, parent: tuple[str, str], child: tuple[str, str]) -> None:
+        with self._lock:
+            self._edges.append(parent + child)
+
+    # Frontier journal hook, called for every link pushed on the frontier. Links are kept as they were linked,
+    # key is their canonical form, what visited holds.
+    def record_push(self, url: str, parent_node, depth: int) -> None:
+        key = canonicalize_url(url)
+        with self._lock:
+            self._pushed.append((url, key, parent_node["url"], parent_node["ip"], depth))
+
+    # Everything recorded so far belongs to pages that were fully handled
+    def end_page(self) -> None:
+        with self._lock:
+            self._complete = (len(self._visited), len(self._edges), len(self._pushed))
+
+    def pending(self) -> int:
+        return len(self._visited) + len(self._edges) + len(self._pushed)
+
+    # With complete_pages only what was recorded up to the last end_page() is written, the rest stays buffered
+    def flush(self, complete_pages: bool = False) -> None:
+        with self._lock:
+            if complete_pages:
+                visited_count, edge_count, pushed_count = self._complete
+            else:
+                visited_count, edge_count, pushed_count = len(self._visited), len(self._edges), len(self._pushed)
+            if not visited_count + edge_count + pushed_count:
+                return
+            new_visited = self._visited[:visited_count]
+            visited = set(new_visited)
+            pushed = [row for row in self._pushed[:pushed_count] if row[1] not in visited]
+            with self.connection:
+                self.connection.executemany("INSERT OR IGNORE INTO visited (url) VALUES (?)",
+                                            [(url,) for url in new_visited])
+                self.connection.executemany("DELETE FROM frontier WHERE key = ?",
+                                            [(url,) for url in new_visited])
+                self.connection.executemany("INSERT INTO edges (src_url, src_ip, dst_url, dst_ip) VALUES (?, ?, ?, ?)",
+                                            self._edges[:edge_count])
+                # Links fetched before this flush (in this batch or any earlier one) never need to be resumed
+                self.connection.executemany("INSERT INTO frontier (url, key, parent_url, parent_ip, depth) SELECT ?, ?, ?, ?, ? "
+                                            "WHERE NOT EXISTS (SELECT 1 FROM visited WHERE url = ?)",
+                                            [row + (row[1],) for row in pushed])
+            del self._visited[:visited_count], self._edges[:edge_count], self._pushed[:pushed_count]
+            self._complete = (0, 0, 0)
+
+    def load_visited(self) -> list[str]:
+        return [row[0] for row in self.connection.execute("SELECT url FROM visited")]
+
+    def load_edges(self) -> list[tuple[tuple[str, str], tuple[str, str]]]:
+        rows = self.connection.execute("SELECT src_url, src_ip, dst_url, dst_ip FROM edges ORDER BY id")
+        return [((src_url, src_ip), (dst_url, dst_ip)) for src_url, src_ip, dst_url, dst_ip in rows]
+
+    # Frontier entries in the order they were pushed, as (url, (parent_url, parent_ip), depth), without the
+    # links that were fetched since
+    def load_frontier(self) -> list[tuple[str, tuple[str, str], int]]:
+        rows = self.connection.execute("SELECT url, parent_url, parent_ip, depth FROM frontier "
+                                       "WHERE key NOT IN (SELECT url FROM visited) ORDER BY id")
+        return [(url, (parent_url, parent_ip), depth) for url, parent_url, parent_ip, depth in rows]
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
@@ -0,0 +1,113 @@
+import sqlite3
+import threading
+import zlib
+from collections.abc import MutableMapping
+
+from backend.DirectoryTreeCreator import DirectoryTreeCreator
+
+
+def _pack(value):
+    if value is None:
+        return None
+    return zlib.compress(value.encode("utf-8"), 6)
+
+
+def _unpack(blob):
+    if blob is None:
+        return None
+    return zlib.decompress(blob).decode("utf-8")
+
+
+# {url: value} view over one table of the store, a drop in for the crawler's op_results/page_text dicts.
+# Iteration follows insertion order, like a dict.
+class StoredColumn(MutableMapping):
+    def __init__(self, store, table: str):
+        self.store = store
+        self.table = table
+
+    def __getitem__(self, url):
+        rows = self.store.query(f"SELECT value FROM {self.table} WHERE url = ?", (url,))
+        if not rows:
+            raise KeyError(url)
+        return _unpack(rows[0][0])
+
+    def __setitem__(self, url, value):
+        # an upsert keeps the row id, so a rewritten page keeps its place in the crawl order
+        self.store.execute(f"INSERT INTO {self.table} (url, value) VALUES (?, ?) "
+                           f"ON CONFLICT(url) DO UPDATE SET value = excluded.value", (url, _pack(value)))
+
+    def __delitem__(self, url):
+        if self.store.execute(f"DELETE FROM {self.table} WHERE url = ?", (url,)).rowcount == 0:
+            raise KeyError(url)
+
+    def __contains__(self, url):
+        return bool(self.store.query(f"SELECT 1 FROM {self.table} WHERE url = ?", (url,)))
+
+    def __iter__(self):
+        return (row[0] for row in self.store.query(f"SELECT url FROM {self.table} ORDER BY id"))
+
+    def __len__(self):
+        return self.store.query(f"SELECT COUNT(*) FROM {self.table}")[0][0]
+
+
+# On disk copy of a crawl: zlib compressed page bodies and text keyed by URL, plus the tree edges.
+# Lookups by URL go through the primary key index and the file is memory mapped by SQLite, so a later
+# stage (reports, web scraper, credential generator) can read single pages without loading or reparsing
+# the whole crawl. Writes stay in one open transaction until flush().
+class CrawlStore:
+    def __init__(self, path: str, mmap_size: int = 256 * 1024 * 1024):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.connection.execute(f"PRAGMA mmap_size = {int(mmap_size)}")
+        with self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS pages (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE, value BLOB);
+                CREATE TABLE IF NOT EXISTS texts (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE, value BLOB);
+                CREATE TABLE IF NOT EXISTS edges (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    src_url TEXT, src_ip TEXT, dst_url TEXT, dst_ip TEXT);
+            """)
+        self.pages = StoredColumn(self, "pages")  # url -> response body
+        self.texts = StoredColumn(self, "texts")  # url -> text extracted from the page
+
+    def execute(self, query: str, parameters=()):
+        with self._lock:
+            return self.connection.execute(query, parameters)
+
+    # Reads the whole result under the lock, so readers on other threads (web scraper workers) never share a cursor
+    def query(self, query: str, parameters=()) -> list:
+        with self._lock:
+            return self.connection.execute(query, parameters).fetchall()
+
+    # Starts a new crawl in this file, dropping whatever an earlier crawl left behind
+    def clear(self) -> None:
+        with self._lock, self.connection:
+            for table in ("pages", "texts", "edges"):
+                self.connection.execute(f"DELETE FROM {table}")
+
+    def record_edge(self, parent: tuple[str, str], child: tuple[str, str]) -> None:
+        self.execute("INSERT INTO edges (src_url, src_ip, dst_url, dst_ip) VALUES (?, ?, ?, ?)", parent + child)
+
+    def load_edges(self) -> list[tuple[tuple[str, str], tuple[str, str]]]:
+        rows = self.query("SELECT src_url, src_ip, dst_url, dst_ip FROM edges ORDER BY id")
+        return [((src_url, src_ip), (dst_url, dst_ip)) for src_url, src_ip, dst_url, dst_ip in rows]
+
+    def load_tree(self) -> DirectoryTreeCreator:
+        tree_creator = DirectoryTreeCreator()
+        for parent, child in self.load_edges():
+            tree_creator.add_edge(parent, child)
+        return tree_creator
+
+    def flush(self) -> None:
+        with self._lock:
+            self.connection.commit()
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
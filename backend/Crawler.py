@@ -1,11 +1,19 @@
-import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
-import time
-from urllib.parse import urljoin, urlparse
-import requests
-from bs4 import BeautifulSoup
+from urllib.parse import urldefrag, urljoin, urlparse
 
 from backend.DirectoryTreeCreator import DirectoryTreeCreator
+from backend.DnsCache import DnsCache
+from backend.Frontier import Frontier
+from backend.CrawlCheckpoint import CrawlCheckpoint
+from backend.CrawlStore import CrawlStore
+from backend.VisitedIndex import VisitedIndex
+from backend.LinkExtractor import get_link_extractor
+from backend.ParserPool import ParserPool
+from backend.utils import canonicalize_url
+from backend.HttpClient import HttpClient
+from backend.RateLimiter import RateLimiter
 
 class Crawler:
     config = dict()
@@ -14,8 +22,29 @@ class Crawler:
             "CrawlDepth": 10,
             "PageNumberLimit": int(20),
             "UserAgent": "",
-            "RequestDelay": 1000
+            "RequestDelay": 1000,
+            "Concurrency": 1,
+            "Timeout": 10,
+            "PoolSize": 10,
+            "KeepAlive": True,
+            "RequestsPerSecond": 0,
+            "Burst": 1,
+            "DnsCacheTTL": 300,
+            "CrawlStrategy": "dfs",
+            "CheckpointPath": "",
+            "CheckpointInterval": 50,
+            "CrawlStorePath": "",
+            "VisitedIndex": "exact",
+            "VisitedCapacity": 1000000,
+            "LinkExtractor": "fast",
+            "FollowAllLinks": False,
+            "ParserWorkers": 0,
+            "ParserQueueSize": 0
         }
+    #Keys every config has to provide, the others fall back to default_config
+    #Responses with another Content-Type are not pages: not recorded, counted or parsed
+    page_content_types = ("text/html", "application/xhtml+xml")
+    required_config = ("TargetURL", "CrawlDepth", "PageNumberLimit", "UserAgent", "RequestDelay")
     def __init__(self, config = None):
         if config is None:
             self.reset()
@@ -23,7 +52,7 @@ class Crawler:
         elif len(config) == 0:
             self.reset()
             return
-        for key in self.default_config.keys():
+        for key in self.required_config:
             if key not in config:
                 raise KeyError("Invalid config dictionary")
         try:
@@ -33,19 +62,67 @@ class Crawler:
                 "PageNumberLimit": int(config["PageNumberLimit"]),
                 "UserAgent": config["UserAgent"],
                 "RequestDelay": float(config["RequestDelay"]),
+                "Concurrency": int(config.get("Concurrency", self.default_config["Concurrency"])),
+                "Timeout": float(config.get("Timeout", self.default_config["Timeout"])),
+                "PoolSize": int(config.get("PoolSize", self.default_config["PoolSize"])),
+                "KeepAlive": bool(config.get("KeepAlive", self.default_config["KeepAlive"])),
+                "RequestsPerSecond": float(config.get("RequestsPerSecond", self.default_config["RequestsPerSecond"])),
+                "Burst": int(config.get("Burst", self.default_config["Burst"])),
+                "DnsCacheTTL": float(config.get("DnsCacheTTL", self.default_config["DnsCacheTTL"])),
+                "CrawlStrategy": str(config.get("CrawlStrategy", self.default_config["CrawlStrategy"])),
+                "CheckpointPath": str(config.get("CheckpointPath", self.default_config["CheckpointPath"])),
+                "CheckpointInterval": int(config.get("CheckpointInterval", self.default_config["CheckpointInterval"])),
+                "CrawlStorePath": str(config.get("CrawlStorePath", self.default_config["CrawlStorePath"])),
+                "VisitedIndex": str(config.get("VisitedIndex", self.default_config["VisitedIndex"])),
+                "VisitedCapacity": int(config.get("VisitedCapacity", self.default_config["VisitedCapacity"])),
+                "LinkExtractor": str(config.get("LinkExtractor", self.default_config["LinkExtractor"])),
+                "FollowAllLinks": bool(config.get("FollowAllLinks", self.default_config["FollowAllLinks"])),
+                "ParserWorkers": int(config.get("ParserWorkers", self.default_config["ParserWorkers"])),
+                "ParserQueueSize": int(config.get("ParserQueueSize", self.default_config["ParserQueueSize"])),
             }
         except ValueError as e:
             raise ValueError(f"Invalid config values: {e}")
+        if self.config["Concurrency"] < 1:
+            raise ValueError("Invalid config values: Concurrency must be at least 1")
+        if self.config["CheckpointInterval"] < 1:
+            raise ValueError("Invalid config values: CheckpointInterval must be at least 1")
+        if self.config["VisitedIndex"] not in VisitedIndex.modes:
+            raise ValueError(f"Invalid config values: VisitedIndex must be one of {VisitedIndex.modes}")
+        get_link_extractor(self.config["LinkExtractor"])  # raises ValueError for unknown/unavailable extractors
+        if self.config["CrawlStrategy"] not in Frontier.strategies:
+            raise ValueError(f"Invalid config values: CrawlStrategy must be one of {Frontier.strategies}")
 
         #Store raw responses as {path:response}
         self.op_results: Dict[str, Any] = {}
-        #Track visited URLs to prevent duplicate crawling
-        self.visited_urls = set()
+        #URLs in the order they were crawled, published while the crawl runs
+        self.crawled_urls = []
+        #Page text extracted by the parser pool as {path:text}
+        self.page_text: Dict[str, str] = {}
+        #Track visited (canonical) URLs to prevent duplicate crawling
+        self.visited_urls = VisitedIndex(self.config["VisitedIndex"], self.config["VisitedCapacity"])
         #Track how many pages have been crawled
         self.page_count = int(0)
         #Tree creator instance to handle the tree structure
         self.tree_creator = DirectoryTreeCreator()
         self.curr_depth = 0
+        #Pooled HTTP client and per host rate limiter, created on the first request
+        self.http_client = None
+        self.rate_limiter = None
+        #Requested URL -> URL the page was served from, for responses that were redirected
+        self.redirected_urls = {}
+        #Canonical URLs of responses that were not pages, never requested again and not counted as pages
+        self.skipped_urls = set()
+        #Guards their creation, the first requests of a concurrent crawl come from several threads at once
+        self.shared_lock = threading.Lock()
+        #Hostname -> IP cache for the ip field of the tree nodes
+        self.dns_cache = DnsCache(self.config["DnsCacheTTL"])
+        #Optional score(url, depth) used by the "shallow" strategy, higher is fetched first
+        self.link_score = None
+        #Crawl checkpoint, opened when the crawl starts if CheckpointPath is set
+        self.checkpoint = None
+        self.pages_since_checkpoint = 0
+        #On disk crawl store, replaces op_results/page_text when CrawlStorePath is set
+        self.store = None
 
     # def startCrawl(self):
     #
@@ -132,66 +209,291 @@ class Crawler:
 
     def start_crawl(self):
         self.tree_creator.reset()
+        checkpoint = self.open_checkpoint()
+        if checkpoint is not None:
+            checkpoint.reset(self.config)
+        store = self.open_store()
+        if store is not None:
+            store.clear()
         curr_dir = self.config["TargetURL"]
         response = self.send_request(curr_dir)
         parent_node = {
-            "url": curr_dir,
-            "ip": socket.gethostbyname(urlparse(curr_dir).hostname),
+            "url": canonicalize_url(curr_dir),
+            "ip": self.resolve_ip(curr_dir),
             "children": []
         }
-        self.process_response(response, parent_node, curr_dir, depth_count=0)
+        frontier = self.create_frontier()
+        self.expand_frontier(frontier, response, parent_node, self.get_base_url(curr_dir), 0)
+        self.checkpoint_tick()
+        self.run_frontier(frontier)
+
+    def resume_crawl(self):
+        # Rebuilds the crawl state from the checkpoint and continues with the saved frontier,
+        # pages fetched before the restart are not requested again
+        checkpoint = self.open_checkpoint()
+        if checkpoint is None:
+            raise ValueError("Cannot resume a crawl without a CheckpointPath")
+        self.tree_creator.reset()
+        self.open_store()
+        for url in checkpoint.load_visited():
+            # bodies are not part of the checkpoint, only which pages were fetched (the crawl store may have them)
+            if url not in self.op_results:
+                self.op_results[url] = None
+            self.visited_urls.add(url)
+            self.crawled_urls.append(url)
+        self.page_count = len(self.op_results)
+        for parent, child in checkpoint.load_edges():
+            self.add_tree_node({"url": parent[0], "ip": parent[1], "children": []},
+                               {"url": child[0], "ip": child[1], "children": []}, record=False)
+
+        frontier = Frontier(self.get_option("CrawlStrategy"), self.link_score)
+        for url, parent, depth in checkpoint.load_frontier():
+            if self.is_visited(canonicalize_url(url)):
+                continue
+            frontier.push(url, {"url": parent[0], "ip": parent[1], "children": []}, depth)
+        frontier.journal = checkpoint
+        print(f"Resuming crawl: {self.page_count} pages done, {len(frontier)} links queued")
+        self.run_frontier(frontier)
+
+    @classmethod
+    def from_checkpoint(cls, path):
+        checkpoint = CrawlCheckpoint(path)
+        config = checkpoint.load_config()
+        checkpoint.close()
+        if config is None:
+            raise ValueError(f"No crawl checkpoint found in {path}")
+        config["CheckpointPath"] = path
+        return cls(config)
+
+    def run_frontier(self, frontier):
+        try:
+            if self.get_option("Concurrency") > 1:
+                self.crawl_frontier_concurrent(frontier)
+            else:
+                self.crawl_frontier(frontier)
+        finally:
+            # also when the crawl is interrupted, the checkpoint then only gets the pages that were fully handled
+            self.flush_crawl_state(complete_pages=True)
+        print(f"DNS cache: {self.get_dns_stats()}")
 
     def process_response(self, response, parent_node, curr_dir, depth_count=0):
-        print(f"Depth: {depth_count}, URL: {curr_dir}")
+        frontier = self.create_frontier()
+        self.expand_frontier(frontier, response, parent_node, curr_dir, depth_count)
+        self.crawl_frontier(frontier)
 
-        if depth_count >= self.config['CrawlDepth']:
-            return
-        if self.page_count >= self.config['PageNumberLimit']:
-            return
+    def crawl_frontier(self, frontier):
+        # Iterative crawl, the frontier decides which discovered link is fetched next.
+        # With the default "dfs" strategy pages are visited in the same order as the old recursion.
+        # Frontier links are the URLs as they were linked (made absolute), their canonical form is the
+        # visited key and the tree label.
+        # With a parser pool the page text is extracted in the pool while the next pages are fetched, the links
+        # are needed right away to pick the next page so they are still extracted here.
+        parser_pool = self.create_parser_pool()
+        pending_text = {}  # url -> future of the page text
 
-        links = self.get_valid_links(response, curr_dir)
+        try:
+            while frontier and self.page_count < self.config['PageNumberLimit']:
+                link, parent_node, depth_count = frontier.pop()
+                if self.is_visited(canonicalize_url(link)):
+                    continue
 
-        for link in links:
-            if self.page_count >= self.config['PageNumberLimit']:
-                return
-            if link in self.visited_urls:
-                continue
+                response = self.send_request(link)
+                if not response:
+                    self.checkpoint_tick()
+                    continue
+
+                node = {
+                    "url": canonicalize_url(link),
+                    "ip": self.resolve_ip(link),
+                    "children": []
+                }
+                self.add_tree_node(parent_node, node)
+                if parser_pool is not None:
+                    pending_text[node["url"]] = parser_pool.submit_text(response)
+                    self.collect_text(pending_text)
+
+                self.expand_frontier(frontier, response, node, self.get_base_url(link), depth_count)
+                self.checkpoint_tick()
+        finally:
+            if parser_pool is not None:
+                self.collect_text(pending_text, wait=True)
+                parser_pool.close()
+
+    def collect_text(self, pending_text, wait=False):
+        # Stores the text of the pages the parser pool is done with (all of them with wait), on the crawl thread
+        for url in [url for url, future in pending_text.items() if wait or future.done()]:
+            try:
+                self.page_text[url] = pending_text.pop(url).result()
+            except Exception as e:
+                print(f"[ERROR] Could not parse {url}: {e}")
+
+    def crawl_frontier_concurrent(self, frontier):
+        # Same loop as crawl_frontier: pages are popped, recorded, added to the tree and expanded on this thread
+        # in frontier order, so the tree and the pages visited are the same as a serial crawl's. Up to
+        # "Concurrency" workers fetch the entries the frontier will hand out next ahead of time, a prefetched
+        # page the crawl does not get to is dropped without being recorded.
+        concurrency = self.get_option("Concurrency")
+        prefetched = {}  # url -> future of fetch_page
+
+        parser_pool = self.create_parser_pool()
+
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                try:
+                    while frontier and self.page_count < self.config['PageNumberLimit']:
+                        self.prefetch(frontier, prefetched, executor, parser_pool)
+                        link, parent_node, depth_count = frontier.pop()
+                        key = canonicalize_url(link)
+                        if self.is_visited(key):
+                            continue
+
+                        future = prefetched.pop(link, None)
+                        if future is None:
+                            future = executor.submit(self.fetch_page, link, parser_pool)
+                        result = future.result()
+                        if result is None:
+                            self.checkpoint_tick()
+                            continue
+                        response, ip, parsed = result
+                        self.record_response(key, response)
+                        if not response:
+                            self.checkpoint_tick()
+                            continue
+                        links = None
+                        if parsed is not None:
+                            # parsed in the pool while the workers went on fetching, only waited for now
+                            try:
+                                links, self.page_text[key] = parsed.result()
+                            except Exception as e:
+                                print(f"[ERROR] Could not parse {link}: {e}")
+
+                        node = {
+                            "url": key,
+                            "ip": ip,
+                            "children": []
+                        }
+                        self.add_tree_node(parent_node, node)
 
-            response = self.send_request(link)
-            if not response:
+                        self.expand_frontier(frontier, response, node, self.get_base_url(link), depth_count, links)
+                        self.checkpoint_tick()
+                finally:
+                    for future in prefetched.values():
+                        future.cancel()
+        finally:
+            if parser_pool is not None:
+                parser_pool.close()
+
+    def prefetch(self, frontier, prefetched, executor, parser_pool):
+        # Starts fetching the next entries of the frontier, never more than "Concurrency" at once and never
+        # more than the pages left in the budget
+        concurrency = self.get_option("Concurrency")
+        upcoming = [entry[0] for entry in frontier.peek(concurrency * 2)]
+        window = set(upcoming)
+        # fetched pages the crawl moved away from (a later push went on top of them) are let go,
+        # they are fetched again if the crawl comes back to them
+        if len(prefetched) >= concurrency * 2:
+            for url in [url for url, future in prefetched.items() if url not in window and future.done()]:
+                del prefetched[url]
+        budget = self.config['PageNumberLimit'] - self.page_count
+        running = sum(not future.done() for future in prefetched.values())
+        batch = []
+        for url in dict.fromkeys(upcoming):
+            if running + len(batch) >= concurrency or len(prefetched) + len(batch) >= budget:
+                break
+            if url in prefetched or self.is_visited(canonicalize_url(url)):
                 continue
+            batch.append(url)
+        if batch:
+            # Resolve the new hosts of the batch together instead of once per worker
+            self.dns_cache.resolve_many(urlparse(url).hostname for url in batch)
+            for url in batch:
+                prefetched[url] = executor.submit(self.fetch_page, url, parser_pool)
 
-            node = {
-                "url": link,
-                "ip": socket.gethostbyname(urlparse(link).hostname),
-                "children": []
-            }
+    def create_frontier(self):
+        return Frontier(self.get_option("CrawlStrategy"), self.link_score, self.checkpoint)
+
+    def open_checkpoint(self):
+        if self.checkpoint is None and self.get_option("CheckpointPath"):
+            self.checkpoint = CrawlCheckpoint(self.get_option("CheckpointPath"))
+            self.pages_since_checkpoint = 0
+        return self.checkpoint
+
+    def open_store(self):
+        # Bodies and page text go to disk instead of memory, the file can be reopened with CrawlStore later
+        if self.store is None and self.get_option("CrawlStorePath"):
+            self.store = CrawlStore(self.get_option("CrawlStorePath"))
+            self.op_results = self.store.pages
+            self.page_text = self.store.texts
+        return self.store
+
+    def checkpoint_tick(self):
+        # Called once a fetched page is fully handled, so a checkpoint never holds half a page.
+        # The crawl store is committed at the same interval.
+        if self.checkpoint is None and self.store is None:
+            return
+        if self.checkpoint is not None:
+            self.checkpoint.end_page()
+        self.pages_since_checkpoint += 1
+        if self.pages_since_checkpoint >= self.get_option("CheckpointInterval"):
+            self.flush_crawl_state()
+            self.pages_since_checkpoint = 0
 
-            if parent_node is not None:
-                if node not in parent_node["children"]:
-                    parent_node["children"].append(node)
+    def flush_crawl_state(self, complete_pages=False):
+        # Store first: a page the checkpoint lists as visited is never fetched again on resume,
+        # so its body has to be on disk before the checkpoint says so
+        if self.store is not None:
+            self.store.flush()
+        if self.checkpoint is not None:
+            self.checkpoint.flush(complete_pages)
 
-                    parent = (parent_node["url"], parent_node["ip"])
-                    child = (node["url"], node["ip"])
+    # curr_dir is the URL the page was served from, its relative links are resolved against it
+    def expand_frontier(self, frontier, response, node, curr_dir, depth_count, links=None):
+        print(f"Depth: {depth_count}, URL: {curr_dir}")
+        if response is None or depth_count >= self.config['CrawlDepth']:
+            return
+        frontier.push_many(self.get_valid_links(response, curr_dir, links), node, depth_count + 1)
+
+    def create_parser_pool(self):
+        if self.get_option("ParserWorkers") < 1:
+            return None
+        return ParserPool(self.get_option("ParserWorkers"), self.get_option("ParserQueueSize"),
+                          self.get_option("LinkExtractor"), all_links=self.get_option("FollowAllLinks"))
 
-                    if child not in self.tree_creator.tree.dir_tree.get(parent, []):
-                        self.tree_creator.add_edge(parent, child)
+    def add_tree_node(self, parent_node, node, record=True):
+        if parent_node is not None:
+            parent = (parent_node["url"], parent_node["ip"])
+            child = (node["url"], node["ip"])
 
-            self.process_response(response, node, link, depth_count + 1)
+            # O(1) membership test on the tree's adjacency sets
+            if not self.tree_creator.tree.has_edge(parent, child):
+                self.tree_creator.add_edge(parent, child)
+                if record and self.checkpoint is not None:
+                    self.checkpoint.record_edge(parent, child)
+                if record and self.store is not None:
+                    self.store.record_edge(parent, child)
 
     def send_request(self, curr_dir):
         if self.page_count >= self.config['PageNumberLimit']:
             return None
-        time.sleep(self.config['RequestDelay']/1000)
+        self.get_rate_limiter().acquire(curr_dir)
+        response = self.fetch(curr_dir)
+        if response is not None:
+            self.record_response(canonicalize_url(curr_dir), response)
+        return response
+
+    def fetch(self, curr_dir):
+        # Network part of send_request, safe to call from worker threads
         try:
-            req = requests.get(curr_dir, headers={'User-Agent': self.config['UserAgent']})
+            req = self.get_http_client().get(curr_dir, headers={'User-Agent': self.config['UserAgent']})
             if req.status_code == 200:
+                content_type = req.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                if content_type and content_type not in self.page_content_types:
+                    print(f"NOTE: Skipping {curr_dir}, not a page: {content_type}")
+                    self.skipped_urls.add(canonicalize_url(curr_dir))
+                    return None
                 print(f"Currently crawling: {curr_dir}")
-                self.op_results[curr_dir] = req.text
-                self.visited_urls.add(curr_dir)
-                self.page_count+=1
-                if self.tree_creator.tree.root is not None:
-                    self.update_crawler_data(self.visited_urls, self.tree_creator.get_tree_map(self.tree_creator.tree.root))
+                if req.url and req.url != curr_dir:
+                    self.redirected_urls[curr_dir] = req.url
                 return req.text
             else:
                 print(f"[ERROR] Failed to access {curr_dir}: {req.status_code}")
@@ -199,9 +501,83 @@ class Crawler:
             print(f"[ERROR] Connection error: {e}")
         return None
 
-    def get_valid_links(self, response: str, curr_dir):
-        soup = BeautifulSoup(response, 'html.parser')
-        links = [a.get('href') for a in soup.find_all('a', href=True)]
+    def is_visited(self, url):
+        # url is canonical, pages that were fetched and responses that turned out not to be pages
+        return url in self.visited_urls or url in self.skipped_urls
+
+    def fetch_page(self, curr_dir, parser_pool=None):
+        # Worker side of the concurrent crawl, returns (response, ip, future of (links, text) or None) or None.
+        # With a parser pool the body is handed to a worker process and this thread goes on fetching,
+        # a full pool blocks the fetchers until the parsers catch up.
+        self.get_rate_limiter().acquire(curr_dir)
+        response = self.fetch(curr_dir)
+        if response is None:
+            return None
+        try:
+            ip = self.resolve_ip(curr_dir)
+        except Exception as e:
+            print(f"[ERROR] Could not resolve {curr_dir}: {e}")
+            return None
+        parsed = None
+        if parser_pool is not None and response:
+            try:
+                parsed = parser_pool.submit(response)
+            except Exception as e:
+                print(f"[ERROR] Could not parse {curr_dir}: {e}")
+        return response, ip, parsed
+
+    def get_http_client(self):
+        # checked again under the lock, so racing workers never build a second pool
+        if self.http_client is None:
+            with self.shared_lock:
+                if self.http_client is None:
+                    self.http_client = HttpClient({
+                        "KeepAlive": self.get_option("KeepAlive"),
+                        # every worker thread needs its own connection to a host
+                        "PoolSize": max(self.get_option("PoolSize"), self.get_option("Concurrency")),
+                        "Timeout": self.get_option("Timeout"),
+                    })
+        return self.http_client
+
+    # URL the relative links of a fetched page are resolved against: where it was served from after redirects
+    def get_base_url(self, curr_dir):
+        return self.redirected_urls.pop(curr_dir, curr_dir)
+
+    def resolve_ip(self, curr_dir):
+        return self.dns_cache.resolve(urlparse(curr_dir).hostname)
+
+    def get_dns_stats(self):
+        return self.dns_cache.get_stats()
+
+    def get_rate_limiter(self):
+        # RequestDelay keeps working: it is the per host interval when RequestsPerSecond is not set
+        # one limiter for every worker, otherwise each would enforce RequestsPerSecond on its own
+        if self.rate_limiter is None:
+            with self.shared_lock:
+                if self.rate_limiter is None:
+                    self.rate_limiter = RateLimiter.from_settings(self.get_option("RequestsPerSecond"),
+                                                                  self.config['RequestDelay'],
+                                                                  self.get_option("Burst"))
+        return self.rate_limiter
+
+    def record_response(self, curr_dir, response):
+        self.op_results[curr_dir] = response
+        self.visited_urls.add(curr_dir)
+        self.page_count+=1
+        if self.checkpoint is not None:
+            self.checkpoint.record_visit(curr_dir)
+        self.crawled_urls.append(curr_dir)
+        if self.tree_creator.tree.root is not None:
+            # both are updated in place, publishing them is O(1) per page
+            self.update_crawler_data(self.crawled_urls, self.tree_creator.get_live_tree_map())
+
+    def get_valid_links(self, response: str, curr_dir, links=None):
+        # <a href> links, with FollowAllLinks also <area>, <link>, <form action>, <script src> and <iframe>, see LinkExtractor.
+        # links can be passed in when the page was already parsed by the parser pool.
+        # Returns absolute URLs without fragment, relative links are resolved against curr_dir, the URL the page
+        # was actually served from (canonical URLs drop the trailing slash "docs/intro.html" depends on)
+        if links is None:
+            links = get_link_extractor(self.get_option("LinkExtractor"), self.get_option("FollowAllLinks"))(response)
         links = [link for link in links if not link.startswith("#")]
         page_count = 0
         valid_links = []
@@ -211,9 +587,9 @@ class Crawler:
 
             parsed = urlparse(link)
             if parsed.scheme in ["http", "https"]:
-                valid_links.append(link)
+                valid_links.append(urldefrag(link)[0])
             elif parsed.scheme == "":
-                valid_links.append(urljoin(curr_dir, link))
+                valid_links.append(urldefrag(urljoin(curr_dir, link))[0])
             page_count += 1
         print("valid links", valid_links)
         return valid_links
@@ -225,6 +601,10 @@ class Crawler:
         set_crawler_data(crawler_data)
         print(f"Updated crawler data:")
 
+    def get_option(self, key):
+        # Options added after the first config format may be missing from older configs
+        return self.config.get(key, self.default_config[key])
+
     def getConfig(self):
         if self.config is None:
             self.reset()
@@ -244,13 +624,29 @@ class Crawler:
             raise ValueError("Config cannot be an empty list, resetting to default")
         elif config is not None:
             self.config = config
+            self.http_client = None
+            self.rate_limiter = None
+            self.checkpoint = None
+            self.store = None
     def reset(self):
         self.config = None
         self.config = self.default_config
         self.op_results = {} #reset operation results
-        self.visited_urls = set() #reset curr list of visited urls
+        self.page_text = {} #reset extracted page text
+        self.crawled_urls = [] #reset published crawl progress
+        self.visited_urls = VisitedIndex(self.config["VisitedIndex"], self.config["VisitedCapacity"]) #reset curr list of visited urls
         self.page_count = 0 #reset pages count
         self.tree_creator = DirectoryTreeCreator() #reset tree
+        self.http_client = None #reset pooled connections
+        self.redirected_urls = {}
+        self.skipped_urls = set()
+        self.shared_lock = threading.Lock()
+        self.rate_limiter = None #reset per host rate limits
+        self.dns_cache = DnsCache(self.config["DnsCacheTTL"]) #reset resolved hosts
+        self.link_score = None #reset link scoring
+        self.checkpoint = None #reset checkpoint
+        self.pages_since_checkpoint = 0
+        self.store = None #reset crawl store
         
     def getCrawlResults(self) -> list[str]:
         #Return a list of URLs that have been crawled
@@ -0,0 +1,50 @@
+from backend.BloomFilter import ScalableBloomFilter
+from backend.VisitedIndex import DigestSet
+
+
+# Dedup stage for generated (username, password) pairs, drops every pair it has seen before and counts them.
+#   exact: DigestSet of the pairs
+#   bloom: ScalableBloomFilter, far less memory for multi-million runs but about error_rate of the new
+#          pairs are wrongly dropped as duplicates
+class CredentialDedup:
+    modes = ("exact", "bloom")
+
+    def __init__(self, mode: str = "exact", initial_capacity: int = 100_000, error_rate: float = 0.001):
+        if mode not in self.modes:
+            raise ValueError(f"Invalid dedup mode {mode}, expected one of {self.modes}")
+        self.mode = mode
+        if mode == "bloom":
+            self._index = ScalableBloomFilter(initial_capacity, error_rate)
+        else:
+            self._index = DigestSet()
+        self.seen = 0
+        self.duplicates = 0
+
+    # Returns True for a pair that was not seen before
+    def add(self, username: str, password: str) -> bool:
+        self.seen += 1
+        # the separator can not be part of a generated username
+        if self._index.add(f"{username}\0{password}"):
+            return True
+        self.duplicates += 1
+        return False
+
+    # Yields the credentials of `credentials` not seen before, lazily
+    def filter(self, credentials):
+        for username, password in credentials:
+            if self.add(username, password):
+                yield username, password
+
+    def __contains__(self, credential: tuple[str, str]) -> bool:
+        return f"{credential[0]}\0{credential[1]}" in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    # Share of the credentials given to add() that were dropped
+    @property
+    def duplicate_rate(self) -> float:
+        return self.duplicates / self.seen if self.seen else 0.0
+
+    def report(self) -> str:
+        return f"{self.duplicates} of {self.seen} generated credentials were duplicates ({self.duplicate_rate:.1%})"
@@ -1,3 +1,6 @@
+import json
+from array import array
+
 from backend.Tree import Tree
 from backend.utils import getURL, getIP  # helper functions that did not really belong in this class
 
@@ -25,14 +28,29 @@ let networkMap = [
 """
 
 class DirectoryTreeCreator:
-    def __init__(self, tree = Tree()) -> None:
-        self.tree = tree
+    # How vertices reached through more than one parent (shared children, links back to an ancestor) are traversed:
+    #   dag:      each vertex is expanded once, under the first parent that reaches it, every node gets an "id" and
+    #             later links become {"ref": id} back-references, so every parent still lists all of its children
+    #   spanning: same, but later links are left out (the shape of the live map)
+    # Both are a single O(V + E) pass, even on cyclic or densely cross-linked crawls.
+    traversal_modes = ("dag", "spanning")
+
+    def __init__(self, tree = None) -> None:
+        self.tree = tree if tree is not None else Tree()  # a Tree() default would be shared by every instance
+        self.reset_live_map()
 
     def get_tree(self) -> Tree:  # function from srs
         return self.tree
 
     def reset(self) -> None:  # function from srs
         self.tree = Tree()
+        self.reset_live_map()
+
+    def reset_live_map(self) -> None:  # the live map follows every edge added through add_edge/populate
+        self.live_map = []  # same format as get_tree_map(root, mode="spanning"), updated in place
+        # both indexed by tree node id, so the bookkeeping costs a pointer and an int per node
+        self.live_nodes = []  # node -> its dict inside live_map, None while it is not part of it
+        self.live_parent = array('i')  # node -> the node it hangs under in live_map (spanning tree), -1 for none
 
     def populate(self, crawl_data: dict, display=False) -> None:  # recursively populates the tree (which has a graph structure)
         # TODO display the tree as it is being built (we might require the indent parameter like the display_pretty function)
@@ -51,7 +69,7 @@ class DirectoryTreeCreator:
                     child_url,
                     child_path
                 )
-                self.tree.add_edge(vertex, child_vertex)
+                self.add_edge(vertex, child_vertex)
             self.populate(children)
 
     def add_edge(self, src: tuple[str, str], dst: tuple[str, str], display=False) -> None:  # wrapper for add_edge on the tree structure
@@ -59,48 +77,180 @@ class DirectoryTreeCreator:
             raise ValueError(f"Vertex {src} is not properly formatted! Format should be a tuple of the form: (url, path)")
         if not isinstance(dst, tuple) or len(dst) != 2:
             raise ValueError(f"Vertex {dst} is not properly formatted! Format should be a tuple of the form: (url, path)")
+        if self.tree.has_edge(src, dst):  # edges are a set, nothing to add to the live map either
+            return
         self.tree.add_edge(src, dst)
+        self.update_live_map(src, dst)
 
         if display:  # TODO display the tree as it is being built (we might require the indent parameter like the display_pretty function)
             pass
 
+    def update_live_map(self, src, dst) -> None:  # O(1) per edge instead of rebuilding the map
+        src_id = self.tree.get_node_id(src)
+        dst_id = self.tree.get_node_id(dst)
+        while len(self.live_nodes) < self.tree.next_node_id():
+            self.live_nodes.append(None)
+            self.live_parent.append(-1)
+        src_node = self.get_live_node(src_id)
+        # only the first edge into a vertex places it, the live map stays a spanning tree
+        # (no shared dicts, no cycles) so it can always be serialized
+        if self.live_parent[dst_id] < 0 and dst != self.tree.root and not self.is_live_ancestor(dst_id, src_id):
+            src_node["children"].append(self.get_live_node(dst_id))
+            self.live_parent[dst_id] = src_id
+
+    def is_live_ancestor(self, node: int, descendant: int) -> bool:
+        if self.live_nodes[node] is None:  # a node that has no dict yet cannot be above anything
+            return False
+        while descendant >= 0:
+            if descendant == node:
+                return True
+            descendant = self.live_parent[descendant]
+        return False
+
+    def get_live_node(self, node_id: int) -> dict:
+        node = self.live_nodes[node_id]
+        if node is None:
+            vertex = self.tree.get_vertex(node_id)
+            node = {
+                "ip": getIP(vertex),
+                "path": getURL(vertex),
+                "children": []
+            }
+            self.live_nodes[node_id] = node
+            if vertex == self.tree.root:
+                self.live_map.append(node)
+        return node
+
+    def get_live_tree_map(self) -> list:  # equal to get_tree_map(root, mode="spanning") for a crawl, without rebuilding it
+        return self.live_map
+
+    def get_edges_since(self, offset: int) -> list:  # delta of the edges added after the first offset ones
+        return self.tree.get_edges_since(offset)
+
     def display_data(self) -> None:  # displays all the data currently stored
         for vertex in self.tree.dir_tree:
-            print(f"{getURL(vertex)}  {self.tree.dir_tree[vertex]}")
-
-    def display_pretty(self, root, indent="") -> None:  # displays the data starting from a specified root
-        children = self.tree.dir_tree[root]
-        if children:
-            print(f"{indent}{getURL(root)} --> ")
-        else:
-            print(f"{indent}{getURL(root)}")
-
-        for child in children:
-            if child in self.tree.dir_tree:
-                self.display_pretty(child, f"{indent}\t")
+            print(f"{getURL(vertex)}  {list(self.tree.dir_tree[vertex])}")
+
+    def walk(self, root, max_depth=None, mode="dag"):  # iterative pre-order walk, no recursion limit on deep trees
+        # yields ("enter", vertex, depth), ("leave", vertex, depth) once its children are done,
+        # ("cut", vertex, depth) right before "leave" when max_depth hides children of vertex,
+        # and in "dag" mode ("ref", vertex, depth) for every further link to an already entered vertex
+        if mode not in self.traversal_modes:
+            raise ValueError(f"Invalid traversal mode {mode}, expected one of {self.traversal_modes}")
+        yield "enter", root, 0
+        root_node = self.tree.get_node_id(root)
+        if root_node is None:
+            yield "leave", root, 0
+            return
+        seen = {root_node}
+        stack = [(root_node, 0, self.tree.child_ids(root_node))]
+        while stack:
+            node, depth, children = stack[-1]
+            if max_depth is not None and depth >= max_depth:
+                stack.pop()
+                if next(children, None) is not None:
+                    yield "cut", self.tree.get_vertex(node), depth
+                yield "leave", self.tree.get_vertex(node), depth
+                continue
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                yield "leave", self.tree.get_vertex(node), depth
+                continue
+            if child in seen:
+                if mode == "dag":
+                    yield "ref", self.tree.get_vertex(child), depth + 1
+                continue
+            seen.add(child)
+            yield "enter", self.tree.get_vertex(child), depth + 1
+            stack.append((child, depth + 1, self.tree.child_ids(child)))
+
+    def display_pretty(self, root, indent="", max_depth=None, mode="dag") -> None:  # displays the data starting from a specified root
+        for event, vertex, depth in self.walk(root, max_depth, mode):
+            prefix = indent + "\t" * depth
+            if event == "ref":
+                print(f"{prefix}{getURL(vertex)} (see above)")
+            elif event != "enter":
+                continue
+            elif self.tree.get_child_count(vertex):
+                print(f"{prefix}{getURL(vertex)} --> ")
             else:
-                raise ValueError(f"Vertex {child} was found as a children of {root}, but it was not found on the graph!")
-
-    def get_tree_map(self, root) -> list:
-        children = self.tree.dir_tree.get(root, [])
-        children_list = []
-        for child in children:
-             children_list.append(self.get_tree_map_children(child))
-        node_map = [{
-            "ip": getIP(root),
-            "path": getURL(root),
-            "children": children_list
-        }]
-        return node_map
+                print(f"{prefix}{getURL(vertex)}")
 
-    def get_tree_map_children(self, child):
-        children = self.tree.dir_tree.get(child)
-        children_list = []
-        for grandchild in children:
-            children_list.append(self.get_tree_map_children(grandchild))
-        node_map = {
-            "ip": getIP(child),
-            "path": getURL(child),
-            "children": children_list
-        }
+    def get_tree_map(self, root, max_depth=None, mode="dag") -> list:
+        # nodes whose children were hidden by max_depth get "truncated": True, like in iter_tree_json
+        node_map = []
+        open_lists = [node_map]
+        open_nodes = []
+        for event, vertex, depth in self.walk(root, max_depth, mode):
+            if event == "enter":
+                node = {
+                    "ip": getIP(vertex),
+                    "path": getURL(vertex),
+                    "children": []
+                }
+                node_id = self.tree.get_node_id(vertex)
+                if mode == "dag" and node_id is not None:  # a root that is not part of the tree has no id
+                    node = {"id": node_id, **node}
+                open_lists[-1].append(node)
+                open_lists.append(node["children"])
+                open_nodes.append(node)
+            elif event == "ref":
+                open_lists[-1].append({"ref": self.tree.get_node_id(vertex)})
+            elif event == "cut":
+                open_nodes[-1]["truncated"] = True
+            else:
+                open_lists.pop()
+                open_nodes.pop()
         return node_map
+
+    def get_tree_map_children(self, child, max_depth=None, mode="dag"):
+        return self.get_tree_map(child, max_depth, mode)[0]
+
+    def iter_tree_json(self, root, max_depth=None, chunk_size=65536, mode="dag"):  # streams get_tree_map(root) as JSON text
+        # nodes whose children were hidden by max_depth get "truncated": true so they can be requested later
+        if root is None:
+            yield "[]"
+            return
+        buffer = ["["]
+        buffered = 1
+        first = [True]
+        truncated = False
+        for event, vertex, depth in self.walk(root, max_depth, mode):
+            if event == "enter":
+                part = '{"ip": %s, "path": %s, "children": [' % (json.dumps(getIP(vertex)), json.dumps(getURL(vertex)))
+                node_id = self.tree.get_node_id(vertex)
+                if mode == "dag" and node_id is not None:
+                    part = '{"id": %d, %s' % (node_id, part[1:])
+                if not first[-1]:
+                    part = ", " + part
+                first[-1] = False
+                first.append(True)
+            elif event == "ref":
+                part = '{"ref": %d}' % self.tree.get_node_id(vertex)
+                if not first[-1]:
+                    part = ", " + part
+                first[-1] = False
+            elif event == "cut":
+                truncated = True
+                continue
+            else:
+                part = '], "truncated": true}' if truncated else "]}"
+                truncated = False
+                first.pop()
+            buffer.append(part)
+            buffered += len(part)
+            if buffered >= chunk_size:
+                yield "".join(buffer)
+                buffer = []
+                buffered = 0
+        buffer.append("]")
+        yield "".join(buffer)
+
+    def write_tree_json(self, root, file, max_depth=None, mode="dag") -> None:  # file is a path or an open text file
+        if isinstance(file, str):
+            with open(file, "w", encoding="utf-8") as output:
+                self.write_tree_json(root, output, max_depth, mode)
+            return
+        for chunk in self.iter_tree_json(root, max_depth, mode=mode):
+            file.write(chunk)
@@ -0,0 +1,118 @@
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# TTL bounded hostname -> IP cache, most crawled links share a handful of hosts
+# so only the first lookup of each host pays for a DNS round trip.
+# Expired entries are dropped when they are read, and the oldest ones once max_entries hosts are cached.
+# hits/misses count one lookup per resolve(): a miss when it needed a DNS query (also when resolve_many
+# made that query ahead of time), a hit when it was answered from the cache.
+class DnsCache:
+    def __init__(self, ttl: float = 300, resolver=None, max_workers: int = 8, max_entries: int = 10000):
+        if ttl < 0:
+            raise ValueError("Invalid DNS cache TTL: ttl cannot be negative")
+        if max_entries < 1:
+            raise ValueError("Invalid DNS cache size: max_entries must be at least 1")
+        self.ttl = float(ttl)  # seconds, 0 disables caching
+        self.resolver = resolver
+        self.max_workers = max_workers
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}  # hostname -> (ip, expiry time), oldest first
+        self._prefetched = set()  # hosts resolve_many looked up that resolve() has not asked for yet
+        self._lock = threading.Lock()
+
+    def _lookup(self, hostname: str) -> str:
+        # socket.gethostbyname is looked up on every call so it can be swapped out (tests, proxies)
+        if self.resolver is not None:
+            return self.resolver(hostname)
+        return socket.gethostbyname(hostname)
+
+    # Called with the lock held
+    def _cached(self, hostname: str):
+        entry = self._entries.get(hostname)
+        if entry is None:
+            return None
+        if entry[1] > time.monotonic():
+            return entry[0]
+        del self._entries[hostname]
+        self._prefetched.discard(hostname)
+        return None
+
+    def _store(self, hostname: str, ip: str) -> None:
+        with self._lock:
+            self._entries.pop(hostname, None)
+            if len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                for expired in [host for host, (_, expiry) in self._entries.items() if expiry <= now]:
+                    del self._entries[expired]
+                    self._prefetched.discard(expired)
+                while len(self._entries) >= self.max_entries:
+                    oldest = next(iter(self._entries))
+                    del self._entries[oldest]
+                    self._prefetched.discard(oldest)
+            self._entries[hostname] = (ip, time.monotonic() + self.ttl)
+
+    # Same contract as socket.gethostbyname, resolution errors are raised to the caller
+    def resolve(self, hostname: str) -> str:
+        with self._lock:
+            ip = self._cached(hostname)
+            if ip is not None:
+                if hostname in self._prefetched:
+                    self._prefetched.discard(hostname)  # counted as a miss when resolve_many looked it up
+                else:
+                    self.hits += 1
+                return ip
+            self.misses += 1
+        ip = self._lookup(hostname)
+        if self.ttl > 0:
+            self._store(hostname, ip)
+        return ip
+
+    # Looks up every uncached hostname in parallel ahead of the resolve() calls that need them,
+    # hosts that fail to resolve are left out
+    def resolve_many(self, hostnames) -> dict:
+        results = {}
+        missing = []
+        with self._lock:
+            for hostname in dict.fromkeys(hostnames):
+                ip = self._cached(hostname)
+                if ip is not None:
+                    results[hostname] = ip
+                else:
+                    missing.append(hostname)
+        if not missing:
+            return results
+
+        def resolve_one(hostname):
+            try:
+                ip = self._lookup(hostname)
+            except Exception as e:
+                print(f"[ERROR] Could not resolve {hostname}: {e}")
+                return hostname, None
+            if self.ttl > 0:
+                self._store(hostname, ip)
+                with self._lock:
+                    self.misses += 1
+                    self._prefetched.add(hostname)
+            return hostname, ip
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(missing))) as executor:
+            for hostname, ip in executor.map(resolve_one, missing):
+                if ip is not None:
+                    results[hostname] = ip
+        return results
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._prefetched.clear()
+            self.hits = 0
+            self.misses = 0
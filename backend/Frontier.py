@@ -0,0 +1,81 @@
+import heapq
+import itertools
+import threading
+from collections import deque
+from urllib.parse import urlparse
+
+
+# Default score for the "shallow" strategy: links closer to the site root come first
+def path_depth_score(url: str, depth: int) -> float:
+    return -len([segment for segment in urlparse(url).path.split("/") if segment])
+
+
+# Links waiting to be fetched, stored as (url, parent_node, depth) entries.
+#   bfs:     first discovered, first fetched (deque)
+#   dfs:     same order as the old recursive crawl (stack)
+#   shallow: lowest crawl depth first, then highest score(url, depth) (heap)
+# All operations take a lock so several workers can drain the same frontier.
+# An optional journal (see CrawlCheckpoint) gets record_push(url, parent_node, depth) for every push.
+class Frontier:
+    strategies = ("bfs", "dfs", "shallow")
+
+    def __init__(self, strategy: str = "dfs", score=None, journal=None):
+        if strategy not in self.strategies:
+            raise ValueError(f"Invalid crawl strategy {strategy}, expected one of {self.strategies}")
+        self.strategy = strategy
+        self.score = score or path_depth_score
+        self.journal = journal
+        self._queue = deque()
+        self._heap = []
+        self._counter = itertools.count()  # tie breaker, keeps discovery order stable
+        self._lock = threading.Lock()
+
+    def push(self, url: str, parent_node, depth: int) -> None:
+        with self._lock:
+            self._push(url, parent_node, depth)
+
+    # Pushes the links of one page so they are popped in page order whatever the strategy
+    def push_many(self, urls, parent_node, depth: int) -> None:
+        if self.strategy == "dfs":
+            urls = reversed(list(urls))
+        with self._lock:
+            for url in urls:
+                self._push(url, parent_node, depth)
+
+    def _push(self, url, parent_node, depth):
+        if self.journal is not None:
+            self.journal.record_push(url, parent_node, depth)
+        if self.strategy == "shallow":
+            key = (depth, -self.score(url, depth), next(self._counter))
+            heapq.heappush(self._heap, (key, url, parent_node, depth))
+        else:
+            self._queue.append((url, parent_node, depth))
+
+    # Returns the next (url, parent_node, depth) entry, or None when the frontier is empty
+    def pop(self):
+        with self._lock:
+            if self.strategy == "shallow":
+                if not self._heap:
+                    return None
+                _, url, parent_node, depth = heapq.heappop(self._heap)
+                return url, parent_node, depth
+            if not self._queue:
+                return None
+            if self.strategy == "bfs":
+                return self._queue.popleft()
+            return self._queue.pop()
+
+    # Up to `count` entries in the order pop() would return them (if nothing is pushed meanwhile), left in place
+    def peek(self, count: int):
+        with self._lock:
+            if self.strategy == "shallow":
+                return [(url, parent_node, depth) for _, url, parent_node, depth in heapq.nsmallest(count, self._heap)]
+            if self.strategy == "bfs":
+                return list(itertools.islice(self._queue, count))
+            return list(itertools.islice(reversed(self._queue), count))
+
+    def __len__(self) -> int:
+        return len(self._heap) + len(self._queue)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
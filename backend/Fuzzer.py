@@ -3,6 +3,8 @@ from typing import Dict, Any
 import json
 import string
 
+from backend.HttpClient import HttpClient
+from backend.RateLimiter import RateLimiter
 from backend.utils import send_get_request, send_post_request, send_put_request
 
 class Fuzzer:
@@ -15,8 +17,17 @@ class Fuzzer:
             "ShowOnlyStatusCode": [],
             "FilterContentLength": 1000,
             "PageLimit": 1000,
-            "WordList": ["username", "password", "search", "admin"]
+            "WordList": ["username", "password", "search", "admin"],
+            "Timeout": 10,
+            "PoolSize": 10,
+            "KeepAlive": True,
+            "RequestDelay": 0,
+            "RequestsPerSecond": 0,
+            "Burst": 1
         }
+    #Keys every config has to provide, the others fall back to default_config
+    required_config = ("TargetURL", "HTTPMethod", "Cookies", "HideStatusCode", "ShowOnlyStatusCode",
+                       "FilterContentLength", "PageLimit", "WordList")
     def __init__(self, config=None):
         if config is None:
             self.reset()
@@ -24,7 +35,7 @@ class Fuzzer:
         elif len(config) == 0:
             self.reset()
             return
-        for key in self.default_config.keys():
+        for key in self.required_config:
             if key not in config:
                 print(key)
                 raise KeyError("Invalid config dictionary")
@@ -37,7 +48,13 @@ class Fuzzer:
                 "ShowOnlyStatusCode": config["ShowOnlyStatusCode"],
                 "FilterContentLength": int(config["FilterContentLength"]),
                 "PageLimit": int(config["PageLimit"]),
-                "WordList": config["WordList"]
+                "WordList": config["WordList"],
+                "Timeout": float(config.get("Timeout", self.default_config["Timeout"])),
+                "PoolSize": int(config.get("PoolSize", self.default_config["PoolSize"])),
+                "KeepAlive": bool(config.get("KeepAlive", self.default_config["KeepAlive"])),
+                "RequestDelay": float(config.get("RequestDelay", self.default_config["RequestDelay"])),
+                "RequestsPerSecond": float(config.get("RequestsPerSecond", self.default_config["RequestsPerSecond"])),
+                "Burst": int(config.get("Burst", self.default_config["Burst"])),
             }
         except ValueError as e:
             raise ValueError(f"Invalid config values: {e}")
@@ -47,6 +64,10 @@ class Fuzzer:
         self.visited_urls = set()
         #Track how many pages have been crawled
         self.page_count = int(0)
+        #Pooled HTTP client shared by every fuzzing request
+        self.http_client = HttpClient(self.config)
+        #Per host rate limit, unlimited unless RequestDelay or RequestsPerSecond is set
+        self.rate_limiter = RateLimiter.from_settings(self.config["RequestsPerSecond"], self.config["RequestDelay"], self.config["Burst"])
 
     def start(self):
         if self.config['HTTPMethod'] == "GET":
@@ -69,11 +90,11 @@ class Fuzzer:
         curr_dir = self.config['TargetURL']+"/"+word+"/"+fuzzed_string
         # www.google.com/akjlsdhf www.google.com/search/alkdsjfh
         if mode == "GET":
-            response, status_code = send_get_request(curr_dir, 0, self.page_count, self.config['PageLimit'], "", self.config['Cookies'])
+            response, status_code = send_get_request(curr_dir, 0, self.page_count, self.config['PageLimit'], "", self.config['Cookies'], client=self.http_client, limiter=self.rate_limiter)
         elif mode =="POST":
-            response, status_code = send_post_request(curr_dir, 0, json_string, self.page_count, self.config['PageLimit'], "", self.config['Cookies'])
+            response, status_code = send_post_request(curr_dir, 0, json_string, self.page_count, self.config['PageLimit'], "", self.config['Cookies'], client=self.http_client, limiter=self.rate_limiter)
         elif mode == "PUT":
-            response, status_code = send_put_request(curr_dir, 0, json_string, self.page_count, self.config['PageLimit'], "", self.config['Cookies'])
+            response, status_code = send_put_request(curr_dir, 0, json_string, self.page_count, self.config['PageLimit'], "", self.config['Cookies'], client=self.http_client, limiter=self.rate_limiter)
         else:
             raise TypeError("Invalid mode")
         self.op_results[curr_dir] = response, status_code
@@ -125,6 +146,8 @@ class Fuzzer:
         self.op_results = {} #reset operation results
         self.visited_urls = set() #reset curr list of visited urls
         self.page_count = 0 #reset pages count
+        self.http_client = HttpClient(self.config) #reset pooled connections
+        self.rate_limiter = RateLimiter.from_settings(self.config["RequestsPerSecond"], self.config["RequestDelay"], self.config["Burst"]) #reset per host rate limits
 
 
     def update_fuzzer_data(self, links, fuzzer_data):
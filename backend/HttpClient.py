@@ -0,0 +1,65 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Thin wrapper around a requests.Session so every request to a host reuses
+# the same keep-alive connections instead of opening a new TCP+TLS connection.
+class HttpClient:
+    default_config = {
+        "KeepAlive": True,
+        "PoolConnections": 10,  # number of per-host pools kept around
+        "PoolSize": 10,  # connections kept per host
+        "Timeout": 10.0  # seconds, applied when a request does not pass its own
+    }
+
+    def __init__(self, config=None):
+        config = config or {}
+        try:
+            self.config = {
+                "KeepAlive": bool(config.get("KeepAlive", self.default_config["KeepAlive"])),
+                "PoolConnections": int(config.get("PoolConnections", self.default_config["PoolConnections"])),
+                "PoolSize": int(config.get("PoolSize", self.default_config["PoolSize"])),
+                "Timeout": float(config.get("Timeout", self.default_config["Timeout"])),
+            }
+        except ValueError as e:
+            raise ValueError(f"Invalid config values: {e}")
+        if self.config["PoolConnections"] < 1 or self.config["PoolSize"] < 1:
+            raise ValueError("Invalid config values: pool sizes must be at least 1")
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.config["PoolConnections"],
+                              pool_maxsize=self.config["PoolSize"])
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if not self.config["KeepAlive"]:
+            self.session.headers["Connection"] = "close"
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.config["Timeout"])
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+# Process wide client for callers that do not manage their own (utils helpers, WebScraper)
+def get_shared_client() -> HttpClient:
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+        return _shared_client
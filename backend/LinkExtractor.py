@@ -0,0 +1,88 @@
+from functools import partial
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup
+
+# Tags the crawler follows by default and the attribute holding the link, pages are reached through anchors
+PAGE_LINK_ATTRIBUTES = {"a": "href"}
+
+# Every tag referencing another URL (stylesheets, scripts, forms, frames), for crawls that map those too
+LINK_ATTRIBUTES = {
+    "a": "href",
+    "area": "href",
+    "link": "href",
+    "form": "action",
+    "script": "src",
+    "iframe": "src",
+}
+
+
+# Streaming parser that only looks at start tags, no tree is built
+class _LinkParser(HTMLParser):
+    def __init__(self, tags):
+        super().__init__(convert_charrefs=True)
+        self.tags = tags
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        attribute = self.tags.get(tag)
+        if attribute is None:
+            return
+        for name, value in attrs:
+            if name == attribute and value:
+                self.links.append(value)
+                return
+
+
+def extract_links_fast(html: str, tags=PAGE_LINK_ATTRIBUTES) -> list[str]:
+    parser = _LinkParser(tags)
+    parser.feed(html)
+    parser.close()
+    return parser.links
+
+
+# Previous BeautifulSoup path, kept as a fallback for badly broken markup
+def extract_links_bs4(html: str, tags=PAGE_LINK_ATTRIBUTES) -> list[str]:
+    soup = BeautifulSoup(html, 'html.parser')
+    links = []
+    for element in soup.find_all(list(tags)):
+        value = element.get(tags[element.name])
+        if value:
+            links.append(value)
+    return links
+
+
+# lxml is optional, the "lxml" extractor is only available when it is installed
+def extract_links_lxml(html: str, tags=PAGE_LINK_ATTRIBUTES) -> list[str]:
+    from io import BytesIO
+    from lxml import etree
+
+    links = []
+    for _, element in etree.iterparse(BytesIO(html.encode("utf-8")), events=("start",), html=True, recover=True):
+        attribute = tags.get(element.tag)
+        if attribute is not None:
+            value = element.get(attribute)
+            if value:
+                links.append(value)
+    return links
+
+
+extractors = {
+    "fast": extract_links_fast,
+    "bs4": extract_links_bs4,
+    "lxml": extract_links_lxml,
+}
+
+
+# all_links switches from the <a href> links to every tag of LINK_ATTRIBUTES
+def get_link_extractor(name: str, all_links: bool = False):
+    if name not in extractors:
+        raise ValueError(f"Invalid link extractor {name}, expected one of {tuple(extractors)}")
+    if name == "lxml":
+        try:
+            import lxml  # noqa: F401
+        except ImportError:
+            raise ValueError("The lxml link extractor requires the lxml package")
+    if all_links:
+        return partial(extractors[name], tags=LINK_ATTRIBUTES)
+    return extractors[name]
@@ -0,0 +1,47 @@
+# Compares the link extractors on a synthetic page, run with: python -m backend.LinkExtractor_benchmark
+import random
+import time
+
+from backend.LinkExtractor import extractors, get_link_extractor
+
+
+def build_page(link_count: int = 2000, paragraph_count: int = 2000) -> str:
+    rng = random.Random(0)
+    parts = ["<html><head><title>bench</title><link rel='stylesheet' href='/static/site.css'>",
+             "<script src='/static/app.js'></script></head><body>"]
+    for i in range(max(link_count, paragraph_count)):
+        if i < paragraph_count:
+            parts.append(f"<div class='row'><p>Paragraph {i} <span>{'lorem ipsum ' * rng.randint(5, 30)}</span></p></div>")
+        if i < link_count:
+            parts.append(f"<a href='/section/{i % 50}/page-{i}.html?ref={rng.randint(0, 999)}'>link {i}</a>")
+        if i % 200 == 0:
+            parts.append(f"<form action='/search/{i}'><input name='q'></form><iframe src='/embed/{i}'></iframe>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def benchmark(html: str, repeat: int = 5) -> dict:
+    results = {}
+    for name in extractors:
+        try:
+            extractor = get_link_extractor(name, all_links=True)
+        except ValueError as e:
+            print(f"{name:>5}: skipped ({e})")
+            continue
+        best = float("inf")
+        links = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            links = extractor(html)
+            best = min(best, time.perf_counter() - start)
+        results[name] = (best, len(links))
+    return results
+
+
+if __name__ == "__main__":
+    page = build_page()
+    print(f"Page size: {len(page) / 1024:.0f} KiB")
+    results = benchmark(page)
+    baseline = results["bs4"][0]
+    for name, (seconds, link_count) in results.items():
+        print(f"{name:>5}: {seconds * 1000:8.1f} ms  {link_count} links  {baseline / seconds:5.1f}x vs bs4")
@@ -0,0 +1,68 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from bs4 import BeautifulSoup
+
+from backend.LinkExtractor import get_link_extractor
+
+# Tags the web scraper takes its text from
+TEXT_TAGS = ['p', 'h1', 'h2', 'h3', 'span']
+
+
+def extract_text(html: str) -> str:
+    soup = BeautifulSoup(html, 'html.parser')
+    return ' '.join([tag.get_text() for tag in soup.find_all(TEXT_TAGS)])
+
+
+# Runs in a worker process, returns (raw links, text) of one page
+def parse_page(html: str, extractor: str = "fast", with_text: bool = True, all_links: bool = False):
+    links = get_link_extractor(extractor, all_links)(html)
+    text = extract_text(html) if with_text else None
+    return links, text
+
+
+# Process pool for the CPU bound part of crawling/scraping (HTML parsing) so it scales with cores
+# instead of running under the GIL next to the network I/O. submit()/submit_text() return a future right
+# away so the caller keeps fetching, at most max_pending pages are queued and beyond that they block the
+# caller until a parser is done, which keeps memory bounded.
+class ParserPool:
+    def __init__(self, workers: int, max_pending: int = 0, extractor: str = "fast", with_text: bool = True,
+                 all_links: bool = False):
+        if workers < 1:
+            raise ValueError("Invalid parser pool: workers must be at least 1")
+        get_link_extractor(extractor)
+        self.extractor = extractor
+        self.with_text = with_text
+        self.all_links = all_links
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self._slots = threading.BoundedSemaphore(max_pending if max_pending > 0 else workers * 2)
+
+    # Future of (raw links, text)
+    def submit(self, html: str):
+        return self._submit(parse_page, html, self.extractor, self.with_text, self.all_links)
+
+    # Future of the text only, for callers that extract the links themselves
+    def submit_text(self, html: str):
+        return self._submit(extract_text, html)
+
+    def _submit(self, function, *args):
+        self._slots.acquire()
+        try:
+            future = self.executor.submit(function, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def parse(self, html: str):
+        return self.submit(html).result()
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
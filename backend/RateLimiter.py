@@ -0,0 +1,42 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+
+# Token bucket per host: every origin gets `rate` requests per second with bursts of up to `burst`
+# requests, so politeness is enforced per server while requests to other hosts are not held back.
+class RateLimiter:
+    def __init__(self, rate: float = 0, burst: int = 1):
+        if rate < 0:
+            raise ValueError("Invalid rate limit: rate cannot be negative")
+        if burst < 1:
+            raise ValueError("Invalid rate limit: burst must be at least 1")
+        self.rate = float(rate)  # 0 disables limiting
+        self.burst = int(burst)
+        self._buckets = {}  # host -> (tokens, last refill time)
+        self._lock = threading.Lock()
+
+    # RequestsPerSecond wins when set, otherwise RequestDelay (ms) is turned into the equivalent rate
+    @classmethod
+    def from_settings(cls, requests_per_second=0, request_delay=0, burst=1):
+        if requests_per_second and requests_per_second > 0:
+            return cls(requests_per_second, burst)
+        if request_delay and request_delay > 0:
+            return cls(1000 / request_delay, burst)
+        return cls(0, burst)
+
+    # Blocks until the host of url may be contacted again, returns the time spent waiting
+    def acquire(self, url: str) -> float:
+        if self.rate == 0:
+            return 0.0
+        host = (urlparse(url).netloc or url).lower()
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(host, (self.burst, now))
+            # Tokens may go negative, which reserves a slot in the future for this caller
+            tokens = min(self.burst, tokens + (now - last) * self.rate) - 1
+            self._buckets[host] = (tokens, now)
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
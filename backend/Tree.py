@@ -1,34 +1,287 @@
+from array import array
+from collections.abc import Mapping
+
+
+class StringTable:  # interns strings to small integer ids, every distinct string is stored once
+    def __init__(self) -> None:
+        self.strings = []
+        self.ids = {}
+
+    def intern(self, string: str) -> int:
+        string_id = self.ids.get(string)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(string)
+            self.ids[string] = string_id
+        return string_id
+
+    def get_id(self, string: str):
+        return self.ids.get(string)
+
+    def __getitem__(self, string_id: int) -> str:
+        return self.strings[string_id]
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+
+class VertexList(list):  # list of children/parents handed out by AdjacencyView, changing it raises
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Tree adjacency lists are read only, use Tree.add_edge/remove_edge")
+
+    append = extend = insert = remove = pop = clear = sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+
+
+class AdjacencyView(Mapping):  # read only {vertex: [children]} (or parents) view, what dir_tree used to be
+    def __init__(self, tree, outgoing=True) -> None:
+        self.tree = tree
+        self.outgoing = outgoing
+
+    def __getitem__(self, vertex) -> list:
+        node = self.tree.get_node_id(vertex)
+        if node is None:
+            raise KeyError(vertex)
+        if self.outgoing:
+            return VertexList(self.tree.get_vertex(child) for child in self.tree.child_ids(node))
+        return VertexList(self.tree.get_vertex(parent) for parent in self.tree.parent_ids(node))
+
+    def __iter__(self):
+        return (self.tree.get_vertex(node) for node in self.tree.node_ids())
+
+    def __len__(self) -> int:
+        return self.tree.vertex_count
+
+    def __contains__(self, vertex) -> bool:
+        return self.tree.get_node_id(vertex) is not None
+
+
+# Directed graph of (url, ip) vertices stored compactly for very large crawls:
+# vertices get integer ids, urls and ips live once in interned string tables, and the
+# (ordered) child and parent lists are doubly linked lists inside flat array buffers.
+# has_edge, add_edge and remove_edge are O(1): a vertex with more than HUB_DEGREE children gets a
+# {child node: edge} index, smaller child lists are walked. Removing a vertex is O(degree).
 class Tree:
+    HUB_DEGREE = 16
+
     def __init__(self) -> None:
         self.root = None
-        self.dir_tree = {}
-    
+        self.urls = StringTable()
+        self.ips = StringTable()
+        self.vertex_count = 0
+        # per node
+        self._node_url = array('i')
+        self._node_ip = array('i')
+        self._alive = bytearray()
+        self._first_child = array('i')
+        self._last_child = array('i')
+        self._first_parent = array('i')
+        self._last_parent = array('i')
+        # per url id: the node of (url, ip) for the first ip seen, other ips go to _other_nodes
+        self._url_node = array('i')
+        self._other_nodes = {}
+        # per edge
+        self._edge_src = array('i')
+        self._edge_dst = array('i')
+        self._next_child = array('i')
+        self._prev_child = array('i')
+        self._next_parent = array('i')
+        self._prev_parent = array('i')
+        self._child_count = array('i')
+        self._parent_count = array('i')
+        # per hub node (more than HUB_DEGREE children): child node -> edge
+        self._child_edges = {}
+        self.dir_tree = AdjacencyView(self, outgoing=True)
+        self.parents = AdjacencyView(self, outgoing=False)
+
+    def get_node_id(self, vertex):  # None for anything that is not a vertex of the tree, like a dict lookup
+        if not isinstance(vertex, tuple) or len(vertex) != 2:
+            return None
+        url, ip = vertex
+        url_id = self.urls.get_id(url)
+        ip_id = self.ips.get_id(ip)
+        if url_id is None or ip_id is None:
+            return None
+        node = self._url_node[url_id]
+        if node >= 0 and self._node_ip[node] == ip_id:
+            return node
+        return self._other_nodes.get((url_id, ip_id))
+
+    def get_vertex(self, node: int) -> tuple[str, str]:
+        return self.urls[self._node_url[node]], self.ips[self._node_ip[node]]
+
+    def next_node_id(self) -> int:  # every node id is below it, removed nodes keep their id
+        return len(self._alive)
+
+    def node_ids(self):
+        return (node for node in range(len(self._alive)) if self._alive[node])
+
+    def child_ids(self, node: int):
+        edge = self._first_child[node]
+        while edge >= 0:
+            yield self._edge_dst[edge]
+            edge = self._next_child[edge]
+
+    def parent_ids(self, node: int):
+        edge = self._first_parent[node]
+        while edge >= 0:
+            yield self._edge_src[edge]
+            edge = self._next_parent[edge]
+
+    def _add_node(self, vertex) -> int:
+        node = self.get_node_id(vertex)
+        if node is not None:
+            return node
+        url, ip = vertex
+        url_id = self.urls.intern(url)
+        ip_id = self.ips.intern(ip)
+        node = len(self._alive)
+        for buffer, value in ((self._node_url, url_id), (self._node_ip, ip_id), (self._first_child, -1),
+                              (self._last_child, -1), (self._first_parent, -1), (self._last_parent, -1),
+                              (self._child_count, 0), (self._parent_count, 0)):
+            buffer.append(value)
+        self._alive.append(1)
+        while len(self._url_node) <= url_id:
+            self._url_node.append(-1)
+        if self._url_node[url_id] < 0:
+            self._url_node[url_id] = node
+        else:
+            self._other_nodes[(url_id, ip_id)] = node
+        self.vertex_count += 1
+        return node
+
     def add_vertex(self, vertex) -> None:
-        if not self.dir_tree:  # if current tree is empty, the vertex is the root:
+        if self.vertex_count == 0:  # if current tree is empty, the vertex is the root:
             self.root = vertex
-        if vertex not in self.dir_tree:
-            self.dir_tree[vertex] = []
+        self._add_node(vertex)
 
-    def add_edge(self, src, dest) -> None:
-        if src not in self.dir_tree:
+    def add_edge(self, src, dest) -> None:  # adding an existing edge again does nothing
+        if self.get_node_id(src) is None:
             self.add_vertex(src)
-        if dest not in self.dir_tree:
+        if self.get_node_id(dest) is None:
             self.add_vertex(dest)
-        self.dir_tree[src].append(dest)
+        src_node = self.get_node_id(src)
+        dest_node = self.get_node_id(dest)
+        if self._find_edge(src_node, dest_node) >= 0:
+            return
+        edge = len(self._edge_src)
+        self._edge_src.append(src_node)
+        self._edge_dst.append(dest_node)
+        self._next_child.append(-1)
+        self._prev_child.append(self._last_child[src_node])
+        self._next_parent.append(-1)
+        self._prev_parent.append(self._last_parent[dest_node])
+        if self._last_child[src_node] >= 0:
+            self._next_child[self._last_child[src_node]] = edge
+        else:
+            self._first_child[src_node] = edge
+        self._last_child[src_node] = edge
+        if self._last_parent[dest_node] >= 0:
+            self._next_parent[self._last_parent[dest_node]] = edge
+        else:
+            self._first_parent[dest_node] = edge
+        self._last_parent[dest_node] = edge
+        self._child_count[src_node] += 1
+        self._parent_count[dest_node] += 1
+        edges = self._child_edges.get(src_node)
+        if edges is not None:
+            edges[dest_node] = edge
+        elif self._child_count[src_node] > self.HUB_DEGREE:
+            edges = self._child_edges[src_node] = {}
+            edge = self._first_child[src_node]
+            while edge >= 0:
+                edges[self._edge_dst[edge]] = edge
+                edge = self._next_child[edge]
+
+    def _unlink(self, first, last, next_edge, prev_edge, node, edge) -> None:  # removes edge from one of node's lists
+        previous, following = prev_edge[edge], next_edge[edge]
+        if previous >= 0:
+            next_edge[previous] = following
+        else:
+            first[node] = following
+        if following >= 0:
+            prev_edge[following] = previous
+        else:
+            last[node] = previous
+
+    def _find_edge(self, src_node: int, dest_node: int) -> int:
+        # hubs are looked up in their index, otherwise the shorter of the two lists is walked,
+        # which is at most HUB_DEGREE edges and keeps the common small pages free of a per-edge hash entry
+        edges = self._child_edges.get(src_node)
+        if edges is not None:
+            return edges.get(dest_node, -1)
+        if self._parent_count[dest_node] <= self._child_count[src_node]:
+            edge = self._first_parent[dest_node]
+            while edge >= 0 and self._edge_src[edge] != src_node:
+                edge = self._next_parent[edge]
+            return edge
+        edge = self._first_child[src_node]
+        while edge >= 0 and self._edge_dst[edge] != dest_node:
+            edge = self._next_child[edge]
+        return edge
+
+    def _remove_edge(self, src_node: int, dest_node: int) -> None:
+        edge = self._find_edge(src_node, dest_node)
+        if edge < 0:
+            return
+        self._unlink(self._first_child, self._last_child, self._next_child, self._prev_child, src_node, edge)
+        self._unlink(self._first_parent, self._last_parent, self._next_parent, self._prev_parent, dest_node, edge)
+        self._child_count[src_node] -= 1
+        self._parent_count[dest_node] -= 1
+        edges = self._child_edges.get(src_node)
+        if edges is not None:
+            del edges[dest_node]
     
     def remove_edge(self, src, dest) -> None:
-        if src in self.dir_tree and dest in self.dir_tree[src]:
-            self.dir_tree[src].remove(dest)
+        if self.has_edge(src, dest):
+            self._remove_edge(self.get_node_id(src), self.get_node_id(dest))
     
     def remove_vertex(self, vertex) -> None:
-        if vertex in self.dir_tree:
-            del self.dir_tree[vertex]
-        for v in self.dir_tree:
-            if vertex in self.dir_tree[v]:
-                self.dir_tree[v].remove(vertex)
+        node = self.get_node_id(vertex)
+        if node is None:
+            return
+        for child in list(self.child_ids(node)):
+            self._remove_edge(node, child)
+        for parent in list(self.parent_ids(node)):
+            self._remove_edge(parent, node)
+        self._child_edges.pop(node, None)
+        url_id = self._node_url[node]
+        if self._url_node[url_id] == node:
+            self._url_node[url_id] = -1
+        else:
+            del self._other_nodes[(url_id, self._node_ip[node])]
+        self._alive[node] = 0
+        self.vertex_count -= 1
     
-    def has_edge(self, src, dest) -> None:
-        return src in self.dir_tree and dest in self.dir_tree[src]
+    def has_edge(self, src, dest) -> bool:
+        src_node = self.get_node_id(src)
+        dest_node = self.get_node_id(dest)
+        return src_node is not None and dest_node is not None and self._find_edge(src_node, dest_node) >= 0
     
-    def has_vertex(self, vertex) -> None:
-        return vertex in self.dir_tree
\ No newline at end of file
+    def has_vertex(self, vertex) -> bool:
+        return self.get_node_id(vertex) is not None
+
+    def find_vertex(self, url: str):  # the (url, ip) vertex for url, the first one if it resolved to several ips
+        url_id = self.urls.get_id(url)
+        if url_id is None:
+            return None
+        node = self._url_node[url_id]
+        if node < 0:
+            node = next((node for (other_url, _), node in self._other_nodes.items() if other_url == url_id), None)
+        return None if node is None else self.get_vertex(node)
+
+    def get_edges_since(self, offset: int) -> list:  # (src, dest) of the edges added after the first offset ones, removed ones included
+        return [(self.get_vertex(src), self.get_vertex(dest))
+                for src, dest in zip(self._edge_src[offset:], self._edge_dst[offset:])]
+
+    def get_child_count(self, vertex) -> int:
+        node = self.get_node_id(vertex)
+        return 0 if node is None else self._child_count[node]
+
+    def get_children(self, vertex) -> list:
+        node = self.get_node_id(vertex)
+        return [] if node is None else [self.get_vertex(child) for child in self.child_ids(node)]
+
+    def get_parents(self, vertex) -> list:
+        node = self.get_node_id(vertex)
+        return [] if node is None else [self.get_vertex(parent) for parent in self.parent_ids(node)]
\ No newline at end of file
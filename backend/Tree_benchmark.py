@@ -0,0 +1,84 @@
+# Memory and hub edge lookups of Tree and of the DirectoryTreeCreator the crawler uses (Tree plus the live map)
+# against the original layout, run with: python -m backend.Tree_benchmark
+import time
+import tracemalloc
+
+from backend.DirectoryTreeCreator import DirectoryTreeCreator
+from backend.Tree import Tree
+
+
+class ListTree:  # the original layout: vertex -> [children]
+    def __init__(self) -> None:
+        self.dir_tree = {}
+
+    def add_edge(self, src, dest) -> None:
+        for vertex in (src, dest):
+            if vertex not in self.dir_tree:
+                self.dir_tree[vertex] = []
+        self.dir_tree[src].append(dest)
+
+    def has_edge(self, src, dest) -> bool:
+        return src in self.dir_tree and dest in self.dir_tree[src]
+
+
+class DictTree:  # the ordered-set layout Tree replaced: vertex -> {child: None} and vertex -> {parent: None}
+    def __init__(self) -> None:
+        self.dir_tree = {}
+        self.parents = {}
+
+    def add_edge(self, src, dest) -> None:
+        for vertex in (src, dest):
+            if vertex not in self.dir_tree:
+                self.dir_tree[vertex] = {}
+                self.parents[vertex] = {}
+        self.dir_tree[src][dest] = None
+        self.parents[dest][src] = None
+
+    def has_edge(self, src, dest) -> bool:
+        return src in self.dir_tree and dest in self.dir_tree[src]
+
+
+class CrawlerTree(DirectoryTreeCreator):  # what the crawler keeps per page: the tree and the live map
+    def has_edge(self, src, dest) -> bool:
+        return self.tree.has_edge(src, dest)
+
+
+def build_urls(node_count: int) -> list:
+    return [f"http://site.test/section/{i % 100}/page-{i}" for i in range(node_count)]
+
+
+# Bytes per node of a crawl shaped tree (every page links 4 new ones). The url strings themselves are excluded,
+# the (url, ip) tuples are built for every edge like Crawler.add_tree_node does.
+def measure_memory(tree_class, urls: list) -> float:
+    tracemalloc.start()
+    tree = tree_class()
+    for i in range(1, len(urls)):
+        tree.add_edge((urls[(i - 1) // 4], "10.0.0.1"), (urls[i], "10.0.0.1"))
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return used / len(urls)
+
+
+# Seconds per has_edge from a hub linking every other vertex
+def measure_hub_lookup(tree_class, urls: list, repeat: int = 3) -> float:
+    vertices = [(url, "10.0.0.1") for url in urls]
+    tree = tree_class()
+    for vertex in vertices[1:]:
+        tree.add_edge(vertices[0], vertex)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for vertex in vertices:
+            tree.has_edge(vertices[0], vertex)
+        best = min(best, time.perf_counter() - start)
+    return best / len(vertices)
+
+
+if __name__ == "__main__":
+    urls = build_urls(100_000)
+    results = {tree_class.__name__: (measure_memory(tree_class, urls), measure_hub_lookup(tree_class, urls[:10_000]))
+               for tree_class in (ListTree, DictTree, Tree, CrawlerTree)}
+    baseline = results["ListTree"][0]
+    for name, (bytes_per_node, lookup) in results.items():
+        print(f"{name:>11}: {bytes_per_node:6.0f} bytes/node ({baseline / bytes_per_node:4.2f}x smaller than ListTree)"
+              f"  hub has_edge {lookup * 1e6:7.2f} us")
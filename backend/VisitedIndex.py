@@ -0,0 +1,57 @@
+import hashlib
+
+from backend.BloomFilter import BloomFilter
+
+
+# 64 bit digest of a string, what the exact sets store instead of the full string
+def hash64(item: str) -> int:
+    return int.from_bytes(hashlib.blake2b(item.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+# Set of strings that only keeps their 64 bit digests (a collision needs ~4 billion items to become likely)
+class DigestSet:
+    def __init__(self, items=()):
+        self.digests: set[int] = set()
+        self.update(items)
+
+    # Adds item, returns False when it was already present
+    def add(self, item: str) -> bool:
+        digest = hash64(item)
+        if digest in self.digests:
+            return False
+        self.digests.add(digest)
+        return True
+
+    def update(self, items) -> None:
+        self.digests.update(hash64(item) for item in items)
+
+    def __contains__(self, item: str) -> bool:
+        return hash64(item) in self.digests
+
+    def __len__(self) -> int:
+        return len(self.digests)
+
+
+# Set of visited URLs that does not keep the URL strings around.
+#   exact: DigestSet of the URLs
+#   bloom: BloomFilter, constant memory for very large crawls but a few URLs may be wrongly skipped
+class VisitedIndex:
+    modes = ("exact", "bloom")
+
+    def __init__(self, mode: str = "exact", capacity: int = 1_000_000, error_rate: float = 0.001):
+        if mode not in self.modes:
+            raise ValueError(f"Invalid visited index {mode}, expected one of {self.modes}")
+        self.mode = mode
+        if mode == "bloom":
+            self._index = BloomFilter(capacity, error_rate)
+        else:
+            self._index = DigestSet()
+
+    def add(self, url: str) -> None:
+        self._index.add(url)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
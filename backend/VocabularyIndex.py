@@ -0,0 +1,136 @@
+import hashlib
+import os
+from collections import Counter
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Separates the words in the flat code point array, never part of a \w token
+_SEPARATOR = ord("\n")
+
+
+def corpus_digest(*parts) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        if not isinstance(part, str):
+            part = "\n".join(part)
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+# Written next to the final file and moved into place, a reader never sees half a file
+# (one temp file per process, generator processes may save the same file at once)
+def save_npz_atomic(path: str, arrays) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(temp_path, **arrays)
+    os.replace(temp_path, path)
+
+
+# Path of the index of a corpus file, web_text.csv -> web_text.vocab.npz next to it or in cache_dir
+def vocabulary_path(csv_path: str, cache_dir: str = None) -> str:
+    path = os.path.splitext(csv_path)[0] + ".vocab.npz"
+    return os.path.join(cache_dir, os.path.basename(path)) if cache_dir else path
+
+
+# Vocabulary of a corpus built once: unique token -> count, and character n-gram tables computed with
+# NumPy over one code point array of all the words instead of per character Python loops.
+# ngrams(order, min_length) gives, for every word of at least min_length characters, each state of
+# `order` characters followed by the next character, which is what the credential MDPs are built from.
+# save()/load() keep it as an .npz keyed by the digest of the corpus it was built from.
+class VocabularyIndex:
+    def __init__(self, words, counts, digest: str = ""):
+        self.words = np.asarray(words, dtype=str)  # sorted, unique
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.digest = digest
+        self._ngrams = {}  # (order, min_length) -> (states, next chars, counts, initial states)
+        self._codes = None
+
+    # tokens is an iterable of tokens or an already counted {token: count} mapping
+    @classmethod
+    def build(cls, tokens, digest: str = ""):
+        # counting in a Counter is much cheaper than sorting millions of token strings with np.unique
+        token_counts = Counter(tokens)
+        words = np.array(sorted(token_counts), dtype=str)
+        counts = np.fromiter((token_counts[word] for word in words.tolist()), dtype=np.int64, count=len(words))
+        return cls(words, counts, digest)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def count(self, word: str) -> int:
+        position = np.searchsorted(self.words, word)
+        if position < len(self.words) and self.words[position] == word:
+            return int(self.counts[position])
+        return 0
+
+    def _code_points(self):
+        # every word followed by the separator, as one uint32 array, plus the word index of each position
+        if self._codes is None:
+            text = "".join(word + "\n" for word in self.words.tolist())
+            codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+            lengths = np.char.str_len(self.words) if len(self.words) else np.array([], dtype=np.int64)
+            owners = np.repeat(np.arange(len(self.words)), lengths + 1)
+            self._codes = codes, owners, lengths
+        return self._codes
+
+    # Returns (states, next chars, counts, initial states) for words with at least min_length characters.
+    # counts are corpus frequencies (summed over the tokens of every word containing the transition),
+    # initial states are the first `order` characters of every word longer than `order`, once per word.
+    def ngrams(self, order: int, min_length: int = 0):
+        key = (order, min_length)
+        if key not in self._ngrams:
+            self._ngrams[key] = self._build_ngrams(order, min_length)
+        return self._ngrams[key]
+
+    def _build_ngrams(self, order, min_length):
+        empty = (np.array([], dtype=f"<U{order}"), np.array([], dtype="<U1"),
+                 np.array([], dtype=np.int64), np.array([], dtype=f"<U{order}"))
+        codes, owners, lengths = self._code_points()
+        if len(codes) < order + 1:
+            return empty
+        windows = sliding_window_view(codes, order + 1)
+        window_owners = owners[:len(windows)]
+        keep = ~(windows == _SEPARATOR).any(axis=1) & (lengths[window_owners] >= min_length)
+        if not keep.any():
+            return empty
+        windows = windows[keep]
+        pairs, inverse = np.unique(windows, axis=0, return_inverse=True)
+        counts = np.bincount(inverse.ravel(), weights=self.counts[window_owners[keep]]).astype(np.int64)
+        states = np.ascontiguousarray(pairs[:, :order]).view(f"<U{order}").ravel()
+        next_chars = np.ascontiguousarray(pairs[:, order:]).view("<U1").ravel()
+
+        starts = np.concatenate(([0], np.cumsum(lengths + 1)[:-1]))
+        starters = (lengths > order) & (lengths >= min_length)
+        initial = sliding_window_view(codes, order)[starts[starters]] if starters.any() else np.empty((0, order), np.uint32)
+        initial_states = np.ascontiguousarray(initial).view(f"<U{order}").ravel()
+        return states, next_chars, counts, initial_states
+
+    def save(self, path: str) -> None:
+        arrays = {"words": self.words, "counts": self.counts, "digest": np.array(self.digest)}
+        for (order, min_length), tables in self._ngrams.items():
+            for name, table in zip(("states", "next", "counts", "initial"), tables):
+                arrays[f"ngram_{order}_{min_length}_{name}"] = table
+        save_npz_atomic(path, arrays)
+
+    # Returns None when there is no index at path or it was built from another corpus
+    @classmethod
+    def load(cls, path: str, digest: str = None):
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if digest is not None and str(data["digest"]) != digest:
+                    return None
+                index = cls(data["words"], data["counts"], str(data["digest"]))
+                for name in data.files:
+                    if name.startswith("ngram_") and name.endswith("_states"):
+                        _, order, min_length, _ = name.split("_")
+                        prefix = f"ngram_{order}_{min_length}_"
+                        index._ngrams[(int(order), int(min_length))] = tuple(
+                            data[prefix + part] for part in ("states", "next", "counts", "initial"))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[ERROR] Could not load vocabulary index {path}: {e}")
+            return None
+        return index
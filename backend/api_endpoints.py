@@ -1,13 +1,16 @@
+import os
 import threading
+from itertools import chain
 
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, StreamingResponse
 
 from backend.Crawler import Crawler
+from backend.CredentialDedup import CredentialDedup
 from backend.Fuzzer import Fuzzer
 from mdp3 import WebScraper, nlp_subroutine, CredentialGeneratorMDP
 
@@ -31,6 +34,8 @@ crawler_data: Optional [Dict[str, Any]] = None
 crawler_links: Optional[list[str]] = None
 crawler:Crawler = None
 operation_done:bool = False
+# Checkpoint and crawl store files of API crawls, callers only name a file in here
+crawl_data_dir = "crawl_data"
 
 class CrawlerConfig(BaseModel):
     TargetURL: str
@@ -38,6 +43,22 @@ class CrawlerConfig(BaseModel):
     PageNumberLimit: int
     UserAgent: str
     RequestDelay: float
+    Concurrency: int = 1
+    Timeout: float = 10
+    PoolSize: int = 10
+    KeepAlive: bool = True
+    RequestsPerSecond: float = 0
+    Burst: int = 1
+    CrawlStrategy: str = "dfs"
+    CheckpointPath: str = ""
+    CheckpointInterval: int = 50
+    CrawlStorePath: str = ""
+    VisitedIndex: str = "exact"
+    VisitedCapacity: int = 1000000
+    LinkExtractor: str = "fast"
+    FollowAllLinks: bool = False
+    ParserWorkers: int = 0
+    ParserQueueSize: int = 0
 
 
 class FuzzerConfig(BaseModel):
@@ -49,6 +70,12 @@ class FuzzerConfig(BaseModel):
     FilterContentLength: int
     PageLimit: int
     WordList: list
+    Timeout: float = 10
+    PoolSize: int = 10
+    KeepAlive: bool = True
+    RequestDelay: float = 0
+    RequestsPerSecond: float = 0
+    Burst: int = 1
 
 @app.post("/fuzzer")
 async def set_up_fuzzer(config: FuzzerConfig, background_tasks: BackgroundTasks):
@@ -99,6 +126,10 @@ def get_fuzzer_data():
 @app.post("/crawler")
 async def set_up_crawler(config: CrawlerConfig, background_tasks: BackgroundTasks):
     global crawler_data, crawler_links, crawler, operation_done
+    crawler_config = config.model_dump()
+    for key in ("CheckpointPath", "CrawlStorePath"):
+        if crawler_config[key]:
+            crawler_config[key] = get_crawl_data_path(crawler_config[key])
     crawler_data = None
     crawler_links = None
     crawler = None
@@ -108,32 +139,94 @@ async def set_up_crawler(config: CrawlerConfig, background_tasks: BackgroundTask
         global crawler_data, crawler_links, crawler, operation_done
         crawler_data = None
         crawler_links = None
-        crawler = Crawler(config.model_dump())
+        crawler = Crawler(crawler_config)
         crawler.start_crawl()
-        crawler_data = crawler.tree_creator.get_tree_map(crawler.tree_creator.tree.root)
+        crawler_data = crawler.tree_creator.get_live_tree_map()
         crawler_links = crawler.getCrawlResults()
         operation_done = True
 
     background_tasks.add_task(run_crawler)
     return {"message": "Crawl started in the background"}
 
+def get_crawl_data_path(name: str, must_exist: bool = False) -> str:
+    # Maps a file name given by a caller to crawl_data_dir, anything that is not a plain file name is rejected
+    # so a request can neither clear nor create SQLite files elsewhere on the server
+    if not name or name in (".", "..") or os.path.basename(name) != name or "\\" in name:
+        raise HTTPException(status_code=400, detail=f"Invalid file name {name!r}, expected a file name inside the crawl data directory")
+    path = os.path.join(crawl_data_dir, name)
+    if must_exist and not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail=f"No crawl checkpoint named {name}")
+    os.makedirs(crawl_data_dir, exist_ok=True)
+    return path
+
+class CrawlerResumeConfig(BaseModel):
+    CheckpointPath: str  # file name inside crawl_data_dir, as given to /crawler
+
+@app.post("/crawler/resume")
+async def resume_crawler(config: CrawlerResumeConfig, background_tasks: BackgroundTasks):
+    global crawler_data, crawler_links, crawler, operation_done
+    path = get_crawl_data_path(config.CheckpointPath, must_exist=True)
+    try:
+        resumed = Crawler.from_checkpoint(path)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    crawler_data = None
+    crawler_links = None
+    crawler = None
+    operation_done = False
+
+    def run_crawler():
+        global crawler_data, crawler_links, crawler, operation_done
+        crawler = resumed
+        crawler.resume_crawl()
+        crawler_data = crawler.tree_creator.get_live_tree_map()
+        crawler_links = crawler.getCrawlResults()
+        operation_done = True
+
+    background_tasks.add_task(run_crawler)
+    return {"message": "Crawl resumed in the background"}
+
 @app.get("/crawler/data")
-def get_crawler_data():
+def get_crawler_data(subtree: Optional[str] = None, depth: Optional[int] = None, mode: str = "dag"):
+    # The tree is streamed as JSON straight from the crawler's tree. `subtree` (a crawled URL) and
+    # `depth` let the UI load one part of a large tree at a time, `mode` is "dag" (pages linked from
+    # several places are sent once with an "id", later links become {"ref": id}) or "spanning" (later links are left out)
     global crawler_data, crawler_links, crawler
     if crawler_data is None or crawler_links is None or crawler is None:
         raise HTTPException(status_code=400, detail="No data available")
-    elif len(crawler_links) < crawler.config['PageNumberLimit'] and operation_done is False:
+    tree_creator = crawler.tree_creator
+    root = tree_creator.tree.root
+    if subtree is not None:
+        root = tree_creator.tree.find_vertex(subtree)
+        if root is None:
+            raise HTTPException(status_code=404, detail=f"{subtree} is not part of the crawl")
+    if mode not in tree_creator.traversal_modes:
+        raise HTTPException(status_code=400, detail=f"Invalid mode {mode}, expected one of {tree_creator.traversal_modes}")
+    data = tree_creator.iter_tree_json(root, depth, mode=mode)
+
+    if len(crawler_links) < crawler.config['PageNumberLimit'] and operation_done is False:
         total_data_count = len(crawler_links)
 
-        return JSONResponse(
-            content={
-                "status": "partial",
-                "data": crawler_data
-            },
+        return StreamingResponse(
+            chain(['{"status": "partial", "data": '], data, ['}']),
+            media_type="application/json",
             status_code=206,
             headers={"Content-Range": total_data_count * "links"}
         )
-    return crawler_data
+    return StreamingResponse(data, media_type="application/json")
+
+@app.get("/crawler/data/delta")
+def get_crawler_data_delta(since: int = 0):
+    # Edges added to the crawl tree after the first `since` ones, lets the UI poll without refetching the tree
+    if crawler is None:
+        raise HTTPException(status_code=400, detail="No data available")
+    since = max(since, 0)
+    edges = crawler.tree_creator.get_edges_since(since)
+    return {
+        "next": since + len(edges),
+        "done": operation_done,
+        "edges": [{"src": {"path": src[0], "ip": src[1]}, "dst": {"path": dst[0], "ip": dst[1]}} for src, dst in edges]
+    }
 
 @app.get('Crawler/data/links')
 def get_crawler_data_links():
@@ -155,21 +248,35 @@ def get_crawler_data_links():
 
 
 @app.get("/webscraper")
-def get_webscraper_data():
+def get_webscraper_data(count: int = 15, dedup: Optional[str] = None):
+    # `count` credentials are generated in batches, so large engagements can ask for tens of thousands.
+    # dedup=exact|bloom only returns distinct credentials and reports how many generated ones were repeats
     if crawler_data is None or crawler_links is None:
         raise HTTPException(status_code=400, detail="No data available")
+    if count < 1:
+        raise HTTPException(status_code=400, detail="count must be at least 1")
+    if dedup is not None and dedup not in CredentialDedup.modes:
+        raise HTTPException(status_code=400, detail=f"Invalid dedup mode {dedup}, expected one of {CredentialDedup.modes}")
 
     csv_path = "web_text.csv"
     wordlist_path = "wordlist.txt"
 
-    scraper = WebScraper(crawler_links)
+    # Pages the crawler already downloaded are parsed from its results instead of being fetched again
+    if crawler is not None:
+        scraper = WebScraper(crawler_links, bodies=crawler.op_results, texts=crawler.page_text, concurrency=8)
+    else:
+        scraper = WebScraper(crawler_links, concurrency=8)
     scraper.generate_csv(csv_path)
     nlp_subroutine(csv_path)
 
     try:
         generator = CredentialGeneratorMDP(csv_path, wordlist_path)
-        credentials = generator.generate_credentials(15)
-        return {"credentials": credentials}
+        if dedup is None:
+            return {"credentials": generator.generate_credentials(count, batch_size=1024)}
+        credential_dedup = CredentialDedup(dedup)
+        credentials = generator.generate_credentials(count, batch_size=1024, dedup=credential_dedup)
+        print(credential_dedup.report())
+        return {"credentials": credentials, "duplicate_rate": credential_dedup.duplicate_rate}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating credentials: {e}")
 
@@ -1,5 +1,7 @@
+import posixpath
 import time
-import requests
+from urllib.parse import urlsplit, urlunsplit
+from backend.HttpClient import get_shared_client
 # wrapper to get URL from a vertex
 def getURL(vertex: tuple[str, str]) -> str:
     if not isinstance(vertex, tuple) or len(vertex) != 2:
@@ -12,38 +14,80 @@ def getIP(vertex: tuple[str, str]) -> str:
         raise ValueError(f"Vertex {vertex} is not properly formatted! Format should be a tuple of the form: (url, path)")
     return vertex[1]
 
-def send_get_request(curr_dir, request_delay, page_count, page_limit, user_agent_string, cookies=None):
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# canonical form of a URL so the same page is only crawled once:
+# lowercase scheme and host, no default port, no dot segments or trailing slash, sorted query, no fragment
+def canonicalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.netloc:
+        return url
+    host = (parts.hostname or "").rstrip(".")
+    if ":" in host:  # IPv6 literal
+        host = f"[{host}]"
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, DEFAULT_PORTS[scheme]) else f"{host}:{port}"
+    if parts.username is not None:
+        userinfo = parts.username if parts.password is None else f"{parts.username}:{parts.password}"
+        netloc = f"{userinfo}@{netloc}"
+
+    path = parts.path or "/"
+    if path != "/":
+        path = posixpath.normpath(path)
+        if path.startswith("//"):  # normpath keeps a leading double slash
+            path = "/" + path.lstrip("/")
+    query = "&".join(sorted(pair for pair in parts.query.split("&") if pair))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+# the send_*_request helpers use the caller's HttpClient, or the shared one, so connections are reused
+# when a RateLimiter is given it replaces the fixed request_delay sleep with a per host limit
+def send_get_request(curr_dir, request_delay, page_count, page_limit, user_agent_string, cookies=None, client=None, limiter=None):
         if page_count >= page_limit:
             return None
-        time.sleep(request_delay / 1000)
+        if limiter is not None:
+            limiter.acquire(curr_dir)
+        else:
+            time.sleep(request_delay / 1000)
+        client = client or get_shared_client()
         try:
-            req = requests.get(curr_dir, headers={'User-Agent': user_agent_string})
+            req = client.get(curr_dir, headers={'User-Agent': user_agent_string})
             print("Currently at", curr_dir, req.status_code)
             return req.text, req.status_code
         except Exception as e:
             print(f"[ERROR] Connection error: {e}")
         return None
 
-def send_post_request(curr_dir, request_delay, json_string, page_count, page_limit, user_agent_string, cookies=None):
+def send_post_request(curr_dir, request_delay, json_string, page_count, page_limit, user_agent_string, cookies=None, client=None, limiter=None):
     if page_count>=page_limit:
         return None
-    time.sleep(request_delay/1000)
+    if limiter is not None:
+        limiter.acquire(curr_dir)
+    else:
+        time.sleep(request_delay/1000)
+    client = client or get_shared_client()
     try:
-        req = requests.post(curr_dir, headers={'User-Agent':user_agent_string}, data=json_string, cookies=cookies)
+        req = client.post(curr_dir, headers={'User-Agent':user_agent_string}, data=json_string, cookies=cookies)
         return req.text, req.status_code
     except Exception as e:
         print(f"[ERROR] Connection error: {e}")
     return None
     
 
-def send_put_request(curr_dir, request_delay, json_string, page_count, page_limit, user_agent_string, cookies=None):
+def send_put_request(curr_dir, request_delay, json_string, page_count, page_limit, user_agent_string, cookies=None, client=None, limiter=None):
     if page_count >= page_limit:
         return None
-    time.sleep(request_delay/1000)
+    if limiter is not None:
+        limiter.acquire(curr_dir)
+    else:
+        time.sleep(request_delay/1000)
+    client = client or get_shared_client()
     try:
-        req = requests.put(curr_dir, headers={'User-Agent':user_agent_string}, data=json_string)
+        req = client.put(curr_dir, headers={'User-Agent':user_agent_string}, data=json_string)
         return req.text, req.status_code
     except Exception as e:
         print(f"[ERROR] Connection error: {e}")
     return None
-    
\ No newline at end of file
@@ -1,55 +1,112 @@
 import random
 import re
-from collections import defaultdict
+import itertools
+import shutil
+import tempfile
+from collections import Counter, defaultdict, deque
+from collections.abc import Mapping, MutableMapping
 import numpy as np
 from typing import Dict, List, Tuple, Set
 import csv
 import os
 import time
-import requests
 import unicodedata #added myself
-from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from backend.CredentialDedup import CredentialDedup
+from backend.HttpClient import get_shared_client
+from backend.ParserPool import ParserPool, extract_text
+from backend.RateLimiter import RateLimiter
+from backend.VisitedIndex import DigestSet
+from backend.VocabularyIndex import VocabularyIndex, corpus_digest, save_npz_atomic, vocabulary_path
 #TODO: extend stopwords/ extend filtered words list to exclude words < len() == 4 but not for acronyms. Also attempt to split hyphenated words.
+NLP_STOPWORDS = {
+    "the", "this", "that", "these", "those",  
+    "each", "every", "either", "neither",     
+    "which", "what", "whose", "who", "whom"
+    } 
+# Compiled once per process instead of once per row
+# Replace hyphenated words with comma-separated (one pass, repeating it until no hyphen is left could loop for too long)
+HYPHEN_PATTERN = re.compile(r"(\w+)-(\w+)")
+WORD_PATTERN = re.compile(r"\w+", flags=re.IGNORECASE)
+
+def clean_text(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text)
+    text = HYPHEN_PATTERN.sub(r"\1, \2", text)
+    words = WORD_PATTERN.findall(text)
+    filtered_words = [
+        word for word in words
+        if word.lower() not in NLP_STOPWORDS and (len(word)>= 4 or word.isupper())#added word length and acronym catch
+    ]
+    return " ".join(filtered_words)
+
+# Runs in a worker process, cleans the content column of one chunk of rows
+def clean_texts(texts: List[str]) -> List[str]:
+    return [clean_text(text) for text in texts]
+
+def read_chunks(reader, chunk_size: int):
+    chunk = []
+    for row in reader:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
 #Natural Language Processing routine that cleans CSV text 
-def nlp_subroutine(csv_path: str):
-    stopwords = {
-        "the", "this", "that", "these", "those",  
-        "each", "every", "either", "neither",     
-        "which", "what", "whose", "who", "whom"
-        } 
+#The CSV is streamed chunk by chunk through a process pool (at most 2 chunks per worker in flight, results are
+#written in input order) into a temp file that replaces the original once complete, memory stays constant
+#whatever the corpus size and a failure leaves the original untouched.
+def nlp_subroutine(csv_path: str, workers: int = None, chunk_size: int = 1000):
     if not os.path.exists(csv_path):
         raise FileNotFoundError(f"CSV file not found: {csv_path}")
-    cleaned_rows = []
+    workers = workers or os.cpu_count() or 1
+    directory = os.path.dirname(os.path.abspath(csv_path))
     with open(csv_path, "r", encoding="utf-8") as infile:
         reader = csv.DictReader(infile)
         fieldnames = reader.fieldnames
         if not fieldnames or not {"id", "content", "url"}.issubset(fieldnames):
             raise ValueError("CSV must contain columns: id, content, url")
-        for row in reader:
-            text = row["content"] if row["content"] else ""
-            # #Start of edit for separating hyphens
-            text = unicodedata.normalize("NFKC", text)
-            # Replace hyphenated words with comma-separated
-            text = re.sub(r"(\w+)-(\w+)", r"\1, \2", text) #result  = re.sub(r"(\w+)-(\w+)", r"\1, \2", text)#Original
-            # while "-" in result:  # Repeat until all hyphens are replaced
-            #     result = re.sub(r"(\w+)-(\w+)", r"\1, \2", result)
-            # text = result 
-            # #End of separating hypens Failure lead to taking too long, potentially infinite loop
-            words = re.findall(r"\w+", text, flags=re.IGNORECASE) #original
-            filtered_words = [
-                word for word in words
-                if word.lower() not in stopwords and (len(word)>= 4 or word.isupper())#added word length and acronym catch
-            ]
-            cleaned_text = " ".join(filtered_words)
-            row["content"] = cleaned_text
-            cleaned_rows.append(row)
-    #Overwrite original CSV with cleaned text
-    with open(csv_path, "w", newline="", encoding="utf-8") as outfile:
-        writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(cleaned_rows)
+        outfile = tempfile.NamedTemporaryFile("w", newline="", encoding="utf-8", dir=directory,
+                                              prefix=".nlp-", suffix=".csv", delete=False)
+        try:
+            with outfile:
+                writer = csv.DictWriter(outfile, fieldnames=fieldnames)
+                writer.writeheader()
+                for chunk, cleaned in clean_chunks(read_chunks(reader, chunk_size), workers):
+                    for row, text in zip(chunk, cleaned):
+                        row["content"] = text
+                    writer.writerows(chunk)
+            #Replace original CSV with cleaned text
+            shutil.copymode(csv_path, outfile.name)
+            os.replace(outfile.name, csv_path)
+        except BaseException:
+            os.unlink(outfile.name)
+            raise
     print(f"Cleaned CSV '{csv_path}' file has been generated.")
 
+# Yields (chunk, cleaned texts) in input order, the pool is only started once there is a second chunk
+def clean_chunks(chunks, workers: int):
+    chunks = iter(chunks)
+    first = next(chunks, None)
+    if first is None:
+        return
+    second = next(chunks, None)
+    if workers <= 1 or second is None:
+        for chunk in (first,) if second is None else itertools.chain((first, second), chunks):
+            yield chunk, clean_texts([row["content"] or "" for row in chunk])
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in itertools.chain((first, second), chunks):
+            pending.append((chunk, executor.submit(clean_texts, [row["content"] or "" for row in chunk])))
+            if len(pending) >= workers * 2:
+                chunk, future = pending.popleft()
+                yield chunk, future.result()
+        while pending:
+            chunk, future = pending.popleft()
+            yield chunk, future.result()
+
 #Load URLs from a CSV file with columns 'id' and 'website'.
 def load_urls_from_csv(csv_path: str) -> List[str]:
     if not os.path.exists(csv_path):
@@ -69,33 +126,80 @@ def load_urls_from_csv(csv_path: str) -> List[str]:
 
 #Web scraper functions and will pull something out of the URLs provided.
 class WebScraper:
-    # Initialize with list of URLs
-    def __init__(self, urls):
+    # Initialize with list of URLs, requests go through a pooled HttpClient (the shared one by default)
+    # parser_workers > 0 hands the text extraction to a process pool while other pages are downloaded
+    # bodies/texts are {url: html}/{url: text} mappings of pages that were already fetched (the crawler's
+    # op_results/page_text or a CrawlStore), only URLs missing from both are downloaded again
+    # Up to `concurrency` pages are fetched at once, requests to the same host stay `host_delay` seconds apart
+    def __init__(self, urls, client=None, parser_workers=0, bodies=None, texts=None,
+                 concurrency=1, host_delay=1.0, timeout=10):
+        if concurrency < 1:
+            raise ValueError("Invalid web scraper: concurrency must be at least 1")
         self.urls = urls
+        self.client = client or get_shared_client()
+        self.parser_workers = parser_workers
+        self.bodies = bodies if bodies is not None else {}
+        self.texts = texts if texts is not None else {}
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(1 / host_delay if host_delay > 0 else 0)
+
+    # Scrapes the pages of a crawl saved with CrawlStorePath, by default every stored page
+    @classmethod
+    def from_store(cls, store, urls=None, **kwargs):
+        return cls(list(store.pages) if urls is None else urls, bodies=store.pages, texts=store.texts, **kwargs)
+
+    # Returns (html, fetch latency in ms), the latency is None for pages that were already fetched
+    def get_body(self, url):
+        body = self.bodies.get(url)
+        if body:
+            return body, None
+        self.rate_limiter.acquire(url)  # Be polite to servers
+        start = time.perf_counter()
+        response = self.client.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text, (time.perf_counter() - start) * 1000
+
+    # One output row: (id, text, url, latency_ms)
+    def scrape_page(self, i, url, parser_pool=None):
+        text = self.texts.get(url)
+        if text is not None:
+            return i, text, url, ""
+        body, latency = self.get_body(url)
+        # Extract text from p, h1, h2, h3, and span tags
+        if parser_pool is not None:
+            text = parser_pool.parse(body)[1]
+        else:
+            text = extract_text(body)
+        return i, text, url, "" if latency is None else round(latency, 1)
+
+    # Yields rows as soon as their page is done, in completion order
+    def iter_pages(self):
+        parser_pool = ParserPool(self.parser_workers) if self.parser_workers > 0 else None
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                futures = {executor.submit(self.scrape_page, i, url, parser_pool): url
+                           for i, url in enumerate(self.urls, 1)}
+                for future in as_completed(futures):
+                    try:
+                        yield future.result()
+                    except Exception as e:
+                        print(f"Error scraping {futures[future]}: {e}")
+        finally:
+            if parser_pool is not None:
+                parser_pool.close()
 
     # Scrape text content from web pages
     def scrape_pages(self):
-        results = []
-        for i, url in enumerate(self.urls, 1):
-            try:
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.text, 'html.parser')
-                # Extract text from p, h1, h2, h3, and span tags
-                text = ' '.join([tag.get_text() for tag in soup.find_all(['p', 'h1', 'h2', 'h3', 'span'])])
-                results.append((i, text, url))
-                time.sleep(1)  # Be polite to servers
-            except Exception as e:
-                print(f"Error scraping {url}: {e}")
-        return results
-
-    # Generate CSV file with scraped data
+        return sorted(self.iter_pages(), key=lambda row: row[0])
+
+    # Generate CSV file with scraped data, rows are written as pages complete
     def generate_csv(self, filename):
-        data = self.scrape_pages()
         with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
             csv_writer = csv.writer(csvfile)
-            csv_writer.writerow(['id', 'content', 'url'])  # Header
-            csv_writer.writerows(data)
+            csv_writer.writerow(['id', 'content', 'url', 'latency_ms'])  # Header
+            for row in self.iter_pages():
+                csv_writer.writerow(row)
         print(f"CSV file '{filename}' has been generated.")
         
 # Load web text from a CSV file
@@ -125,6 +229,315 @@ def load_wordlist(file_path: str) -> List[str]:
         return words
     except Exception as e:
         raise ValueError(f"Error reading wordlist file: {e}")
+
+# Q-values of one MDP in flat NumPy arrays instead of nested dicts keyed by strings.
+# States and characters get integer ids, the transitions are laid out in CSR form:
+#   actions of state s:        action_indptr[s]:action_indptr[s + 1] (action_char holds their character id)
+#   next chars of action a:    pair_indptr[a]:pair_indptr[a + 1] (pair_char holds their character id)
+#   pair p:                    q[p], pair_action[p] is the character id of its action, pair_slot[p] the action
+#                              index, pair_state[p] the state it leaves and pair_next_state[p] the state id
+#                              reached by it (-1 if it is not a state)
+# best_pair[s]/max_q_of[s] cache the first pair with the highest Q of every state (-1/0.0 without pairs), set_q()
+# keeps them up to date so the greedy choice and the Bellman target are O(1) instead of a scan of the state.
+# Built from CredentialMDP.state_transitions, Q-values of the pairs found in `q_values`
+# ({(state, action, next_char): q}) are carried over.
+class QTable:
+    def __init__(self, state_transitions, q_values=None, prefix_length: int = 9, order: int = 2):
+        self.state_names: List[str] = list(state_transitions)
+        self.state_ids = {state: i for i, state in enumerate(self.state_names)}
+        self.chars: List[str] = []
+        self.char_ids: Dict[str, int] = {}
+        action_indptr = [0]
+        action_char = []
+        pair_indptr = [0]
+        pair_char = []
+        pair_action = []
+        pair_slot = []
+        pair_state = []
+        pair_next_state = []
+        for state_id, state in enumerate(self.state_names):
+            prefix, text = state[:prefix_length], state[prefix_length:]
+            for action, next_chars in state_transitions[state].items():
+                if not next_chars:
+                    continue
+                action_char.append(self.char_id(action))
+                for next_char in next_chars:
+                    pair_char.append(self.char_id(next_char))
+                    pair_action.append(action_char[-1])
+                    pair_slot.append(len(action_char) - 1)
+                    pair_state.append(state_id)
+                    pair_next_state.append(self.state_ids.get(prefix + (text + next_char)[-order:], -1))
+                pair_indptr.append(len(pair_char))
+            action_indptr.append(len(action_char))
+        self.action_indptr = np.array(action_indptr, dtype=np.int64)
+        self.action_char = np.array(action_char, dtype=np.int32)
+        self.pair_indptr = np.array(pair_indptr, dtype=np.int64)
+        self.pair_char = np.array(pair_char, dtype=np.int32)
+        self.pair_action = np.array(pair_action, dtype=np.int32)
+        self.pair_slot = np.array(pair_slot, dtype=np.int64)
+        self.pair_state = np.array(pair_state, dtype=np.int32)
+        self.pair_next_state = np.array(pair_next_state, dtype=np.int32)
+        self.q = np.zeros(len(pair_char), dtype=np.float64)
+        self.unlisted_q_values = self.copy_q_values(q_values) if q_values else {}
+        self.best_pair = np.full(len(self.state_names), -1, dtype=np.int64)
+        self.max_q_of = np.zeros(len(self.state_names), dtype=np.float64)
+        self.refresh_max()
+        # The generation loop works one element at a time, these memoryviews share the arrays' buffers and
+        # index to plain ints/floats instead of allocating a NumPy scalar per access
+        self.action_indptr_view = memoryview(self.action_indptr)
+        self.pair_indptr_view = memoryview(self.pair_indptr)
+        self.pair_char_view = memoryview(self.pair_char)
+        self.pair_action_view = memoryview(self.pair_action)
+        self.pair_slot_view = memoryview(self.pair_slot)
+        self.pair_state_view = memoryview(self.pair_state)
+        self.pair_next_state_view = memoryview(self.pair_next_state)
+        self.q_view = memoryview(self.q)
+        self.best_pair_view = memoryview(self.best_pair)
+        self.max_q_of_view = memoryview(self.max_q_of)
+
+    def char_id(self, char: str) -> int:
+        char_id = self.char_ids.get(char)
+        if char_id is None:
+            char_id = self.char_ids[char] = len(self.chars)
+            self.chars.append(char)
+        return char_id
+
+    # Sets the Q-values of the pairs in q_values, returns the (non zero) ones that are not pairs of this table
+    def copy_q_values(self, q_values) -> dict:
+        q_values = dict(q_values)
+        for pair, key in enumerate(self.pair_keys()):
+            value = q_values.pop(key, None)
+            if value is not None:
+                self.q[pair] = value
+        return {key: value for key, value in q_values.items() if value}
+
+    # {(state, action, next_char): q} of every pair
+    def get_q_values(self) -> dict:
+        return dict(zip(self.pair_keys(), self.q.tolist()))
+
+    # Recomputes the whole max/argmax cache at once, after q was changed without set_q()
+    def refresh_max(self) -> None:
+        self.best_pair[:] = -1
+        self.max_q_of[:] = 0.0
+        if not len(self.q):
+            return
+        starts = self.pair_indptr[self.action_indptr[:-1]]
+        ends = self.pair_indptr[self.action_indptr[1:]]
+        filled = np.flatnonzero(ends > starts)
+        if not len(filled):
+            return
+        self.max_q_of[filled] = np.maximum.reduceat(self.q, starts[filled])
+        # first pair of each state reaching the state's max
+        at_max = np.flatnonzero(self.q == self.max_q_of[self.pair_state])
+        states, first = np.unique(self.pair_state[at_max], return_index=True)
+        self.best_pair[states] = at_max[first]
+
+    # Sets the Q-value of a pair and keeps the max/argmax of its state current, only lowering the
+    # current best of a state needs a scan of that state's pairs
+    def set_q(self, pair: int, value: float) -> None:
+        q = self.q_view
+        q[pair] = value
+        state_id = self.pair_state_view[pair]
+        best = self.best_pair_view[state_id]
+        best_value = self.max_q_of_view[state_id]
+        if value > best_value or (value == best_value and pair < best):
+            self.best_pair_view[state_id] = pair
+            self.max_q_of_view[state_id] = value
+        elif pair == best:
+            start, end = self.pair_range(state_id)
+            best, best_value = start, q[start]
+            for candidate in range(start + 1, end):
+                if q[candidate] > best_value:
+                    best, best_value = candidate, q[candidate]
+            self.best_pair_view[state_id] = best
+            self.max_q_of_view[state_id] = best_value
+
+    # Vectorized set_q for a batch of pairs (a pair given twice keeps its last value), the cache of every
+    # touched state is recomputed over that state's pairs only
+    def set_many(self, pairs, values) -> None:
+        self.q[pairs] = values
+        states = np.unique(self.pair_state[pairs])
+        starts = self.pair_indptr[self.action_indptr[states]]
+        lengths = self.pair_indptr[self.action_indptr[states + 1]] - starts
+        offsets = np.cumsum(lengths) - lengths
+        members = np.arange(lengths.sum()) - np.repeat(offsets - starts, lengths)
+        values = self.q[members]
+        maxima = np.maximum.reduceat(values, offsets)
+        at_max = np.flatnonzero(values == np.repeat(maxima, lengths))
+        _, first = np.unique(np.repeat(np.arange(len(states)), lengths)[at_max], return_index=True)
+        self.best_pair[states] = members[at_max[first]]
+        self.max_q_of[states] = maxima
+
+    # (state, action, next_char) of every pair, in pair order
+    def pair_keys(self):
+        for state_id, state in enumerate(self.state_names):
+            for action in range(self.action_indptr[state_id], self.action_indptr[state_id + 1]):
+                action_name = self.chars[self.action_char[action]]
+                for pair in range(self.pair_indptr[action], self.pair_indptr[action + 1]):
+                    yield state, action_name, self.chars[self.pair_char[pair]]
+
+    def pair_range(self, state_id: int):
+        return (self.pair_indptr_view[self.action_indptr_view[state_id]],
+                self.pair_indptr_view[self.action_indptr_view[state_id + 1]])
+
+    def find_pair(self, state_id: int, action: str, next_char: str) -> int:
+        action_id = self.char_ids.get(action)
+        next_id = self.char_ids.get(next_char)
+        if action_id is None or next_id is None:
+            return -1
+        for action in range(self.action_indptr[state_id], self.action_indptr[state_id + 1]):
+            if self.action_char[action] == action_id:
+                start, end = self.pair_indptr[action], self.pair_indptr[action + 1]
+                matches = np.flatnonzero(self.pair_char[start:end] == next_id)
+                return int(start + matches[0]) if len(matches) else -1
+        return -1
+
+    # Max Q over every pair leaving state_id, 0 for states without transitions (or not in the table)
+    def max_q(self, state_id: int) -> float:
+        if state_id < 0:
+            return 0.0
+        return self.max_q_of_view[state_id]
+
+    def __len__(self) -> int:
+        return len(self.q)
+
+
+# Walker alias table (Vose's construction) over len(weights) outcomes: O(n) to build, then every draw is one
+# uniform column plus one biased coin flip whatever the weights are
+class AliasTable:
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        total = weights.sum() if len(weights) else 0.0
+        if not len(weights) or not np.isfinite(total) or total <= 0 or (weights < 0).any():
+            raise ValueError("Invalid weights: need at least one positive weight and no negative ones")
+        size = len(weights)
+        scaled = (weights * (size / total)).tolist()
+        probability = [1.0] * size
+        alias = list(range(size))
+        small = [i for i, value in enumerate(scaled) if value < 1.0]
+        large = [i for i, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            column, donor = small.pop(), large.pop()
+            probability[column] = scaled[column]
+            alias[column] = donor
+            scaled[donor] -= 1.0 - scaled[column]
+            (small if scaled[donor] < 1.0 else large).append(donor)
+        # whatever is left over only differs from 1 by rounding
+        self.probability = np.array(probability, dtype=np.float64)
+        self.alias = np.array(alias, dtype=np.int64)
+        self.probability_view = memoryview(self.probability)
+        self.alias_view = memoryview(self.alias)
+
+    def __len__(self) -> int:
+        return len(self.probability)
+
+    # One draw with the random module, like the rest of the sequential generator
+    def sample_one(self) -> int:
+        column = random.randrange(len(self.probability))
+        return column if random.random() < self.probability_view[column] else self.alias_view[column]
+
+    # `count` draws with a NumPy Generator
+    def sample(self, rng, count: int) -> np.ndarray:
+        columns = rng.integers(0, len(self.probability), count)
+        return np.where(rng.random(count) < self.probability[columns], columns, self.alias[columns])
+
+# CredentialMDP.state_transitions ({state: {action: {next_char}}}, missing keys are created like with the
+# nested defaultdicts it used to be) that calls on_change on every change, so a compiled QTable is never used stale
+class TransitionSet(set):
+    def __init__(self, on_change, items=()):
+        super().__init__(items)
+        self.on_change = on_change
+
+
+class TransitionDict(defaultdict):
+    def __init__(self, on_change, default_factory):
+        super().__init__(default_factory)
+        self.on_change = on_change
+
+
+def _notify_changes(cls, names):
+    for name in names:
+        def method(self, *args, _method=getattr(cls, name), **kwargs):
+            self.on_change()
+            return _method(self, *args, **kwargs)
+        setattr(cls, name, method)
+
+
+_notify_changes(TransitionSet, ("add", "discard", "remove", "pop", "clear", "update", "difference_update",
+                                "intersection_update", "symmetric_difference_update",
+                                "__ior__", "__iand__", "__isub__", "__ixor__"))
+_notify_changes(TransitionDict, ("__setitem__", "__delitem__", "clear", "pop", "popitem", "setdefault", "update", "__ior__"))
+
+
+def make_state_transitions(on_change, transitions=()) -> TransitionDict:
+    states = TransitionDict(on_change, lambda: TransitionDict(on_change, lambda: TransitionSet(on_change)))
+    for state, actions in dict(transitions).items():
+        for action, next_chars in actions.items():
+            states[state][action].update(next_chars)
+        states[state]  # states without transitions are kept
+    return states
+
+
+# CredentialMDP.q_values, {state: {(action, next_char): q}} read from and written to the MDP's Q-table.
+# Like the defaultdicts it replaces any state/pair can be read (0.0 when never set) and written.
+class QValues(Mapping):
+    def __init__(self, mdp) -> None:
+        self.mdp = mdp
+
+    def __getitem__(self, state: str) -> "StateQValues":
+        return StateQValues(self.mdp, state)
+
+    def _states(self) -> dict:
+        q_table = self.mdp.get_q_table()
+        states = dict.fromkeys(state for state_id, state in enumerate(q_table.state_names)
+                               if q_table.action_indptr[state_id] < q_table.action_indptr[state_id + 1])
+        states.update(dict.fromkeys(state for state, _, _ in self.mdp.unlisted_q_values))
+        return states
+
+    def __iter__(self):
+        return iter(self._states())
+
+    def __len__(self) -> int:
+        return len(self._states())
+
+    def __contains__(self, state) -> bool:
+        return state in self._states()
+
+
+class StateQValues(MutableMapping):
+    def __init__(self, mdp, state: str) -> None:
+        self.mdp = mdp
+        self.state = state
+
+    def __getitem__(self, key: Tuple[str, str]) -> float:
+        return self.mdp.get_q_value(self.state, *key)
+
+    def __setitem__(self, key: Tuple[str, str], value: float) -> None:
+        self.mdp.set_q_value(self.state, *key, value)
+
+    def __delitem__(self, key: Tuple[str, str]) -> None:
+        raise TypeError("Q-values can not be deleted, set them to 0.0 instead")
+
+    def _keys(self) -> list:
+        q_table = self.mdp.get_q_table()
+        state_id = q_table.state_ids.get(self.state, -1)
+        keys = []
+        if state_id >= 0:
+            start, end = q_table.pair_range(state_id)
+            keys = [(q_table.chars[q_table.pair_action[pair]], q_table.chars[q_table.pair_char[pair]]) for pair in range(start, end)]
+        keys += [(action, next_char) for state, action, next_char in self.mdp.unlisted_q_values if state == self.state]
+        return keys
+
+    def __iter__(self):
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys()
+
+
 #TODO: mess with numbers here
 # Class for managing the Markov Decision Process for generating credentials 
 # #defaults are in another file
@@ -132,12 +545,117 @@ class CredentialMDP:
     def __init__(self, order: int = 2, gamma: float = 0.9): #modify gamma and maybe order to increase password length
         self.order = order
         self.gamma = gamma
-        self.q_values: Dict[str, Dict[Tuple[str, str], float]] = defaultdict(lambda: defaultdict(float))
-        self.state_transitions: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
-        self.used_usernames: Set[str] = set()
+        self.q_table = None  # QTable compiled from state_transitions, see compile()
+        self.q_table_stale = False  # state_transitions changed since q_table was compiled
+        self.state_transitions = {}
+        self.used_usernames = DigestSet()  # digests only, the strings are never needed again
         self.epsilon = 0.1 #mess with this #this is what influences the greedy algorithm in choosing actions
         self.learning_rate = 0.1 #mess with this #this is how small a step is taken in each iteration, usually the smaller the better but this can lead to some rediculous runtimes
-        self.initial_states: List[str] = []
+        self.initial_states: List[str] = []  # unique start states of the walks, see set_initial_states()
+        self.initial_weights = np.zeros(0, dtype=np.float64)
+        self.initial_sampler = None  # AliasTable over initial_weights
+
+    # Sets the start states and how likely each one is picked (1 per occurrence without weights),
+    # repeated states are merged and their weights summed, states weighted 0 are dropped
+    def set_initial_states(self, states, weights=None) -> None:
+        states = np.asarray(states, dtype=str)
+        weights = np.ones(len(states)) if weights is None else np.asarray(weights, dtype=np.float64)
+        unique, inverse = np.unique(states, return_inverse=True)
+        totals = np.bincount(inverse.ravel(), weights=weights, minlength=len(unique))
+        keep = totals > 0
+        self.initial_states = unique[keep].tolist()
+        self.initial_weights = totals[keep]
+        self.initial_sampler = AliasTable(self.initial_weights) if self.initial_states else None
+
+    # Start state drawn by weight, None without initial states
+    def sample_initial_state(self):
+        if self.initial_sampler is None:
+            return None
+        return self.initial_states[self.initial_sampler.sample_one()]
+
+    # Indexes into initial_states of `count` start states drawn by weight with a NumPy Generator
+    def sample_initial_states(self, rng, count: int) -> np.ndarray:
+        return self.initial_sampler.sample(rng, count)
+
+    @property
+    def state_transitions(self) -> Dict[str, Dict[str, Set[str]]]:
+        return self._state_transitions
+
+    @state_transitions.setter
+    def state_transitions(self, transitions) -> None:
+        self._state_transitions = make_state_transitions(self.invalidate, transitions)
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        self.q_table_stale = True
+
+    # Q-values of pairs that are not transitions of the compiled table (set through q_values or update_q_value),
+    # they do not take part in choosing actions until state_transitions has them and the table is recompiled
+    @property
+    def unlisted_q_values(self) -> Dict[Tuple[str, str, str], float]:
+        return self.get_q_table().unlisted_q_values
+
+    # Builds the Q-table from state_transitions, get_q_table() calls it again once state_transitions changed.
+    # Q-values learned for transitions that still exist are kept, the others are kept aside in unlisted_q_values.
+    def compile(self) -> QTable:
+        q_values = None
+        if self.q_table is not None:
+            q_values = {**self.q_table.unlisted_q_values, **self.q_table.get_q_values()}
+        self.q_table = QTable(self.state_transitions, q_values, order=self.order)
+        self.q_table_stale = False
+        return self.q_table
+
+    def get_q_table(self) -> QTable:
+        if self.q_table is None or self.q_table_stale:
+            self.compile()
+        return self.q_table
+
+    def get_state_id(self, state: str) -> int:
+        return self.get_q_table().state_ids.get(state, -1)
+
+    # The Q-values as {state: {(action, next_char): q}}, writes go to the Q-table
+    @property
+    def q_values(self) -> QValues:
+        return QValues(self)
+
+    # Pair of the compiled Q-table, -1 if (state, action, next_char) is not a transition of it
+    def get_pair(self, state: str, action: str, next_char: str) -> int:
+        state_id = self.get_state_id(state)
+        return self.q_table.find_pair(state_id, action, next_char) if state_id >= 0 else -1
+
+    def get_q_value(self, state: str, action: str, next_char: str) -> float:
+        pair = self.get_pair(state, action, next_char)
+        if pair < 0:
+            return self.q_table.unlisted_q_values.get((state, action, next_char), 0.0)
+        return float(self.q_table.q[pair])
+
+    def set_q_value(self, state: str, action: str, next_char: str, value: float) -> None:
+        pair = self.get_pair(state, action, next_char)
+        if pair < 0:
+            self.q_table.unlisted_q_values[(state, action, next_char)] = value
+        else:
+            self.q_table.set_q(pair, value)
+
+    # What has been learned, as arrays for CredentialGeneratorMDP.save_model. The pair arrays and chars only
+    # identify the transitions the Q-values belong to.
+    def get_model_arrays(self) -> Dict[str, np.ndarray]:
+        q_table = self.get_q_table()
+        return {"order": np.array(self.order), "chars": np.array(q_table.chars, dtype=str),
+                "pair_state": q_table.pair_state, "pair_action": q_table.pair_action, "pair_char": q_table.pair_char,
+                "q": q_table.q, "used_usernames": np.fromiter(self.used_usernames.digests, dtype=np.uint64)}
+
+    # Whether arrays from get_model_arrays were saved for the same transitions as the current Q-table
+    def matches_model_arrays(self, arrays) -> bool:
+        q_table = self.get_q_table()
+        if int(arrays["order"]) != self.order or arrays["chars"].tolist() != q_table.chars:
+            return False
+        return all(np.array_equal(arrays[name], getattr(q_table, name)) for name in ("pair_state", "pair_action", "pair_char"))
+
+    def set_model_arrays(self, arrays) -> None:
+        q_table = self.get_q_table()
+        q_table.q[:] = arrays["q"]
+        q_table.refresh_max()
+        self.used_usernames.digests.update(arrays["used_usernames"].tolist())
 
     # Calculate the strength of a password
     def calculate_password_strength(self, password: str) -> float:
@@ -178,49 +696,65 @@ class CredentialMDP:
 
     # Get possible actions for a state
     def get_possible_actions(self, state: str) -> List[str]:
-        return list(self.state_transitions[state].keys())
+        state_id = self.get_state_id(state)
+        if state_id < 0:
+            return []
+        q_table = self.q_table
+        return [q_table.chars[char] for char in q_table.action_char[q_table.action_indptr[state_id]:q_table.action_indptr[state_id + 1]]]
+
+    # Epsilon-greedy choice of a transition pair of state_id, -1 when the state has none
+    def choose_pair(self, state_id: int) -> int:
+        if state_id < 0:
+            return -1
+        q_table = self.q_table
+        action_indptr, pair_indptr = q_table.action_indptr_view, q_table.pair_indptr_view
+        first_action, end_action = action_indptr[state_id], action_indptr[state_id + 1]
+        if first_action == end_action:
+            return -1
+        if random.random() < self.epsilon:
+            action = random.randrange(first_action, end_action)
+        else:
+            # Choose best action based on Q-values (an action is worth its best next char), first one on ties
+            action = q_table.pair_slot_view[q_table.best_pair_view[state_id]]
+        start, end = pair_indptr[action], pair_indptr[action + 1]
+        return start if end - start == 1 else random.randrange(start, end)
 
     # Choose an action based on epsilon-greedy strategy
     def choose_action(self, state: str) -> Tuple[str, str]:
-        possible_actions = self.get_possible_actions(state)
-        if not possible_actions:
+        pair = self.choose_pair(self.get_state_id(state))
+        if pair < 0:
             return "", ""
+        q_table = self.q_table
+        return q_table.chars[q_table.pair_action_view[pair]], q_table.chars[q_table.pair_char_view[pair]]
 
-        if random.random() < self.epsilon:
-            action = random.choice(possible_actions)
-            next_char = random.choice(list(self.state_transitions[state][action]))
-        else:
-            # Choose best action based on Q-values
-            action_values = {}
-            for act in possible_actions:
-                if self.state_transitions[state][act]:
-                    value = max([self.q_values[state][(act, nxt_ch)] for nxt_ch in self.state_transitions[state][act]])
-                    action_values[act] = value
-
-            if action_values:
-                action = max(action_values.items(), key=lambda x: x[1])[0]
-                next_char = random.choice(list(self.state_transitions[state][action]))
-            else:
-                action = random.choice(possible_actions)
-                next_char = random.choice(list(self.state_transitions[state][action]))
-
-        return action, next_char
-
-    # Update Q-value based on the Bellman equation
+    # Bellman update of one pair, the next state is the one the pair leads to
+    def update_pair(self, pair: int, reward: float) -> None:
+        q_table = self.q_table
+        max_next_q = q_table.max_q(q_table.pair_next_state_view[pair])
+        current_q = q_table.q_view[pair]
+        q_table.set_q(pair, current_q + self.learning_rate * (reward + self.gamma * max_next_q - current_q))
+
+    # Update Q-value based on the Bellman equation, pairs that are not transitions are updated too
+    # (max_next_q only looks at the transitions of next_state, as it always has)
     def update_q_value(self, state: str, action: str, next_char: str, next_state: str, reward: float):
-        next_action_values = []
-        for next_action in self.get_possible_actions(next_state):
-            for next_next_char in self.state_transitions[next_state][next_action]:
-                next_action_values.append(self.q_values[next_state][(next_action, next_next_char)])
+        max_next_q = self.get_q_table().max_q(self.get_state_id(next_state))
+        current_q = self.get_q_value(state, action, next_char)
+        self.set_q_value(state, action, next_char, current_q + self.learning_rate * (reward + self.gamma * max_next_q - current_q))
 
-        max_next_q = max(next_action_values, default=0)
-        current_q = self.q_values[state][(action, next_char)]
-        new_q = current_q + self.learning_rate * (reward + self.gamma * max_next_q - current_q)
-        self.q_values[state][(action, next_char)] = new_q
+# Path of the trained model of a corpus file, web_text.csv -> web_text.model.npz next to it or in cache_dir
+def model_path(csv_path: str, cache_dir: str = None) -> str:
+    path = os.path.splitext(csv_path)[0] + ".model.npz"
+    return os.path.join(cache_dir, os.path.basename(path)) if cache_dir else path
 
 # Class for generating credentials using Markov Decision Process
+# cache_dir is where the vocabulary index and the trained model of the corpus are kept, next to the CSV by default
 class CredentialGeneratorMDP:
-    def __init__(self, csv_path: str, wordlist_path: str):
+    def __init__(self, csv_path: str, wordlist_path: str, cache_dir: str = None):
+        self.csv_path = csv_path
+        self.wordlist_path = wordlist_path
+        self.cache_dir = cache_dir
+        self.vocabulary = None
+        self.built_digest = None  # digest of the vocabulary the MDPs were built from
         try:
             self.web_text = load_web_text(csv_path)
             self.wordlists = load_wordlist(wordlist_path)
@@ -239,68 +773,121 @@ class CredentialGeneratorMDP:
         words = re.findall(r'\w+', text.lower())
         return [word for word in words if len(word) >= 4]
 
+    # Same tokens as preprocess_text as {token: count}. \w+ tokens never span whitespace, so the regex only
+    # has to run once per distinct whitespace separated piece instead of over the whole corpus
+    def count_tokens(self, text: str) -> Counter:
+        counts = Counter()
+        for piece, piece_count in Counter(text.split()).items():
+            for word in WORD_PATTERN.findall(piece.lower()):
+                if len(word) >= 4:
+                    counts[word] += piece_count
+        return counts
+
+    # Token counts and n-gram tables of the corpus, loaded from the index saved next to the CSV when it was
+    # built from the same web text and wordlist, otherwise built once and saved for the next run
+    def get_vocabulary(self) -> VocabularyIndex:
+        if self.vocabulary is None:
+            digest = corpus_digest(self.web_text, self.wordlists)
+            path = vocabulary_path(self.csv_path, self.cache_dir)
+            self.vocabulary = VocabularyIndex.load(path, digest)
+            if self.vocabulary is None:
+                self.vocabulary = VocabularyIndex.build(self.count_tokens(self.web_text) + Counter(self.wordlists), digest)
+                self.vocabulary.ngrams(self.username_mdp.order)
+                self.vocabulary.ngrams(self.password_mdp.order, 8)
+                if os.path.exists(self.csv_path):
+                    self.vocabulary.save(path)
+        return self.vocabulary
+
     # Build state transitions for username and password generation
+    # (usernames come from every word, passwords from words of at least 8 characters).
+    # Only builds once per vocabulary, the first build also picks up the model an earlier run trained on
+    # the same corpus (see save_model) so training continues from its Q-values.
     def build_state_transitions(self):
-        username_data = set(self.preprocess_text(self.web_text) + self.wordlists)
-        password_data = set(word for word in username_data if len(word) >= 8)
-
-        for word in username_data:
-            for i in range(len(word) - self.username_mdp.order):
-                state = f"username_{word[i:i+self.username_mdp.order]}"
-                action = word[i+self.username_mdp.order]
-                next_char = word[i+self.username_mdp.order]
-                self.username_mdp.state_transitions[state][action].add(next_char)
-                if i == 0:
-                    self.username_mdp.initial_states.append(state)
-
-        for word in password_data:
-            for i in range(len(word) - self.password_mdp.order):
-                state = f"password_{word[i:i+self.password_mdp.order]}"
-                action = word[i+self.password_mdp.order]
-                next_char = word[i+self.password_mdp.order]
-                self.password_mdp.state_transitions[state][action].add(next_char)
-                if i == 0:
-                    self.password_mdp.initial_states.append(state)
+        vocabulary = self.get_vocabulary()
+        if self.built_digest == vocabulary.digest:
+            return
+        for mdp, prefix, min_length in ((self.username_mdp, "username_", 0), (self.password_mdp, "password_", 8)):
+            states, next_chars, _, initial_states = vocabulary.ngrams(mdp.order, min_length)
+            mdp.state_transitions.clear()
+            for state, next_char in zip(states.tolist(), next_chars.tolist()):
+                mdp.state_transitions[prefix + state][next_char].add(next_char)
+            # one occurrence per word starting with the state, as the start distribution has always been
+            mdp.set_initial_states(np.char.add(prefix, initial_states))
+            mdp.compile()
+        self.built_digest = vocabulary.digest
+        if self.load_model():
+            print(f"Loaded trained credential model {model_path(self.csv_path, self.cache_dir)}")
+
+    def _mdps(self):
+        return (("username", self.username_mdp), ("password", self.password_mdp))
+
+    # Saves the Q-values of both MDPs and the usernames already handed out as an .npz keyed by the digest
+    # of the web text and wordlist, defaults to model_path() of the CSV
+    def save_model(self, path: str = None) -> None:
+        path = path or model_path(self.csv_path, self.cache_dir)
+        arrays = {"digest": np.array(self.get_vocabulary().digest)}
+        for name, mdp in self._mdps():
+            for key, array in mdp.get_model_arrays().items():
+                arrays[f"{name}_{key}"] = array
+        save_npz_atomic(path, arrays)
+
+    # Loads a model saved by save_model into the built MDPs, returns False and leaves them untouched when
+    # there is none or it was trained on another corpus
+    def load_model(self, path: str = None) -> bool:
+        path = path or model_path(self.csv_path, self.cache_dir)
+        if not os.path.exists(path):
+            return False
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data["digest"]) != self.get_vocabulary().digest:
+                    return False
+                models = {name: {key[len(name) + 1:]: data[key] for key in data.files if key.startswith(name + "_")}
+                          for name, _ in self._mdps()}
+            if not all(mdp.matches_model_arrays(models[name]) for name, mdp in self._mdps()):
+                return False
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[ERROR] Could not load credential model {path}: {e}")
+            return False
+        for name, mdp in self._mdps():
+            mdp.set_model_arrays(models[name])
+        return True
+
+    # Walks an MDP from state until text is min_length long, learning on the way.
+    # Runs on the Q-table ids, the state string is only needed for the reward.
+    def walk_mdp(self, mdp: CredentialMDP, state: str, min_length: int) -> str:
+        q_table = mdp.get_q_table()
+        state_id = q_table.state_ids.get(state, -1)
+        text = state[9:]
+        while len(text) < min_length:
+            pair = mdp.choose_pair(state_id)
+            if pair < 0:
+                break
+            action, next_char = q_table.chars[q_table.pair_action_view[pair]], q_table.chars[q_table.pair_char_view[pair]]
+            text += next_char
+            reward = mdp.get_reward(state, action, next_char)
+            mdp.update_pair(pair, reward)
+            state_id = q_table.pair_next_state_view[pair]
+            if state_id >= 0:
+                state = q_table.state_names[state_id]
+        return text
 
     # Generate a username and password pair
     def generate_credential(self) -> Tuple[str, str]:
         # Generate username
-        if not self.username_mdp.initial_states:
+        state = self.username_mdp.sample_initial_state()
+        if state is None:
             state = f"username_{random.choice(self.wordlists)[:2]}"
-        else:
-            state = random.choice(self.username_mdp.initial_states)
-
-        username = state[9:]
-        while len(username) < self.min_username_length:
-            action, next_char = self.username_mdp.choose_action(state)
-            if not action or not next_char:
-                break
-            username += next_char
-            next_state = f"username_{username[-self.username_mdp.order:]}"
-            reward = self.username_mdp.get_reward(state, action, next_char)
-            self.username_mdp.update_q_value(state, action, next_char, next_state, reward)
-            state = next_state
 
+        username = self.walk_mdp(self.username_mdp, state, self.min_username_length)
         username = f"{username}{random.randint(1, 999)}"
         self.username_mdp.used_usernames.add(username)
 
         # Generate password
-        if not self.password_mdp.initial_states:
+        state = self.password_mdp.sample_initial_state()
+        if state is None:
             state = f"password_{random.choice(self.wordlists)[:3]}"
-        else:
-            state = random.choice(self.password_mdp.initial_states)
-
-        password = state[9:]
-        while len(password) < self.min_password_length:
-            action, next_char = self.password_mdp.choose_action(state)
-            if not action or not next_char:
-                break
-            password += next_char
-            next_state = f"password_{password[-self.password_mdp.order:]}"
-            reward = self.password_mdp.get_reward(state, action, next_char)
-            self.password_mdp.update_q_value(state, action, next_char, next_state, reward)
-            state = next_state
 
+        password = self.walk_mdp(self.password_mdp, state, self.min_password_length)
         password = self.enhance_password(password)
         return username, password
 
@@ -311,14 +898,135 @@ class CredentialGeneratorMDP:
         return enhanced
 
     # Generate multiple credentials
-    def generate_credentials(self, count: int = 10) -> List[Tuple[str, str]]:
+    # batch_size > 0 switches to the batched generator (see iter_credentials), workers > 1 shards it over processes,
+    # a dedup stage (CredentialDedup) needs the batched generator too
+    def generate_credentials(self, count: int = 10, batch_size: int = 0, workers: int = 0, seed=None,
+                             dedup: CredentialDedup = None, max_attempts: int = None) -> List[Tuple[str, str]]:
+        if batch_size > 0 or workers > 1 or dedup is not None:
+            return list(self.iter_credentials(count, batch_size or 1024, workers, seed, dedup, max_attempts))
         self.build_state_transitions()
         credentials = []
         for _ in range(count):
             username, password = self.generate_credential()
             credentials.append((username, password))
+        if os.path.exists(self.csv_path):
+            self.save_model()
         return credentials
 
+    # Streams `count` credentials, batch_size at a time. Each batch advances all of its walks together with
+    # NumPy sampling over the Q-tables (see generate_batch). With workers > 1 batches are generated in a process
+    # pool, every batch gets its own RNG stream spawned from `seed` and every worker learns on its own copy of
+    # the MDPs (starting from the saved model, which only the single process mode updates), batches are yielded in order.
+    # With a dedup stage only credentials it has not seen yet (in this or an earlier run) come out, `count` of
+    # them unless max_attempts (10 * count by default) credentials were generated first; dedup.duplicate_rate
+    # tells how many attempts were spent on repeats.
+    def iter_credentials(self, count: int, batch_size: int = 1024, workers: int = 0, seed=None,
+                         dedup: CredentialDedup = None, max_attempts: int = None):
+        if batch_size < 1:
+            raise ValueError("Invalid batch size: batch_size must be at least 1")
+        if dedup is None:
+            yield from self._generate_stream(count, batch_size, workers, seed)
+        else:
+            attempts = max_attempts if max_attempts is not None else 10 * count
+            yield from itertools.islice(dedup.filter(self._generate_stream(attempts, batch_size, workers, seed)), count)
+        if workers <= 1 and os.path.exists(self.csv_path):
+            self.save_model()
+
+    def _generate_stream(self, count: int, batch_size: int, workers: int, seed):
+        seed_sequence = np.random.SeedSequence(seed)
+        # sizes and seeds are produced lazily, a stream may be asked for far more than it is read for
+        batches = ((min(batch_size, count - start), seed_sequence.spawn(1)[0]) for start in range(0, count, batch_size))
+        if workers <= 1:
+            self.build_state_transitions()
+            for size, batch_seed in batches:
+                yield from self.generate_batch(size, np.random.default_rng(batch_seed))
+            return
+        # built (and saved in the cache directory) once here, so the workers only have to load it
+        self.get_vocabulary()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_credential_worker,
+                                 initargs=(self.csv_path, self.wordlist_path, self.cache_dir)) as executor:
+            pending = deque()
+            for size, batch_seed in batches:
+                pending.append(executor.submit(_generate_credential_batch, size, batch_seed))
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    # Generates `count` credentials at once: every step picks the next character of all unfinished walks with
+    # vectorized epsilon-greedy sampling and applies their Q updates in one go. Walks taking the same
+    # transition in the same step count as one update, rewards are evaluated once per transition and batch.
+    def generate_batch(self, count: int, rng=None, learn: bool = True) -> List[Tuple[str, str]]:
+        rng = rng if rng is not None else np.random.default_rng()
+        usernames = self.walk_batch(self.username_mdp, "username_", 2, self.min_username_length, count, rng, learn)
+        passwords = self.walk_batch(self.password_mdp, "password_", 3, self.min_password_length, count, rng, learn)
+        suffixes = rng.integers(1, 1000, count).tolist()
+        usernames = [f"{username}{suffix}" for username, suffix in zip(usernames, suffixes)]
+        self.username_mdp.used_usernames.update(usernames)
+        specials = rng.choice(list('!@#$%^&*'), count).tolist()
+        digits = rng.integers(0, 10, count).tolist()
+        passwords = [f"{password.capitalize()}{special}{digit}" for password, special, digit in zip(passwords, specials, digits)]
+        return list(zip(usernames, passwords))
+
+    # Batched version of walk_mdp, returns the text of `count` walks
+    def walk_batch(self, mdp: CredentialMDP, prefix: str, fallback_length: int, min_length: int, count: int, rng, learn: bool) -> List[str]:
+        q_table = mdp.get_q_table()
+        if mdp.initial_states:
+            starts = [mdp.initial_states[i] for i in mdp.sample_initial_states(rng, count).tolist()]
+        else:
+            starts = [prefix + self.wordlists[i][:fallback_length] for i in rng.integers(0, len(self.wordlists), count).tolist()]
+        state_ids = np.array([q_table.state_ids.get(state, -1) for state in starts], dtype=np.int64)
+        texts = [state[9:] for state in starts]
+        lengths = np.array([len(text) for text in texts], dtype=np.int64)
+        steps = max(min_length - int(lengths.min()), 0) if count else 0
+        chosen = np.full((count, steps), -1, dtype=np.int64)
+        rewards = np.full(len(q_table), np.nan)
+        for step in range(steps):
+            walking = np.flatnonzero((lengths < min_length) & (state_ids >= 0))
+            states = state_ids[walking]
+            first_action = q_table.action_indptr[states]
+            action_count = q_table.action_indptr[states + 1] - first_action
+            walking, states, first_action, action_count = (
+                array[action_count > 0] for array in (walking, states, first_action, action_count))
+            if not len(walking):
+                break
+            explore = rng.random(len(walking)) < mdp.epsilon
+            random_action = first_action + (rng.random(len(walking)) * action_count).astype(np.int64)
+            actions = np.where(explore, random_action, q_table.pair_slot[q_table.best_pair[states]])
+            first_pair = q_table.pair_indptr[actions]
+            pair_count = q_table.pair_indptr[actions + 1] - first_pair
+            pairs = first_pair + (rng.random(len(walking)) * pair_count).astype(np.int64)
+            chosen[walking, step] = q_table.pair_char[pairs]
+            lengths[walking] += 1
+            if learn:
+                self.learn_batch(mdp, q_table, pairs, rewards)
+            state_ids[walking] = q_table.pair_next_state[pairs]
+        chars = q_table.chars
+        return [text + "".join(chars[char] for char in row if char >= 0) for text, row in zip(texts, chosen.tolist())]
+
+    # Bellman update of a step's pairs at once
+    def learn_batch(self, mdp: CredentialMDP, q_table: QTable, pairs, rewards) -> None:
+        missing = np.unique(pairs[np.isnan(rewards[pairs])])
+        for pair in missing.tolist():
+            rewards[pair] = mdp.get_reward(q_table.state_names[q_table.pair_state[pair]],
+                                           q_table.chars[q_table.pair_action[pair]], q_table.chars[q_table.pair_char[pair]])
+        next_states = q_table.pair_next_state[pairs]
+        max_next_q = np.where(next_states >= 0, q_table.max_q_of[np.maximum(next_states, 0)], 0.0)
+        current_q = q_table.q[pairs]
+        q_table.set_many(pairs, current_q + mdp.learning_rate * (rewards[pairs] + mdp.gamma * max_next_q - current_q))
+
+# Process pool side of CredentialGeneratorMDP.iter_credentials, each worker builds its own generator once
+# (the saved vocabulary index makes that cheap) and keeps learning across its batches
+_credential_worker = None
+
+def _init_credential_worker(csv_path: str, wordlist_path: str, cache_dir: str = None):
+    global _credential_worker
+    _credential_worker = CredentialGeneratorMDP(csv_path, wordlist_path, cache_dir)
+    _credential_worker.build_state_transitions()
+
+def _generate_credential_batch(count: int, seed) -> List[Tuple[str, str]]:
+    return _credential_worker.generate_batch(count, np.random.default_rng(seed))
+
 # Main function to run the credential generation process
 def main():
     # File paths
@@ -329,7 +1037,7 @@ def main():
     # Load URLs from the CSV file
     urls = load_urls_from_csv(site_list_csv_path)
 
-    scraper = WebScraper(urls)
+    scraper = WebScraper(urls, concurrency=8)
     scraper.generate_csv(csv_path)
 
     #Use NLP routine to clean CSV file
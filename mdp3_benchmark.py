@@ -0,0 +1,95 @@
+# Times credential generation with the cached per-state max Q against scanning every pair of a state,
+# on the bundled wordlist.txt and on a synthetic corpus. Run with: python mdp3_benchmark.py
+import csv
+import os
+import random
+import tempfile
+import time
+
+from mdp3 import CredentialGeneratorMDP, CredentialMDP
+
+
+# What CredentialMDP did before the max/argmax cache: the greedy choice and the Bellman target scan the state
+class ScanningMDP(CredentialMDP):
+    def choose_pair(self, state_id: int) -> int:
+        if state_id < 0:
+            return -1
+        q_table = self.q_table
+        action_indptr, pair_indptr, q = q_table.action_indptr_view, q_table.pair_indptr_view, q_table.q_view
+        first_action, end_action = action_indptr[state_id], action_indptr[state_id + 1]
+        if first_action == end_action:
+            return -1
+        if random.random() < self.epsilon:
+            action = random.randrange(first_action, end_action)
+        else:
+            action, best = first_action, None
+            for candidate in range(first_action, end_action):
+                value = max(q[pair_indptr[candidate]:pair_indptr[candidate + 1]])
+                if best is None or value > best:
+                    action, best = candidate, value
+        start, end = pair_indptr[action], pair_indptr[action + 1]
+        return start if end - start == 1 else random.randrange(start, end)
+
+    def update_pair(self, pair: int, reward: float) -> None:
+        q_table = self.q_table
+        next_state = q_table.pair_next_state_view[pair]
+        max_next_q = 0.0
+        if next_state >= 0:
+            start, end = q_table.pair_range(next_state)
+            if end > start:
+                max_next_q = max(q_table.q_view[start:end])
+        current_q = q_table.q_view[pair]
+        q_table.q_view[pair] = current_q + self.learning_rate * (reward + self.gamma * max_next_q - current_q)
+
+
+# Rows of pseudo words built from syllables, so states branch much more than in the wordlist
+def build_corpus(row_count: int = 2000, words_per_row: int = 100, vocabulary_size: int = 20000) -> list[str]:
+    rng = random.Random(0)
+    syllables = [c + v for c in "bcdfghjklmnprstvwz" for v in "aeiouy"] + ["sec", "adm", "pass", "root", "net", "sys"]
+    vocabulary = ["".join(rng.choice(syllables) for _ in range(rng.randint(2, 5))) for _ in range(vocabulary_size)]
+    return [" ".join(rng.choice(vocabulary) for _ in range(words_per_row)) for _ in range(row_count)]
+
+
+def write_corpus(directory: str, rows: list[str]) -> str:
+    path = os.path.join(directory, "web_text.csv")
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["id", "content", "url"])
+        writer.writerows((i, row, f"http://bench.test/{i}") for i, row in enumerate(rows, 1))
+    return path
+
+
+# Average number of pairs per state that has any, what a scan pays on every step
+def branching(mdp: CredentialMDP) -> float:
+    q_table = mdp.get_q_table()
+    return len(q_table) / max(int((q_table.best_pair >= 0).sum()), 1)
+
+
+def benchmark(csv_path: str, wordlist_path: str, count: int = 3000) -> dict:
+    results = {}
+    for name, mdp_class in (("scan", ScanningMDP), ("cached", CredentialMDP)):
+        random.seed(0)
+        generator = CredentialGeneratorMDP(csv_path, wordlist_path)
+        generator.username_mdp = mdp_class(order=2)
+        generator.password_mdp = mdp_class(order=3)
+        generator.build_state_transitions()
+        start = time.perf_counter()
+        for _ in range(count):
+            generator.generate_credential()
+        results[name] = (time.perf_counter() - start, branching(generator.password_mdp))
+    return results
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        corpora = {}
+        for label, text in (("wordlist.txt only", []), ("synthetic corpus", build_corpus())):
+            corpus_directory = os.path.join(directory, str(len(corpora)))
+            os.mkdir(corpus_directory)
+            corpora[label] = write_corpus(corpus_directory, text)
+        for label, csv_path in corpora.items():
+            results = benchmark(csv_path, "wordlist.txt")
+            baseline = results["scan"][0]
+            print(f"{label}: {results['cached'][1]:.1f} transitions per password state on average")
+            for name, (seconds, _) in results.items():
+                print(f"  {name:>6}: {seconds * 1000:8.1f} ms for 3000 credentials  {baseline / seconds:5.1f}x vs scan")